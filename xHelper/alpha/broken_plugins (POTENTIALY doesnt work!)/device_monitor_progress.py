@@ -10,32 +10,17 @@ device_monitor_progress – панель «Монитор (прогресс)».
  • Уровень батареи (%)
  • Сигнал Wi‑Fi   (RSSI → %)
 
-Все данные собираются через adb‑команды, обновляются каждые 2 сек.
+Данные приходят из общей шины телеметрии (main_window.subscribe_telemetry),
+обновляются каждые 2 сек.
 """
 
-import subprocess
-import re
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QProgressBar, QLabel,
     QHBoxLayout, QMessageBox
 )
 
 
-def _run_adb(main_window, cmd):
-    """Утилита – выполнить команду adb и вернуть stdout."""
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
-    try:
-        out = subprocess.check_output(
-            [adb] + cmd.split(),
-            text=True,
-            timeout=5
-        )
-        return out
-    except Exception as e:
-        return ""
-
-
 def register(main_window):
     """Создаёт вкладку «Монитор (прогресс)» и запускает таймер обновления."""
     tab = QWidget()
@@ -63,79 +48,48 @@ def register(main_window):
     wifi_bar     = bar_item("Wi‑Fi")
 
     # --------------------------------------------------------------
-    #   Функции получения данных
+    #   Пересчёт данных шины телеметрии в проценты
     # --------------------------------------------------------------
-    def get_cpu():
-        """Пытаемся получить среднюю загрузку CPU через top."""
-        out = _run_adb(main_window, "shell top -b -n 1 -d 0.5")
-        # строка вида «%CPU USER …» – ищем первое число с «%» после «%CPU»
-        match = re.search(r"%CPU\s+(\d+\.\d+)", out)
-        if match:
-            return float(match.group(1))
-        # fallback – используем dumpsys cpuinfo (можно, но тяжелее)
-        out = _run_adb(main_window, "shell dumpsys cpuinfo")
-        m = re.search(r"Total\s+(\d+)%", out)
-        return float(m.group(1)) if m else 0.0
-
-    def get_mem():
-        """% занятости ОЗУ = (Total‑Free)/Total."""
-        out = _run_adb(main_window, "shell cat /proc/meminfo")
-        total = free = None
-        for line in out.splitlines():
-            if line.startswith("MemTotal:"):
-                total = int(line.split()[1])
-            elif line.startswith("MemFree:"):
-                free = int(line.split()[1])
-        if total and free:
-            used = total - free
-            return used / total * 100.0
-        return 0.0
-
-    def get_battery():
-        out = _run_adb(main_window, "shell dumpsys battery")
-        for line in out.splitlines():
-            if "level:" in line:
-                return float(line.split(":")[1].strip())
+    # все четыре источника читает общая шина – одним обменом с устройством,
+    # вместе с вкладкой «Мониторинг» и другими плагинами
+    SOURCES = ["cpu", "memory", "battery", "wifi"]
+
+    def get_mem(memory):
+        """% занятости ОЗУ = (Total‑Available)/Total."""
+        total = memory.get("MemTotal")
+        free = memory.get("MemAvailable", memory.get("MemFree"))
+        if total and free is not None:
+            return (total - free) / total * 100.0
         return 0.0
 
-    def get_wifi():
+    def get_wifi(wifi):
         """RSSI в диапазоне -100…0 → переводим в %."""
-        out = _run_adb(main_window, "shell dumpsys wifi")
-        m = re.search(r"RSSI:\s*(-?\d+)", out)
-        if m:
-            rssi = int(m.group(1))
-            # -100 → 0 %, 0 → 100 %
-            return max(0, min(100, (rssi + 100)))
+        if "rssi" in wifi:
+            # -100 → 0 %, 0 → 100 %
+            return max(0, min(100, (wifi["rssi"] + 100)))
         return 0
 
     # --------------------------------------------------------------
-    #   Таймер обновления
+    #   Подписка на шину (раз в 2 сек)
     # --------------------------------------------------------------
-    timer = QTimer(main_window)
-    timer.setInterval(2000)  # 2 сек
-
-    def refresh():
+    def on_snapshot(snapshot):
         """Обновляем все бары, выводим сообщения в консоль."""
-        try:
-            cpu = get_cpu()
-            mem = get_mem()
-            bat = get_battery()
-            wifi = get_wifi()
-
-            cpu_bar.setValue(int(cpu))
-            mem_bar.setValue(int(mem))
-            bat_bar.setValue(int(bat))
-            wifi_bar.setValue(int(wifi))
-
-            # Информируем о неудачах (например, отсутствие устройства)
-            if any(v == 0 for v in (cpu, mem, bat, wifi)):
-                main_window.log_message("[Монитор] Похоже, устройство не подключено")
-        except Exception as exc:
-            main_window.log_message(f"[Монитор] Ошибка обновления: {exc}")
-
-    timer.timeout.connect(refresh)
-    timer.start()
-    refresh()                     # первый запуск сразу
+        if snapshot.errors and not snapshot.data:
+            main_window.log_message(f"[Монитор] Ошибка обновления: "
+                                    f"{next(iter(snapshot.errors.values()))}")
+            return
+        data = snapshot.data
+        cpu = data.get("cpu", {}).get("total", 0.0)
+        mem = get_mem(data.get("memory", {}))
+        bat = data.get("battery", {}).get("level", 0)
+        wifi = get_wifi(data.get("wifi", {}))
+
+        cpu_bar.setValue(int(cpu))
+        mem_bar.setValue(int(mem))
+        bat_bar.setValue(int(bat))
+        wifi_bar.setValue(int(wifi))
+
+    main_window.subscribe_telemetry(SOURCES, 2.0, on_snapshot, widget=tab)   # только видимой вкладке
 
     # --------------------------------------------------------------
     #   Добавляем вкладку в главное окно
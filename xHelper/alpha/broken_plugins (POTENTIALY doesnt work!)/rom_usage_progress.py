@@ -15,7 +15,6 @@ rom_usage_progress – плагин для xHelper.
 """
 
 import re
-import subprocess
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
@@ -27,28 +26,6 @@ from PyQt6.QtWidgets import (
 # ----------------------------------------------------------------------
 #   Вспомогательные функции
 # ----------------------------------------------------------------------
-def _run_adb(main_window, cmd: str) -> str:
-    """
-    Выполняет adb‑команду и возвращает её stdout.
-    При ошибке возвращает пустую строку и пишет сообщение в лог.
-    """
-    adb = (
-        main_window.settings.get("adb_path", "adb")
-        if hasattr(main_window, "settings")
-        else "adb"
-    )
-    try:
-        out = subprocess.check_output(
-            [adb] + cmd.split(),
-            text=True,
-            timeout=7,
-        )
-        return out
-    except Exception as e:
-        main_window.log_message(f"[ROM‑Usage] Ошибка adb: {e}")
-        return ""
-
-
 def _parse_rom_percent(df_output: str) -> int:
     """
     Парсит вывод `adb shell df -h /data` (или `df /sdcard`), ищет строку,
@@ -141,10 +118,10 @@ class RomUsageDialog(QDialog):
         self.refresh_btn.setEnabled(False)
 
         # 1️⃣  Получаем вывод df -h /data
-        raw = _run_adb(self.main_window, "shell df -h /data")
+        raw = self.main_window.adb.query("shell df -h /data", timeout=7, tag="ROM‑Usage")
         if not raw:
             # Если df не дал результата, пробуем dumpsys storage
-            raw = _run_adb(self.main_window, "shell dumpsys storage")
+            raw = self.main_window.adb.query("shell dumpsys storage", timeout=7, tag="ROM‑Usage")
         percent = _parse_rom_percent(raw)
 
         if percent < 0:
@@ -4,83 +4,144 @@
 """
 temperature_monitor – отображает температуру Android‑устройства.
 
-Поддерживает любые датчики, выводимые `adb shell dumpsys thermalservice`.
-Если температура превышает заданный порог (по умолчанию 45 °C) – бар подсвечивается красным.
+Температуры всех thermal‑зон и частоты ядер CPU приходят из источника
+«thermal» общей шины телеметрии (sysfs одной командой, `dumpsys
+thermalservice` – только если sysfs закрыт). Бар зоны подсвечивается
+оранжевым / красным по порогам «предупреждение / критично» (по умолчанию
+45 / 55 °C, меняются прямо на вкладке), а троттлинг – опущенный при
+нагреве потолок частоты – попадает в журнал событий и в лог.
 """
 
-import subprocess
-import re
-from PyQt6.QtCore import Qt, QTimer
+from datetime import datetime
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QProgressBar, QLabel,
-    QMessageBox, QHBoxLayout
+    QHBoxLayout, QDoubleSpinBox, QListWidget
 )
 
-
-def _run_adb(main_window, cmd):
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
-    try:
-        out = subprocess.check_output([adb] + cmd.split(), text=True, timeout=5)
-        return out
-    except Exception:
-        return ""
+_MAX_BARS = 10                      # зон на Snapdragon бывает за 60 – показываем самые горячие
+_COLORS = {"normal": "#00aaff", "warning": "#ff9800", "critical": "red"}
+_EVENT_NAMES = {
+    "throttle_start": "Троттлинг",
+    "throttle_end":   "Троттлинг снят",
+    "warning":        "Предупреждение",
+    "critical":       "Критично",
+    "normal":         "Норма",
+}
 
 
 def register(main_window):
+    thermal = main_window.monitor.thermal
     tab = QWidget()
     vbox = QVBoxLayout(tab)
 
+    status_label = QLabel("Температура: –")
+    status_label.setStyleSheet("font-weight: bold;")
+    vbox.addWidget(status_label)
+    freq_label = QLabel("CPU: –")
+    vbox.addWidget(freq_label)
+
+    # --------------------------------------------------------------
+    #   Пороги
+    # --------------------------------------------------------------
+    warning, critical = thermal.threshold("*")
+    controls = QHBoxLayout()
+
+    def spin(value):
+        box = QDoubleSpinBox()
+        box.setRange(20.0, 120.0)
+        box.setSuffix(" °C")
+        box.setDecimals(1)
+        box.setValue(value)
+        return box
+
+    warning_spin, critical_spin, throttle_spin = spin(warning), spin(critical), spin(thermal.throttle_temp)
+    for title, box in (("Предупреждение:", warning_spin), ("Критично:", critical_spin),
+                       ("Троттлинг от:", throttle_spin)):
+        controls.addWidget(QLabel(title))
+        controls.addWidget(box)
+    controls.addStretch()
+    vbox.addLayout(controls)
+
+    def apply_thresholds(*_):
+        thermal.set_threshold("*", warning_spin.value(), critical_spin.value())
+        thermal.throttle_temp = throttle_spin.value()
+
+    for box in (warning_spin, critical_spin, throttle_spin):
+        box.valueChanged.connect(apply_thresholds)
+
     # --------------------------------------------------------------
-    #   Создаём один (или несколько) прогресс‑баров
+    #   Бары зон – создаются по мере появления датчиков
     # --------------------------------------------------------------
-    temp_bars = []      # список (label, bar, threshold)
+    temp_bars = []      # список (label, bar)
+    bars_box = QVBoxLayout()
+    vbox.addLayout(bars_box)
 
-    def add_bar(name: str, threshold: int = 45):
+    def add_bar():
         hb = QHBoxLayout()
-        lbl = QLabel(name)
+        lbl = QLabel()
         lbl.setMinimumWidth(150)
         bar = QProgressBar()
-        bar.setRange(0, 150)                # температура в градусах Цельсия
+        bar.setRange(0, 120)                # температура в градусах Цельсия
         bar.setFormat("%v°C")
         hb.addWidget(lbl)
         hb.addWidget(bar, 1)
-        vbox.addLayout(hb)
-        temp_bars.append((name, bar, threshold))
-
-    # По умолчанию создаём один бар «CPU», но при наличии нескольких датчиков
-    # будет добавлен ещё один (по‑многим датчикам сразу).
-    add_bar("CPU")
+        bars_box.addLayout(hb)
+        temp_bars.append((lbl, bar))
 
     # --------------------------------------------------------------
-    #   Обновление температуры
+    #   Журнал событий (троттлинг, переходы порогов)
     # --------------------------------------------------------------
-    timer = QTimer(main_window)
-    timer.setInterval(3000)          # каждые 3 сек
-
-    def refresh():
-        out = _run_adb(main_window, "shell dumpsys thermalservice")
-        # Пример строки: "Thermal status: 0x0 (0) | 41.0C (CPU-0)"
-        matches = re.findall(r"(\d+(?:\.\d+)?)C\s*\(([^)]+)\)", out)
-        if not matches:
-            main_window.log_message("[Temp] Не удалось получить температуру")
+    vbox.addWidget(QLabel("События:"))
+    events_list = QListWidget()
+    vbox.addWidget(events_list, 1)
+
+    def on_snapshot(snapshot):
+        main_window.metrics.record(snapshot)     # история thermal.* – для графика и CSV
+        if snapshot.serial != main_window.current_serial():
+            return
+        data = snapshot.data.get("thermal")
+        if not data:
+            if "thermal" in snapshot.errors:
+                main_window.log_message(f"[Temp] Не удалось получить температуру: "
+                                        f"{snapshot.errors['thermal']}")
             return
 
-        # Сопоставляем найденные датчики с уже построенными бар‑ами
-        for i, (value, sensor) in enumerate(matches):
-            temp = float(value)
-            if i >= len(temp_bars):
-                add_bar(sensor)          # добавляем новый бар, если датчик новый
-            name, bar, thresh = temp_bars[i]
-            bar.setMaximum(150)
+        zones = sorted(data["zones"].items(), key=lambda item: item[1], reverse=True)[:_MAX_BARS]
+        while len(temp_bars) < len(zones):
+            add_bar()
+        for (lbl, bar), (zone, temp) in zip(temp_bars, zones):
+            lbl.setText(zone)
             bar.setValue(int(temp))
-            # цветовая индикация
-            if temp >= thresh:
-                bar.setStyleSheet("QProgressBar::chunk {background: red;}")
-            else:
-                bar.setStyleSheet("QProgressBar::chunk {background: #00aaff;}")
-
-    timer.timeout.connect(refresh)
-    timer.start()
-    refresh()
+            level = data["levels"].get(zone, "normal")
+            bar.setStyleSheet(f"QProgressBar::chunk {{background: {_COLORS[level]};}}")
+        for lbl, bar in temp_bars[len(zones):]:
+            lbl.setText("")
+            bar.setValue(0)
+
+        text = f"Максимум: {data['max']:.1f} °C ({data['hottest']}), источник: {data['source']}"
+        if data["throttling"]:
+            text += f" — ТРОТТЛИНГ, потолок частоты {data['cap']:g}%"
+        status_label.setText(text)
+        status_label.setStyleSheet("font-weight: bold; color: red;" if data["throttling"]
+                                   else "font-weight: bold;")
+        if data["cpu_mhz"]:
+            freq_label.setText("CPU: " + "  ".join(
+                f"{key.partition('.')[0][3:]}: {mhz} МГц" for key, mhz in data["cpu_mhz"].items()))
+
+        for event in data["events"]:
+            line = (f"{datetime.fromtimestamp(event.timestamp):%H:%M:%S} "
+                    f"{_EVENT_NAMES.get(event.kind, event.kind)}: {event.zone} "
+                    f"{event.temperature:.1f} °C ({event.detail})")
+            events_list.insertItem(0, line)
+            if event.kind in ("throttle_start", "throttle_end", "critical"):
+                main_window.log_message(f"[Temp] {snapshot.serial}: {line}")
+        while events_list.count() > 200:
+            events_list.takeItem(events_list.count() - 1)
+
+    # каждые 3 сек, пока вкладка на экране; скрытая – раз в 15 сек.,
+    # чтобы троттлинг в долгих прогонах не прошёл незамеченным
+    main_window.subscribe_telemetry(["thermal"], 3.0, on_snapshot, widget=tab,
+                                    idle_interval=15.0)
 
     main_window.tabs.addTab(tab, "Температура")
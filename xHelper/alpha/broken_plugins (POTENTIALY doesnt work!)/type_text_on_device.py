@@ -63,21 +63,9 @@ def _send_text_via_adb(main_window, raw_text: str):
     # ------------------------------------------------------------------
     #   2️⃣  Выполняем adb‑команду без shell (чтобы сохранить Unicode)
     # ------------------------------------------------------------------
-    adb = (
-        main_window.settings.get("adb_path", "adb")
-        if hasattr(main_window, "settings")
-        else "adb"
-    )
-    cmd = [adb, "shell", "input", "text", text]
-
     try:
-        subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=7,
-            check=True      # бросит исключение, если код выхода != 0
-        )
+        # список аргументов – текст уходит одним аргументом `input text`
+        main_window.adb.output(["shell", "input", "text", text], timeout=7)
         main_window.log_message(f"[Keyboard] Текст отправлен: {raw_text}")
     except subprocess.CalledProcessError as e:
         main_window.log_message(f"[Keyboard] Ошибка adb: {e.stderr or e}")
@@ -97,11 +85,7 @@ def _send_text_via_adb(main_window, raw_text: str):
         return
     else:
         # По желанию сразу нажимаем Enter (KEYCODE_ENTER = 66)
-        subprocess.run(
-            [adb, "shell", "input", "keyevent", "66"],
-            capture_output=True,
-            text=True
-        )
+        main_window.adb.run("shell input keyevent 66", timeout=5)
 
 
 # ----------------------------------------------------------------------
@@ -9,22 +9,11 @@ wifi_manager – простое управление Wi‑Fi на Android‑ус
 * Кнопка «Открыть настройки Wi‑Fi» (переход в системные настройки).
 """
 
-import subprocess
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton,
     QMessageBox, QHBoxLayout
 )
-from PyQt6.QtCore import Qt, QTimer
-
-
-def _run_adb(main_window, cmd):
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
-    try:
-        out = subprocess.check_output([adb] + cmd.split(), text=True, timeout=5)
-        return out
-    except Exception as e:
-        main_window.log_message(f"[Wi‑Fi] Ошибка adb: {e}")
-        return ""
+from PyQt6.QtCore import Qt
 
 
 def register(main_window):
@@ -46,41 +35,32 @@ def register(main_window):
     vbox.addLayout(btn_layout)
 
     # --------------------------------------------------------------
-    #   Обновление статуса (каждые 3 сек.)
+    #   Обновление статуса (каждые 3 сек.) – из общей шины телеметрии
     # --------------------------------------------------------------
-    def refresh_status():
-        # 1) Проверка, включён ли Wi‑Fi
-        out = _run_adb(main_window, "shell svc wifi")
-        enabled = "enabled" in out.lower()
-
-        # 2) Текущий SSID
-        out2 = _run_adb(main_window, "shell dumpsys wifi")
-        ssid = "—"
-        for line in out2.splitlines():
-            if "SSID:" in line or "SSID =" in line:
-                ssid = line.split(":")[-1].strip().strip('"')
-                break
+    def on_snapshot(snapshot):
+        if "wifi" in snapshot.errors:
+            main_window.log_message(f"[Wi‑Fi] Ошибка adb: {snapshot.errors['wifi']}")
+            return
+        wifi = snapshot.data.get("wifi", {})
+        enabled = wifi.get("enabled", False)
+        ssid = wifi.get("ssid", "—")
 
         status_lbl.setText(f"Статус: {'Включён' if enabled else 'Выключен'}")
         ssid_lbl.setText(f"SSID: {ssid}")
         btn_toggle.setText("Выключить Wi‑Fi" if enabled else "Включить Wi‑Fi")
 
-    timer = QTimer(main_window)
-    timer.setInterval(3000)
-    timer.timeout.connect(refresh_status)
-    timer.start()
-    refresh_status()
+    subscription = main_window.subscribe_telemetry(["wifi"], 3.0, on_snapshot, widget=tab)
 
     # --------------------------------------------------------------
     #   Переключатель Wi‑Fi
     # --------------------------------------------------------------
     def toggle_wifi():
-        out = _run_adb(main_window, "shell svc wifi")
+        out = main_window.adb.query("shell svc wifi", timeout=5, tag="Wi‑Fi")
         if "enabled" in out.lower():
-            _run_adb(main_window, "shell svc wifi disable")
+            main_window.adb.query("shell svc wifi disable", timeout=5, tag="Wi‑Fi")
         else:
-            _run_adb(main_window, "shell svc wifi enable")
-        refresh_status()
+            main_window.adb.query("shell svc wifi enable", timeout=5, tag="Wi‑Fi")
+        subscription.refresh()          # новый статус – при ближайшем тике шины
 
     btn_toggle.clicked.connect(toggle_wifi)
 
@@ -88,8 +68,7 @@ def register(main_window):
     #   Открыть системные настройки Wi‑Fi
     # --------------------------------------------------------------
     def open_wifi_settings():
-        _run_adb(main_window,
-                 "shell am start -a android.settings.WIFI_SETTINGS")
+        main_window.adb.query("shell am start -a android.settings.WIFI_SETTINGS", timeout=5, tag="Wi‑Fi")
         QMessageBox.information(tab,
                                 "Wi‑Fi",
                                 "Открыты системные настройки Wi‑Fi.\n"
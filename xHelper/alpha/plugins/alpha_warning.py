@@ -54,8 +54,12 @@ HELP_TEXT = """
 удалить или запустить приложение, указав его пакет.</li>
 
 <li><b>Массовая установка</b> – вкладка <i>«Массовая установка APK»</i> позволяет
-выбрать папку с несколькими <code>.apk</code>‑файлами и установить их одной
-командой.</li>
+выбрать папку с <code>.apk</code>, <code>.apks</code>/<code>.xapk</code> и
+каталогами split‑APK и установить их на все выбранные устройства. Большие APK
+передаются потоково (без копии в <code>/data/local/tmp</code>), скорость в МБ/с
+пишется в лог и отчёт. Каждый итог сразу попадает в журнал
+<code>install_journal_*.jsonl</code> – «Продолжить прерванную установку…»
+доставит только то, что ещё не установлено.</li>
 
 <li><b>Файловые операции</b> – во вкладке <i>«Файлы»</i> копируются файлы
 на/с устройства (<code>adb push / pull</code>).</li>
@@ -96,6 +100,24 @@ def register(main_window):
 <p>Внутри <code>register</code> вы имеете доступ к:</p>
 <ul>
 <li><code>main_window.run_adb_command(...)</code> – выполнить любую ADB‑команду.</li>
+<li><code>main_window.adb</code> – общий ADB‑сервис: <code>output()</code>,
+<code>query()</code>, <code>run()</code>, <code>arun()</code>, <code>submit()</code>,
+файлы – <code>pull()</code>, <code>push()</code>, <code>listdir()</code>, <code>stat()</code>,
+бинарный вывод – <code>stream()</code>, пакет команд за один обмен –
+<code>batch()</code> / <code>run_batch()</code>, свойства устройства без лишних
+<code>getprop</code> – <code>props.get(serial)</code> (<code>.model</code>,
+<code>.sdk</code>, <code>.abi</code> …)
+(выбор устройства, пул соединений, кэш и статистика вызовов).</li>
+<li><code>main_window.subscribe_telemetry(["battery", "cpu"], 5.0, slot)</code> –
+общая шина показателей (battery, memory, network, net – скорость по интерфейсам, wifi,
+cpu, processes, thermal – зоны, частоты и троттлинг, и свои источники
+через <code>main_window.monitor.add_source()</code>): каждый источник читается
+с устройства один раз на тик для всех подписчиков, <code>slot(snapshot)</code>
+вызывается в GUI‑потоке. Передайте <code>widget=</code> своей вкладки или дока –
+пока он скрыт, опрос приостанавливается (или идёт с <code>idle_interval</code>).
+Не заводите свой таймер с <code>dumpsys</code>.</li>
+<li><code>main_window.device_tracker</code> – живой реестр устройств: <code>online()</code>,
+<code>state(serial)</code>, <code>add_listener(fn)</code> (события подключения/отключения).</li>
 <li><code>main_window.log_message(...)</code> – писать в правый консоль‑лог.</li>
 <li><code>main_window.tabs</code> – добавить свои вкладки.</li>
 <li><code>main_window.addDockWidget(...)</code> – добавить dock‑виджет.</li>
@@ -9,7 +9,6 @@ app_launcher – быстрый запуск приложений.
 * Двойной клик → запуск.
 """
 
-import subprocess
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
@@ -18,16 +17,6 @@ from PyQt6.QtWidgets import (
 )
 
 
-def _run_adb(main_window, cmd):
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
-    try:
-        out = subprocess.check_output([adb] + cmd.split(), text=True, timeout=10)
-        return out
-    except Exception as e:
-        main_window.log_message(f"[Launcher] Ошибка adb: {e}")
-        return ""
-
-
 def register(main_window):
     tab = QWidget()
     vbox = QVBoxLayout(tab)
@@ -51,9 +40,9 @@ def register(main_window):
     def load_packages():
         list_widget.clear()
         # Пользовательские
-        out_user = _run_adb(main_window, "shell pm list packages -3")
+        out_user = main_window.adb.query("shell pm list packages -3", timeout=10, tag="Launcher")
         # Системные
-        out_sys = _run_adb(main_window, "shell pm list packages -s")
+        out_sys = main_window.adb.query("shell pm list packages -s", timeout=10, tag="Launcher")
         packages = set()
         for line in (out_user + out_sys).splitlines():
             if line.startswith("package:"):
@@ -86,8 +75,7 @@ def register(main_window):
         pkg = cur.text()
         main_window.log_message(f"[Launcher] Запуск {pkg}")
         # Monkey – простой и быстрый способ
-        _run_adb(main_window,
-                 f"shell monkey -p {pkg} -c android.intent.category.LAUNCHER 1")
+        main_window.adb.query(f"shell monkey -p {pkg} -c android.intent.category.LAUNCHER 1", timeout=10, tag="Launcher")
 
     # Двойной клик – запуск
     list_widget.itemDoubleClicked.connect(lambda _: launch_selected())
@@ -8,84 +8,49 @@ Adds a dock widget that shows:
   • Temperature (°C)
   • Current status (Charging/Discharging/…)
 
-The widget refreshes automatically (default: every 30 s) and can be
-updated manually with a button. All errors are logged via
+The widget subscribes to the shared telemetry bus (default: every 30 s)
+and can be updated manually with a button – the battery is read once per
+tick for all widgets that need it. All errors are logged via
 main_window.log_message().
 """
 
-import subprocess
 from PyQt6.QtWidgets import (
     QDockWidget, QWidget, QVBoxLayout, QLabel,
     QProgressBar, QPushButton
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt
 
 
 # ----------------------------------------------------------------------
 #   Вспомогательные функции
 # ----------------------------------------------------------------------
-def _parse_battery_output(output: str) -> dict:
-    """
-    Преобразует вывод ``adb shell dumpsys battery`` в словарь.
-    Пример строки: ``level: 85`` → {'level': 85, ...}
-    """
-    data = {}
-    for line in output.splitlines():
-        if ':' not in line:
-            continue
-        key, val = line.split(':', 1)
-        data[key.strip().lower()] = val.strip()
-
-    # Приводим к нужным типам (если что‑то не найдено – ставим -1)
-    level = int(data.get('level', -1))
-    voltage = int(data.get('voltage', -1)) // 1000 if data.get('voltage') else -1
-    # temperature в 0.1 °C → делим на 10
-    temperature = int(data.get('temperature', -1)) / 10 if data.get('temperature') else -1
-    status = data.get('status', 'UNKNOWN')
-
-    return {
-        'level': level,
-        'voltage': voltage,
-        'temperature': temperature,
-        'status': status,
-    }
+# коды BatteryManager.BATTERY_STATUS_* из `dumpsys battery`
+_STATUS_NAMES = {
+    1: "Unknown",
+    2: "Charging",
+    3: "Discharging",
+    4: "Not charging",
+    5: "Full",
+}
 
 
-def _fetch_battery(main_window) -> dict:
+def _update_ui(main_window, widgets: dict, snapshot):
     """
-    Выполняет ``adb shell dumpsys battery`` и возвращает словарь.
-    Если возникла ошибка – пишет в лог и возвращает пустой dict.
-    """
-    # Путь к adb может быть переопределён в настройках xHelper
-    adb = (
-        main_window.settings.get('adb_path', 'adb')
-        if hasattr(main_window, 'settings') else 'adb'
-    )
-    try:
-        out = subprocess.check_output(
-            [adb, 'shell', 'dumpsys', 'battery'],
-            text=True,
-            timeout=5,
-        )
-        return _parse_battery_output(out)
-    except Exception as e:
-        main_window.log_message(f"[BatteryMonitor] Ошибка чтения батареи: {e}")
-        return {}
-
-
-def _update_ui(main_window, widgets: dict):
-    """
-    Считывает текущие данные о батарее и заполняет UI‑элементы.
+    Заполняет UI‑элементы из снимка шины телеметрии (источник «battery»).
     `widgets` – словарь, в котором хранятся ссылки на нужные виджеты.
     """
-    data = _fetch_battery(main_window)
-    if not data:
+    if "battery" in snapshot.errors:
+        main_window.log_message(f"[BatteryMonitor] Ошибка чтения батареи: "
+                                f"{snapshot.errors['battery']}")
+        return
+    data = snapshot.data.get("battery")
+    if not data or "level" not in data:
         return
 
     level = data['level']
-    voltage = data['voltage']
-    temp = data['temperature']
-    status = data['status']
+    voltage = data['voltage'] / 1000 if 'voltage' in data else -1
+    temp = data.get('temperature', -1)
+    status = _STATUS_NAMES.get(data.get('status'), 'UNKNOWN')
 
     # ‑‑‑ progress bar
     widgets['progress'].setValue(level)
@@ -103,7 +68,7 @@ def _update_ui(main_window, widgets: dict):
     # ‑‑‑ текстовые метки
     widgets['lbl_level'].setText(f"Уровень: {level}%")
     widgets['lbl_voltage'].setText(
-        f"Напряжение: {voltage} V" if voltage != -1 else "Напряжение: —"
+        f"Напряжение: {voltage:.2f} V" if voltage != -1 else "Напряжение: —"
     )
     widgets['lbl_temp'].setText(
         f"Температура: {temp:.1f} °C" if temp != -1 else "Температура: —"
@@ -117,7 +82,7 @@ def _update_ui(main_window, widgets: dict):
 def register(main_window):
     """
     Регистрация плагина – вызывается автоматически при старте xHelper.
-    Добавляем dock‑виджет, таймер обновления и кнопку ручного refresh.
+    Добавляем dock‑виджет, подписку на шину телеметрии и кнопку ручного refresh.
     """
     # === UI ------------------------------------------------------------
     battdock = QDockWidget("Battery Monitor", main_window)
@@ -145,10 +110,8 @@ def register(main_window):
 
     # – кнопка ручного обновления
     btn_refresh = QPushButton("Обновить сейчас")
-    # клик → мгновенное обновление
-    btn_refresh.clicked.connect(
-        lambda: _update_ui(main_window, widgets)
-    )
+    # клик → внеочередное чтение при ближайшем тике шины
+    btn_refresh.clicked.connect(lambda: subscription.refresh())
 
     # собрать все элементы
     vbox.addWidget(progress)
@@ -163,7 +126,7 @@ def register(main_window):
     # разместить справа (можно изменить на любой угол)
     main_window.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, battdock)
 
-    # сохраняем ссылки, чтобы таймер мог их использовать
+    # сохраняем ссылки, чтобы подписка могла их использовать
     widgets = {
         'progress':   progress,
         'lbl_level':  lbl_level,
@@ -172,14 +135,12 @@ def register(main_window):
         'lbl_status':  lbl_status,
     }
 
-    # === Таймер обновления (30 сек.) ================================
-    timer = QTimer(main_window)
-    timer.setInterval(30_000)           # 30 000 мс = 30 сек.
-    timer.timeout.connect(lambda: _update_ui(main_window, widgets))
-    timer.start()
-
-    # Первый запрос сразу после загрузки плагина
-    _update_ui(main_window, widgets)
+    # === Подписка на шину телеметрии (30 сек.) ======================
+    # первый снимок приходит сразу – шина читает новый источник без ожидания
+    # (пока док закрыт или окно свёрнуто – не опрашиваем)
+    subscription = main_window.subscribe_telemetry(
+        ["battery"], 30.0, lambda snapshot: _update_ui(main_window, widgets, snapshot),
+        widget=battdock)
 
     # Информируем пользователя в основной лог
     main_window.log_message("[BatteryMonitor] Плагин загружен, авто‑обновление каждые 30 сек.")
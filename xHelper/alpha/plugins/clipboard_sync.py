@@ -8,7 +8,6 @@ clipboard_sync – синхронизация буфера обмена межд
 * Кнопка «Отправить в устройство» → копирует содержимое из поля в Android.
 """
 
-import subprocess
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QTextEdit, QPushButton, QMessageBox, QLabel
@@ -16,16 +15,6 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 
 
-def _run_adb(main_window, cmd):
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
-    try:
-        out = subprocess.check_output([adb] + cmd.split(), text=True, timeout=5)
-        return out
-    except Exception as e:
-        main_window.log_message(f"[Clipboard] Ошибка adb: {e}")
-        return ""
-
-
 def register(main_window):
     tab = QWidget()
     vbox = QVBoxLayout(tab)
@@ -51,7 +40,7 @@ def register(main_window):
     #   Получение буфера с Android (через dumpsys clipboard)
     # ------------------------------------------------------------------
     def get_clipboard():
-        out = _run_adb(main_window, "shell dumpsys clipboard")
+        out = main_window.adb.query("shell dumpsys clipboard", timeout=5, tag="Clipboard")
         # Пример строки: “Primary clip: text=Hello world”
         for line in out.splitlines():
             if "text=" in line:
@@ -74,8 +63,7 @@ def register(main_window):
             return
         # Попытка через обычный ввод – работает в большинстве ROM‑ов
         escaped = data.replace("\\", "\\\\").replace("\"", "\\\"")
-        _run_adb(main_window,
-                 f'shell am broadcast -a clipper.set -e text "{escaped}"')
+        main_window.adb.query(f'shell am broadcast -a clipper.set -e text "{escaped}"', timeout=5, tag="Clipboard")
         main_window.log_message("[Clipboard] Текст отправлен в устройство")
         QMessageBox.information(tab, "Буфер", "Текст скопирован в Android")
 
@@ -9,19 +9,20 @@ device_cleanup – плагин для поиска и очистки «тяжё
  • Поиск всех файлов размером более 2 GB (используется `adb shell find …`).
  • Вывод найденных файлов в таблицу с чек‑боксами.
  • Кнопка **«Удалить выбранные»** → `adb shell rm -f <path>`.
- • Кнопка **«Скопировать выбранные»** → `adb pull <remote> <local>`  
+ • Кнопка **«Скопировать выбранные»** → sync‑протокол adb (все файлы одним
+   соединением, прогресс по байтам)  
    (пользователь выбирает папку‑назначение на ПК, сохраняется относительная
    структура каталогов).
  • Кнопка **«Обновить список»** повторно сканирует устройство.
  • В процессе сканирования/операций отображается `QProgressBar`.
 
 Плагин не меняет ядро xHelper, использует только публичный API
-`main_window.run_adb_command`, `main_window.log_message` и `main_window.tabs`.
+`main_window.adb`, `main_window.log_message` и `main_window.tabs`.
 """
 
 import os
-import subprocess
 import threading
+import time
 
 from PyQt6.QtCore import Qt, QTimer, QSize
 from PyQt6.QtGui import QIcon
@@ -34,28 +35,6 @@ from PyQt6.QtWidgets import (
 # ----------------------------------------------------------------------
 #   Вспомогательные функции
 # ----------------------------------------------------------------------
-def _run_adb(main_window, cmd: str) -> str:
-    """
-    Выполняет adb‑команду и возвращает stdout (или пустую строку при ошибке).
-    При ошибке пишет в лог `main_window.log_message`.
-    """
-    adb = (
-        main_window.settings.get("adb_path", "adb")
-        if hasattr(main_window, "settings")
-        else "adb"
-    )
-    try:
-        out = subprocess.check_output(
-            [adb] + cmd.split(),
-            text=True,
-            timeout=15,
-        )
-        return out
-    except Exception as e:
-        main_window.log_message(f"[Cleanup] Ошибка adb: {e}")
-        return ""
-
-
 def _human_readable_size(bytes_cnt: int) -> str:
     """Преобразует количество байт в строку вида «X.Y GB»."""
     GB = 1024 ** 3
@@ -71,41 +50,45 @@ class ScanThread(threading.Thread):
     (файлы > 2 GB) и сохраняет список путей в `self.result`.
     """
 
-    def __init__(self, main_window):
+    def __init__(self, main_window, serial):
         super().__init__(daemon=True)
         self.main_window = main_window
+        self.serial = serial      # устройство выбирается в GUI‑потоке, до старта
         self.result = []          # список кортежей (path, size_bytes)
-        self._stop = False
+        self._cancelled = False   # не `_stop`: это метод threading.Thread
 
     def run(self):
         # Пытаемся искать в пользовательском хранилище, а если нет – во всём FS.
         # Используем байты, потому что `c` в find – единица «byte».
         find_cmd = "shell find /storage/emulated/0 -type f -size +2147483648c"
-        out = _run_adb(self.main_window, find_cmd)
+        adb = self.main_window.adb
+        out = adb.query(find_cmd, serial=self.serial, timeout=15, tag="Cleanup")
 
         if not out:
             # Возможно, нет доступа к /storage, пробуем корневой каталог.
             self.main_window.log_message("[Cleanup] Поиск в /storage не дал результатов, пробуем /")
             find_cmd = "shell find / -type f -size +2147483648c"
-            out = _run_adb(self.main_window, find_cmd)
-
-        # Обрабатываем построчно список путей
-        for line in out.splitlines():
-            if self._stop:
-                break
-            path = line.strip()
-            if not path:
-                continue
-            # Получаем размер файла (stat -c %s)
-            size_out = _run_adb(self.main_window, f'shell stat -c %s "{path}"')
+            out = adb.query(find_cmd, serial=self.serial, timeout=15, tag="Cleanup")
+
+        paths = [line.strip() for line in out.splitlines() if line.strip()]
+        if not paths or self._cancelled:
+            return
+        # Размеры всех файлов (stat -c %s) – одним пакетом через shell‑сессию
+        try:
+            sizes = adb.run_batch([f'stat -c %s "{path}"' for path in paths],
+                                  serial=self.serial, timeout=15, use_cache=False)
+        except Exception as e:
+            self.main_window.log_message(f"[Cleanup] Ошибка adb: {e}")
+            sizes = []
+        for i, path in enumerate(paths):
             try:
-                size_bytes = int(size_out.strip())
+                size_bytes = int(sizes[i].stdout.strip())
             except Exception:
                 size_bytes = 0
             self.result.append((path, size_bytes))
 
     def stop(self):
-        self._stop = True
+        self._cancelled = True
 
 
 # ----------------------------------------------------------------------
@@ -193,6 +176,11 @@ def register(main_window):
         if scan_thread and scan_thread.is_alive():
             QMessageBox.warning(tab, "Сканирование", "Сканирование уже запущено.")
             return
+        # устройство – здесь, в GUI‑потоке: поток не трогает список устройств
+        serial = main_window.adb.target()
+        if serial is None:
+            QMessageBox.warning(tab, "Сканирование", "Не выбрано устройство.")
+            return
 
         table.setRowCount(0)
         progress.setValue(0)
@@ -201,7 +189,7 @@ def register(main_window):
         main_window.log_message("[Cleanup] Старт сканирования > 2 GB…")
 
         # Создаём и запускаем поток
-        scan_thread = ScanThread(main_window)
+        scan_thread = ScanThread(main_window, serial)
         scan_thread.start()
 
         # Периодически проверяем, закончил ли поток
@@ -250,7 +238,7 @@ def register(main_window):
                 continue
             remote_path = path_item.text()
             # Выполняем удаление
-            out = _run_adb(main_window, f'shell rm -f "{remote_path}"')
+            out = main_window.adb.query(f'shell rm -f "{remote_path}"', timeout=15, tag="Cleanup")
             main_window.log_message(f"[Cleanup] Удалён: {remote_path}")
             # Убираем строку из таблицы
             table.removeRow(row)
@@ -275,6 +263,7 @@ def register(main_window):
         if not dest_dir:
             return
 
+        items = []
         for row in rows:
             path_item = table.item(row, 1)
             if not path_item:
@@ -286,17 +275,54 @@ def register(main_window):
             rel_path = remote_path.lstrip("/")          # например, storage/emulated/0/Movies/Big.mkv
             local_path = os.path.join(dest_dir, rel_path)
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            items.append((remote_path, local_path))
 
-            # Выполняем `adb pull`
-            main_window.log_message(f"[Cleanup] Копируем {remote_path} → {local_path}")
-            out = _run_adb(main_window, f'pull "{remote_path}" "{local_path}"')
-            main_window.log_message(f"[Cleanup] Скопировано: {remote_path}")
+        # Все файлы – одним sync‑соединением (RECV идут конвейером),
+        # в отдельном потоке; прогресс по байтам опрашиваем таймером.
+        state = {"done": 0, "total": 0, "error": None}
+        # устройство – здесь, в GUI‑потоке: выбор в списке мог смениться за время копирования
+        serial = main_window.adb.target()
 
-        QMessageBox.information(
-            tab,
-            "Готово",
-            f"Выбранные файлы скопированы в {dest_dir}.",
-        )
+        def on_progress(done, total):
+            state["done"], state["total"] = done, total
+
+        def worker():
+            try:
+                main_window.adb.sync.pull_many(serial, items, on_progress)
+            except Exception as e:
+                state["error"] = e
+
+        main_window.log_message(f"[Cleanup] Копируем {len(items)} файл(ов) → {dest_dir}")
+        progress.setMaximum(1000)
+        progress.setValue(0)
+        progress.setVisible(True)
+        started = time.monotonic()
+        pull_thread = threading.Thread(target=worker, daemon=True)
+        pull_thread.start()
+
+        def check_finished():
+            if state["total"]:
+                progress.setValue(int(1000 * state["done"] / state["total"]))
+            if pull_thread.is_alive():
+                QTimer.singleShot(200, check_finished)
+                return
+            progress.setVisible(False)
+            if state["error"] is not None:
+                main_window.log_message(f"[Cleanup] Ошибка копирования: {state['error']}")
+                QMessageBox.warning(tab, "Ошибка", f"Не удалось скопировать файлы:\n{state['error']}")
+                return
+            elapsed = max(time.monotonic() - started, 1e-6)
+            main_window.log_message(
+                f"[Cleanup] Скопировано {state['done'] / 1e6:.1f} МБ "
+                f"({state['done'] / elapsed / 1e6:.1f} МБ/с)"
+            )
+            QMessageBox.information(
+                tab,
+                "Готово",
+                f"Выбранные файлы скопированы в {dest_dir}.",
+            )
+
+        QTimer.singleShot(200, check_finished)
 
     btn_pull.clicked.connect(pull_selected)
 
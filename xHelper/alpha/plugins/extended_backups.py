@@ -46,7 +46,8 @@ class BackupWorker(QThread):
         self.main = main_window
         self.dest_dir = Path(dest_dir)
         self.opts = opts
-        self.adb = self.main.settings.get("adb_path", "adb")
+        # устройство фиксируем при старте: смена выбора не должна «переехать» бэкап
+        self.serial = self.main.adb.target()
         self.steps = self._count_steps()          # количество шагов для шкалы прогресса
         self.current_step = 0
 
@@ -81,6 +82,31 @@ class BackupWorker(QThread):
         self.current_step += 1
         self.progress_signal.emit(int(self.current_step / self.steps * 100))
 
+    def _adb(self, *args) -> list:
+        """Командная строка adb (путь и -s <serial> – как у главного окна)."""
+        return self.main.adb_client.command_line(list(args), self.serial)
+
+    def _pull(self, remote: str, local: Path, share: float = 1.0, offset: float = 0.0):
+        """
+        Каталог с устройства через sync‑протокол; прогресс по байтам
+        двигает шкалу внутри текущего шага (`share` – доля шага, `offset` –
+        с какой доли шага начинать, если в шаге несколько pull).
+        """
+        base = (self.current_step + offset) / self.steps * 100
+        span = share / self.steps * 100
+
+        last = -1
+
+        def progress(done, total):
+            nonlocal last
+            value = int(base + span * done / total) if total else int(base)
+            if value != last:              # не засыпаем GUI сигналами на каждый блок
+                last = value
+                self.progress_signal.emit(value)
+
+        size = self.main.adb.pull(remote, str(local), serial=self.serial, progress=progress)
+        self._log(f"[Backup] {remote}: {size / 1e6:.1f} МБ")
+
     # ------------------------------------------------------------------
     #   Основной метод потока
     # ------------------------------------------------------------------
@@ -95,7 +121,7 @@ class BackupWorker(QThread):
                 self._log("[Backup] Запуск полного бэкапа (adb backup …)")
                 full_path = self.dest_dir / f"full_backup_{timestamp}.ab"
                 cmd = [
-                    self.adb,
+                    *self._adb(),
                     "backup",
                     "-apk",          # включаем apk‑файлы
                     "-shared",       # включаем данные sdcard
@@ -122,7 +148,7 @@ class BackupWorker(QThread):
                 self._log("[Backup] Копируем фото (DCIM)…")
                 remote = "/sdcard/DCIM"
                 local  = temp_dir / "DCIM"
-                subprocess.run([self.adb, "pull", remote, str(local)], check=True)
+                self._pull(remote, local)
                 self._log("[Backup] Фото скопированы")
                 self._step()
 
@@ -133,7 +159,7 @@ class BackupWorker(QThread):
                 self._log("[Backup] Копируем видео (Movies)…")
                 remote = "/sdcard/Movies"
                 local  = temp_dir / "Movies"
-                subprocess.run([self.adb, "pull", remote, str(local)], check=True)
+                self._pull(remote, local)
                 self._log("[Backup] Видео скопированы")
                 self._step()
 
@@ -142,10 +168,10 @@ class BackupWorker(QThread):
             # --------------------------------------------------------------
             if self.opts.get("documents"):
                 self._log("[Backup] Копируем документы (Download, Documents)…")
-                for remote_dir in ("/sdcard/Download", "/sdcard/Documents"):
+                for i, remote_dir in enumerate(("/sdcard/Download", "/sdcard/Documents")):
                     name = Path(remote_dir).name
                     local = temp_dir / name
-                    subprocess.run([self.adb, "pull", remote_dir, str(local)], check=True)
+                    self._pull(remote_dir, local, share=0.5, offset=i * 0.5)
                 self._log("[Backup] Документы скопированы")
                 self._step()
 
@@ -154,10 +180,7 @@ class BackupWorker(QThread):
             # --------------------------------------------------------------
             if self.opts.get("user_apps"):
                 self._log("[Backup] Получаем список пользовательских пакетов…")
-                out = subprocess.check_output(
-                    [self.adb, "shell", "pm", "list", "packages", "-3"],
-                    text=True
-                )
+                out = self.main.adb.output("shell pm list packages -3", self.serial, timeout=60)
                 packages = [line.replace("package:", "").strip()
                             for line in out.splitlines()
                             if line.strip()]
@@ -168,7 +191,7 @@ class BackupWorker(QThread):
                     self._log(f"[Backup] Бэкап пакета {idx}/{len(packages)}: {pkg}")
                     out_path = apps_dir / f"{pkg}_{timestamp}.ab"
                     cmd = [
-                        self.adb,
+                        *self._adb(),
                         "backup",
                         "-apk",          # включаем .apk
                         "-noobb",        # без OBB (необязательно)
@@ -185,10 +208,7 @@ class BackupWorker(QThread):
             # --------------------------------------------------------------
             if self.opts.get("system_apps"):
                 self._log("[Backup] Получаем список системных пакетов…")
-                out = subprocess.check_output(
-                    [self.adb, "shell", "pm", "list", "packages", "-s"],
-                    text=True
-                )
+                out = self.main.adb.output("shell pm list packages -s", self.serial, timeout=60)
                 packages = [line.replace("package:", "").strip()
                             for line in out.splitlines()
                             if line.strip()]
@@ -199,7 +219,7 @@ class BackupWorker(QThread):
                     self._log(f"[Backup] Бэкап системного пакета {idx}/{len(packages)}: {pkg}")
                     out_path = sys_dir / f"{pkg}_{timestamp}.ab"
                     cmd = [
-                        self.adb,
+                        *self._adb(),
                         "backup",
                         "-noapk",       # без .apk – системные обычно менять нельзя
                         "-f",
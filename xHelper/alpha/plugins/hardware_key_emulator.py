@@ -16,10 +16,9 @@ hardware_key_emulator – имитация всех возможных аппа
     • Выпадающий список «История», куда автоматически попадают последние 10
       пользовательских кодов.
 
-Все действия используют уже существующий в `XHelperMainWindow` метод
-`run_adb_command`, поэтому работают с выбранным в списке устройством
-(можно включить «Выполнять на всех выбранных» в главной вкладке
-«Устройства»).
+Все действия работают с выбранным в списке устройством (можно включить
+«Выполнять на всех выбранных» в главной вкладке «Устройства») и идут через
+общий ADB‑сервис `XHelperMainWindow.adb` (постоянные shell‑сессии).
 """
 
 import re
@@ -300,8 +299,21 @@ KEYCODES = OrderedDict([
 #   Внутренние помощники
 # ----------------------------------------------------------------------
 def _run_keyevent(main_window, code: int):
-    """Отправить adb‑команду `input keyevent <code>`."""
-    main_window.run_adb_command(f"shell input keyevent {code}", device_specific=True)
+    """
+    Отправить `input keyevent <code>`.
+
+    Команда уходит через `main_window.adb` в уже открытый shell каждого
+    целевого устройства – без запуска нового adb.
+    """
+    serials = main_window.target_serials()
+    if not serials:
+        main_window.log_message("Не выбрано устройство")
+        return
+    for serial in serials:
+        try:
+            main_window.adb.output(f"shell input keyevent {code}", serial, timeout=5)
+        except Exception as e:
+            main_window.log_message(f"[KeyEmu] Ошибка отправки на {serial}: {e}")
 
 
 def _is_valid_keycode(text: str) -> bool:
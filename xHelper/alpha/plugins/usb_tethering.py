@@ -9,11 +9,11 @@ USB Tethering Manager – плагин для включения/выключе
 - Проверка текущего статуса USB‑модема
 - Включение/выключение режима модема
 - Отображение статуса подключения
+- Скорость через USB‑модем (rndis0) – из общей шины телеметрии
 - Логирование операций
 """
 
 
-import subprocess
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox
 )
@@ -21,27 +21,14 @@ from PyQt6.QtCore import Qt
 
 
 
-def _run_adb(main_window, cmd):
-    """Выполнение ADB‑команды с обработкой ошибок."""
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
+def _get_tethering_status(main_window):
+    """Получение текущего статуса USB‑модема."""
     try:
-        out = subprocess.check_output(
-            [adb] + cmd.split(),
-            text=True,
-            timeout=5
-        )
-        return out.strip()
+        result = main_window.adb.output("shell settings get global tether_dns1", timeout=5)
     except Exception as e:
         main_window.log_message(f"[USB Tethering] Ошибка ADB: {e}")
-        return None
-
-
-def _get_tethering_status(main_window):
-    """Получение текущего статуса USB‑модема."""
-    result = _run_adb(main_window, "shell settings get global tether_dns1")
-    if result is None:
         return "Неизвестно"
-    return "Включён" if result else "Выключен"
+    return "Включён" if result.strip() else "Выключен"
 
 
 def _set_tethering(main_window, enable):
@@ -52,8 +39,11 @@ def _set_tethering(main_window, enable):
     else:
         cmd += " mtp,adb'"
     
-    result = _run_adb(main_window, cmd)
-    if result is not None:
+    try:
+        main_window.adb.output(cmd, timeout=5)
+    except Exception as e:
+        main_window.log_message(f"[USB Tethering] Ошибка ADB: {e}")
+    else:
         main_window.log_message(
             f"[USB Tethering] Режим {'включён' if enable else 'выключен'}"
         )
@@ -75,6 +65,10 @@ def register(main_window):
     status_label.setStyleSheet("font-weight: bold;")
     layout.addWidget(status_label)
 
+    # Трафик через модем – источник «net» шины (счётчики /proc/net/dev)
+    traffic_label = QLabel("Трафик: –")
+    layout.addWidget(traffic_label)
+
     # Описание функционала
     desc = QLabel(
         "Позволяет использовать телефон как USB‑модем.\n"
@@ -110,8 +104,23 @@ def register(main_window):
             _set_tethering(main_window, True)
         update_status()
 
+    def show_traffic(snap):
+        net = snap.data.get("net")
+        if not net:
+            return                       # первый замер – только база счётчиков
+        rndis = {name: info for name, info in net["interfaces"].items()
+                 if name.startswith(("rndis", "usb", "ncm"))}
+        if not rndis:
+            traffic_label.setText("Трафик: нет USB‑интерфейса")
+            return
+        name, info = next(iter(rndis.items()))
+        traffic_label.setText(
+            f"Трафик ({name}): ↓ {info['rx'] / 1024:.0f} КБ/с  ↑ {info['tx'] / 1024:.0f} КБ/с "
+            f"(пик ↓ {info['rx_peak'] / 1024:.0f} КБ/с)")
+
     # Связываем события
     toggle_btn.clicked.connect(toggle_tethering)
+    main_window.subscribe_telemetry(["net"], 2.0, show_traffic, widget=tab)
 
 
     # Первоначальная проверка статуса
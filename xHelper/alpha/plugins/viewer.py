@@ -6,7 +6,8 @@
 """
 
 import os
-import subprocess
+import stat
+from datetime import datetime
 from pathlib import Path
 
 from PyQt6.QtCore import Qt, QSize
@@ -18,26 +19,6 @@ from PyQt6.QtWidgets import (
 )
 
 
-# ----------------------------------------------------------------------
-#   Вспомогательные функции для работы с ADB
-# ----------------------------------------------------------------------
-def _run_adb(main_window, cmd, timeout=5):
-    """Выполняет ADB-команду и возвращает stdout."""
-    adb = main_window.settings.get("adb_path", "adb") if hasattr(main_window, "settings") else "adb"
-    try:
-        result = subprocess.run(
-            [adb] + cmd.split(),
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        if result.returncode != 0:
-            return ""
-        return result.stdout.strip()
-    except Exception:
-        return ""
-
-
 # ----------------------------------------------------------------------
 #   Основная функция регистрации плагина
 # ----------------------------------------------------------------------
@@ -140,15 +121,13 @@ def register(main_window):
     path_history = []
 
     # ---------------------- Функции-обработчики ----------------------
+    entries = {}          # имя -> SyncEntry текущей папки (для панели информации)
+
     def get_file_info(path):
-        """Получает информацию о файле через ADB."""
+        """Информация о файле из уже полученного листинга – без запроса к устройству."""
         if not path:
             return {}
         
-        # Получаем детальную информацию через ls -la
-        cmd = f'shell ls -la "{path}"'
-        out = _run_adb(main_window, cmd)
-        
         info = {
             'name': os.path.basename(path),
             'path': path,
@@ -158,61 +137,50 @@ def register(main_window):
             'permissions': '?'
         }
         
-        if out:
-            lines = out.split('\n')
-            for line in lines:
-                if line.strip() and not line.startswith('total'):
-                    parts = line.split()
-                    if len(parts) >= 9 and parts[-1] == os.path.basename(path):
-                        # Определяем тип
-                        if parts[0].startswith('d'):
-                            info['type'] = 'Папка'
-                        elif parts[0].startswith('l'):
-                            info['type'] = 'Ссылка'
-                        
-                        info['permissions'] = parts[0]
-                        info['size'] = parts[4] + " байт"
-                        
-                        # Собираем дату (части 5, 6, 7)
-                        if len(parts) >= 8:
-                            info['date'] = ' '.join(parts[5:8])
-                        break
+        entry = entries.get(info['name'])
+        if entry is not None:
+            if entry.is_dir:
+                info['type'] = 'Папка'
+            elif entry.is_link:
+                info['type'] = 'Ссылка'
+            info['permissions'] = stat.filemode(entry.mode)
+            info['size'] = f"{entry.size} байт"
+            info['date'] = datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M")
         
         return info
 
+    def list_dir(path):
+        """
+        Листинг через sync‑протокол (LIST/LST2) одним соединением; для
+        ссылок – пакетный STAT «путь/», чтобы понять, ведут ли они в папку.
+        """
+        with main_window.adb.sync.connect(main_window.adb.target(), timeout=5) as sync:
+            listing = sync.list(path)
+            links = [e for e in listing if e.is_link]
+            targets = sync.stat_many([f"{path.rstrip('/')}/{e.name}/" for e in links])
+        link_dirs = {e.name for e, t in zip(links, targets) if t.is_dir}
+        return listing, link_dirs
+
     def update_file_list():
         """Обновляет список файлов и папок в текущей директории."""
         nonlocal current_path
         
         list_files.clear()
+        entries.clear()
         status_bar.setText(f"Загрузка {current_path}...")
         QApplication.processEvents()  # Обновляем UI
         
-        # Команда для получения списка файлов
-        cmd = f'shell ls -p "{current_path}"'
-        out = _run_adb(main_window, cmd)
-        
-        if not out:
+        try:
+            listing, link_dirs = list_dir(current_path)
+        except Exception as e:
             status_bar.setText(f"Не удалось загрузить {current_path}")
-            main_window.log_message(f"[FolderViewer] Ошибка загрузки {current_path}")
+            main_window.log_message(f"[FolderViewer] Ошибка загрузки {current_path}: {e}")
             return
         
-        # Разделяем вывод на строки и сортируем: сначала папки, потом файлы
         items = []
-        for line in out.split('\n'):
-            if not line.strip():
-                continue
-            
-            item_name = line.strip()
-            is_dir = item_name.endswith('/')
-            
-            if is_dir:
-                item_name = item_name[:-1]  # Убираем слеш в конце
-                # Пропускаем специальные папки
-                if item_name in ['.', '..']:
-                    continue
-            
-            items.append((item_name, is_dir))
+        for entry in listing:
+            entries[entry.name] = entry
+            items.append((entry.name, entry.is_dir or entry.name in link_dirs))
         
         # Сортируем: папки сначала, затем файлы
         items.sort(key=lambda x: (not x[1], x[0].lower()))
@@ -356,10 +324,12 @@ def register(main_window):
         nonlocal current_path
         new_path = edit_path.text().strip()
         if new_path and new_path != current_path:
-            # Проверяем существование пути
-            cmd = f'shell ls -d "{new_path}"'
-            out = _run_adb(main_window, cmd)
-            if out:
+            # Проверяем существование пути (STAT «путь/» раскрывает ссылки)
+            try:
+                exists = main_window.adb.stat(new_path.rstrip("/") + "/").is_dir
+            except Exception:
+                exists = False
+            if exists:
                 current_path = new_path
                 update_file_list()
             else:
@@ -8,6 +8,7 @@ GUI‑утилита для управления Android‑устройства
 
 import sys
 import os
+import asyncio
 import subprocess
 import threading
 import time
@@ -27,10 +28,28 @@ from PyQt6.QtWidgets import (
     QCheckBox, QSpinBox, QComboBox, QTableWidget,
     QTableWidgetItem, QInputDialog, QMenu, QSystemTrayIcon,
     QStyle, QDialog, QDialogButtonBox, QFormLayout,
-    QPlainTextEdit
+    QPlainTextEdit, QTableView, QAbstractItemView
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QPoint
-from PyQt6.QtGui import QIcon, QFont, QColor, QAction, QPixmap, QImage, QPalette
+from PyQt6.QtCore import (Qt, QThread, pyqtSignal, QTimer, QSize, QPoint, QPointF,
+                          QAbstractTableModel, QModelIndex, QSortFilterProxyModel)
+from PyQt6.QtGui import (QIcon, QFont, QColor, QAction, QPixmap, QImage, QPalette, QTextCursor,
+                         QPainter, QPen, QPolygonF)
+
+# ---------- ядро xHelper (ADB без Qt) ----------
+from xhelper_core import AdbClient
+from xhelper_core.adb_service import AdbService
+from xhelper_core.adb_sync import TransferRate
+from xhelper_core.device_tracker import DeviceTracker
+from xhelper_core.streaming import StreamSink
+from xhelper_core.executor import AdbExecutor
+from xhelper_core.apk_bundle import find_packages
+from xhelper_core.apk_index import ApkIndex
+from xhelper_core.install_journal import InstallJournal
+from xhelper_core.installer import MassInstall
+from xhelper_core.monitor import MonitorSampler
+from xhelper_core.telemetry import TelemetryBus
+from xhelper_core.timeseries import MetricStore
+from xhelper_core.shell_session import ShellSessionPool
 
 
 # ----------------------------------------------------------------------
@@ -79,12 +98,298 @@ class AppInfoDialog(QDialog):
         layout.addWidget(buttons)
 
 
+# ----------------------------------------------------------------------
+#   Таблица результатов команды на нескольких устройствах
+# ----------------------------------------------------------------------
+class FanOutResultsDialog(QDialog):
+    """Строка на устройство: статус, код возврата, время и вывод команды."""
+
+    STATUS_TEXT = {
+        "pending":   ("В очереди", "gray"),
+        "running":   ("Выполняется", "gray"),
+        "timeout":   ("Таймаут", "orange"),
+        "cancelled": ("Отменено", "gray"),
+        "failed":    ("Сбой", "red"),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Результаты на устройствах")
+        self.setGeometry(250, 250, 900, 400)
+        self.handles = []
+
+        layout = QVBoxLayout(self)
+        self.command_label = QLabel()
+        layout.addWidget(self.command_label)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Устройство", "Статус", "Код", "Время, с", "Вывод"])
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        self.cancel_btn = buttons.addButton("Отменить оставшиеся",
+                                            QDialogButtonBox.ButtonRole.ActionRole)
+        self.cancel_btn.clicked.connect(self.cancel_pending)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def start(self, command: str, handles: list):
+        """Новый запуск: по строке на каждое задание."""
+        self.handles = handles
+        self.command_label.setText(f"Команда: adb {command}")
+        self.table.setRowCount(len(handles))
+        for row, handle in enumerate(handles):
+            self.table.setItem(row, 0, QTableWidgetItem(handle.serial or "—"))
+            for col in range(1, 5):
+                self.table.setItem(row, col, QTableWidgetItem(""))
+            self._set_status(row, *self.STATUS_TEXT["pending"])
+        self.cancel_btn.setEnabled(True)
+        self._update_summary()
+
+    def update_handle(self, handle):
+        """Заполняет строку завершившегося задания (вызывается в GUI‑потоке)."""
+        if handle not in self.handles:
+            return                      # результат предыдущего запуска
+        row = self.handles.index(handle)
+        output = ""
+        if handle.status == "done":
+            result = handle.result
+            ok = result.returncode == 0
+            self._set_status(row, "OK" if ok else "Ошибка", "green" if ok else "red")
+            self.table.item(row, 2).setText(str(result.returncode))
+            output = "\n".join(part.strip() for part in (result.stdout, result.stderr)
+                               if part and part.strip())
+        else:
+            self._set_status(row, *self.STATUS_TEXT[handle.status])
+            if handle.error is not None:
+                output = str(handle.error)
+        self.table.item(row, 3).setText(f"{handle.duration:.2f}")
+        cell = self.table.item(row, 4)
+        cell.setText(output.replace("\n", " ⏎ ")[:300])
+        cell.setToolTip(output)
+        self._update_summary()
+
+    def cancel_pending(self):
+        for handle in self.handles:
+            handle.cancel()
+
+    def _set_status(self, row: int, text: str, color_name: str):
+        item = self.table.item(row, 1)
+        item.setText(text)
+        item.setForeground(QColor(color_name))
+
+    def _update_summary(self):
+        finished = [h for h in self.handles if h.done()]
+        ok = sum(1 for h in finished
+                 if h.status == "done" and h.result.returncode == 0)
+        self.summary_label.setText(
+            f"Готово {len(finished)} из {len(self.handles)}: "
+            f"успешно {ok}, с ошибками {len(finished) - ok}"
+        )
+        if len(finished) == len(self.handles):
+            self.cancel_btn.setEnabled(False)
+
+
+def format_rate(value: float) -> str:
+    """Байт/с → «1.2 МБ/с» / «34 КБ/с» / «512 Б/с»."""
+    if value >= 1e6:
+        return f"{value / 1e6:.1f} МБ/с"
+    if value >= 1e3:
+        return f"{value / 1e3:.0f} КБ/с"
+    return f"{value:.0f} Б/с"
+
+
+class MetricChart(QWidget):
+    """
+    График одного ряда мониторинга (RingSeries). Полная перерисовка – по
+    min/max/mean‑свёртке на пиксель – только при смене ряда, размера или
+    когда точки выходят за окно; новые точки дорисовываются на готовый
+    QPixmap, так что многочасовой ряд не перебирается на каждом замере.
+    """
+
+    MARGIN = 48
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(180)
+        self.series = None
+        self.span = 600.0                 # ширина окна по времени, с
+        self._pixmap = None
+        self._seen = 0                    # series.total на момент последней отрисовки
+        self._t0 = self._t1 = 0.0
+        self._lo = self._hi = 0.0
+        self._last = None                 # последняя нарисованная точка
+
+    def set_series(self, series, span: float = None):
+        self.series = series
+        if span:
+            self.span = float(span)
+        self.redraw()
+
+    def refresh(self):
+        """Дорисовывает точки, пришедшие с прошлого вызова."""
+        if self.series is None or self._pixmap is None or self._last is None:
+            self.redraw()
+            return
+        times, values = self.series.points(since=self._seen)
+        if not times:
+            return
+        if times[-1] > self._t1 or min(values) < self._lo or max(values) > self._hi:
+            self.redraw()                 # вышли за окно – сдвигаем шкалы
+            return
+        painter = QPainter(self._pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self.palette().color(QPalette.ColorRole.Highlight), 1.5))
+        for t, v in zip(times, values):
+            point = self._map(t, v)
+            painter.drawLine(self._last, point)
+            self._last = point
+        painter.end()
+        self._seen = self.series.total
+        self.update()
+
+    def redraw(self):
+        self._pixmap = QPixmap(self.size())
+        self._pixmap.fill(self.palette().color(QPalette.ColorRole.Base))
+        self._last = None
+        series = self.series
+        if self._pixmap.isNull():
+            return                        # виджет ещё не показан
+        self._seen = series.total if series is not None else 0
+        if series is None or not len(series):
+            self.update()
+            return
+
+        # справа четверть окна запаса: следующие точки только дорисовываются
+        self._t1 = series.last()[0] + self.span / 4
+        self._t0 = self._t1 - self.span
+        plot_width = max(self.width() - self.MARGIN, 1)
+        times, mins, maxs, means = series.downsample(self._t0, self._t1, plot_width)
+        if not times:
+            self.update()
+            return
+        lo, hi = min(mins), max(maxs)
+        pad = (hi - lo) * 0.1 or 1.0
+        self._lo, self._hi = lo - pad, hi + pad
+
+        painter = QPainter(self._pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        text = self.palette().color(QPalette.ColorRole.Text)
+        painter.setPen(text)
+        painter.drawText(4, 14, f"{self._hi:.1f}")
+        painter.drawText(4, self.height() - 6, f"{self._lo:.1f}")
+        minutes = self.span / 60
+        painter.drawText(4, self.height() // 2, f"{minutes:g} мин")
+        band = QColor(self.palette().color(QPalette.ColorRole.Highlight))
+        band.setAlpha(70)
+        painter.setPen(QPen(band, 1))
+        for t, low, high in zip(times, mins, maxs):
+            if high > low:
+                painter.drawLine(self._map(t, low), self._map(t, high))
+        painter.setPen(QPen(self.palette().color(QPalette.ColorRole.Highlight), 1.5))
+        painter.drawPolyline(QPolygonF([self._map(t, v) for t, v in zip(times, means)]))
+        painter.end()
+        self._last = self._map(*series.last())
+        self.update()
+
+    def _map(self, t: float, v: float) -> QPointF:
+        width = max(self.width() - self.MARGIN, 1)
+        height = max(self.height() - 20, 1)
+        x = self.MARGIN + (t - self._t0) / (self._t1 - self._t0) * width
+        y = 10 + (self._hi - v) / (self._hi - self._lo) * height
+        return QPointF(x, y)
+
+    def paintEvent(self, event):
+        if self._pixmap is not None:
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, self._pixmap)
+            painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.redraw()
+
+
+class ProcessTableModel(QAbstractTableModel):
+    """
+    Процессы устройства для диспетчера задач. update() правит строки на
+    месте: изменившиеся – одним dataChanged, завершившиеся удаляются,
+    новые дописываются в конец, – так что сортировка прокси‑модели,
+    прокрутка и выделение между обновлениями не сбрасываются.
+    """
+
+    COLUMNS = ("PID", "Процесс", "Сост.", "CPU, %", "RSS, МБ", "Δ RSS, кБ", "Потоки")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []                    # [ProcessInfo]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        proc = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.UserRole:        # ключ сортировки – числа, а не текст
+            return (proc.pid, proc.name.lower(), proc.state, proc.cpu,
+                    proc.rss, proc.rss_delta, proc.threads)[column]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (str(proc.pid), proc.name, proc.state, f"{proc.cpu:.1f}",
+                    f"{proc.rss / 1024:.1f}", f"{proc.rss_delta:+d}" if proc.rss_delta else "",
+                    str(proc.threads))[column]
+        if role == Qt.ItemDataRole.TextAlignmentRole and column != 1:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def update(self, processes: list):
+        fresh = {proc.pid: proc for proc in processes}
+        # завершившиеся – непрерывными диапазонами с конца
+        gone = [row for row, proc in enumerate(self.rows) if proc.pid not in fresh]
+        while gone:
+            last = first = gone.pop()
+            while gone and gone[-1] == first - 1:
+                first = gone.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+        if self.rows:
+            self.rows = [fresh.pop(proc.pid) for proc in self.rows]
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self.rows) - 1, len(self.COLUMNS) - 1))
+        if fresh:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(fresh) - 1)
+            self.rows.extend(fresh.values())
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+
+
 # ----------------------------------------------------------------------
 #   Главное окно – переименовано в XHelperMainWindow
 # ----------------------------------------------------------------------
 class XHelperMainWindow(QMainWindow):
     log_signal      = pyqtSignal(str)   # для вывода текста в лог
     progress_signal = pyqtSignal(int)   # единый сигнал прогресса
+    job_signal      = pyqtSignal(object)          # (колбэк, JobHandle | снимок) → GUI‑поток
+    app_test_status_signal = pyqtSignal(int, str, str)
+    transfer_signal = pyqtSignal(str, object, object, float)  # передача, байт, всего, байт/с
+    device_event_signal = pyqtSignal(object)      # DeviceEvent → GUI‑поток
 
     # ------------------------------------------------------------------
     #   Инициализация
@@ -94,6 +399,35 @@ class XHelperMainWindow(QMainWindow):
         self.setWindowTitle("xHelper alpha 1.0.1 LTS/ATS")
         self.setGeometry(100, 100, 1400, 900)
 
+        # ------------------ ADB‑клиент ------------
+        # Общается с adb‑сервером по сокету; вкладки и плагины используют его
+        # вместо запуска отдельного процесса adb на каждую команду.
+        self.adb_client = AdbClient()
+        # Постоянные shell‑сессии (по одной на устройство) для мелких запросов
+        self.shell_sessions = ShellSessionPool(self.adb_client)
+        # asyncio‑исполнитель: все adb‑задания, не более 2 одновременно на устройство
+        self.executor = AdbExecutor(self.adb_client, per_device_limit=2)
+        self.fanout_dialog = None          # таблица результатов «на всех выбранных»
+        self.transfers = {}                # ключ передачи -> (передано, всего, скорость)
+        self.streams = []                  # [(JobHandle, StreamSink)] – logcat, bugreport …
+        # Живой реестр устройств (host:track-devices): список, мониторинг и
+        # плагины читают его вместо `adb devices`
+        self.device_tracker = DeviceTracker(self.adb_client)
+        self.device_tracker.add_listener(self.device_event_signal.emit)
+        # Общий ADB‑сервис для плагинов: main_window.adb.run()/output()/query()
+        self.adb = AdbService(self.adb_client, self.shell_sessions, self.executor,
+                              serial_provider=self.current_serial,
+                              log=self.log_signal.emit)
+        # Мониторинг: замер (чтение + разбор) идёт в исполнителе, GUI получает снимок.
+        # Опросом владеет шина телеметрии – вкладка и плагины только подписываются
+        self.monitor = MonitorSampler(self.adb)
+        self.telemetry = TelemetryBus(self.monitor, self.executor,
+                                      is_online=self.device_tracker.is_online,
+                                      log=self.log_signal.emit)
+        self.telemetry_widgets = []        # [(Subscription, виджет)] – опрос по видимости
+        self.telemetry.start()
+        self.metrics = MetricStore()       # история показателей по устройствам
+
         # ------------------ меню ------------------
         self.create_menu()
 
@@ -112,6 +446,10 @@ class XHelperMainWindow(QMainWindow):
         # ------------------ сигналы -------------
         self.log_signal.connect(self.log_message)
         self.progress_signal.connect(self.update_test_progress)   # тест‑прогресс
+        self.job_signal.connect(self._dispatch_job)
+        self.app_test_status_signal.connect(self.update_app_test_status)
+        self.transfer_signal.connect(self.update_transfer_progress)
+        self.device_event_signal.connect(self.on_device_event)
 
         # ------------------ вкладки ---------------
         self.create_device_tab()
@@ -124,12 +462,31 @@ class XHelperMainWindow(QMainWindow):
         self.create_app_tester_tab()
         self.create_screen_mirror_tab()
         self.create_monitor_tab()
+        self.create_task_manager_tab()
         self.create_wifi_tab()
         self.create_backup_tab()
         self.create_screen_record_tab()
         self.create_script_editor_tab()
         self.create_fastboot_tab()
 
+        # ------------------ строка состояния -------
+        # попадания/промахи кэша ADB – сколько запросов не ушло на устройство
+        self.cache_label = QLabel()
+        self.statusBar().addPermanentWidget(self.cache_label)
+        # модель / Android / ABI выбранного устройства – из реестра свойств
+        self.device_info_label = QLabel()
+        self.statusBar().addWidget(self.device_info_label)
+        self.device_list.itemSelectionChanged.connect(self.on_device_selection_changed)
+        self.cache_timer = QTimer(self)
+        self.cache_timer.timeout.connect(self.update_cache_label)
+        self.cache_timer.start(2000)
+        self.update_cache_label()
+        # опрос устройства – только для видимых вкладок и док‑виджетов
+        self.visibility_timer = QTimer(self)
+        self.visibility_timer.timeout.connect(self.update_telemetry_visibility)
+        self.visibility_timer.start(1000)
+        self.tabs.currentChanged.connect(self.update_telemetry_visibility)
+
         # ------------------ плагины ----------------
         self.load_plugins()
 
@@ -139,7 +496,8 @@ class XHelperMainWindow(QMainWindow):
         # ------------------ переменные -------------
         self.apk_files           = []
         self.install_in_progress = False
-        self.stop_installation   = False
+        self.mass_install        = None   # MassInstall текущего / последнего запуска
+        self.install_rows        = {}     # serial -> строка таблицы массовой установки
 
         self.packages    = []
         self.crashed_apps = {}
@@ -155,6 +513,35 @@ class XHelperMainWindow(QMainWindow):
         self.toggle_dark_action.triggered.connect(self.toggle_dark_theme)
         view_menu.addAction(self.toggle_dark_action)
 
+        adb_menu = menubar.addMenu("ADB")
+        stats_action = QAction("Статистика вызовов", self)
+        stats_action.triggered.connect(self.show_adb_stats)
+        adb_menu.addAction(stats_action)
+
+    def update_cache_label(self):
+        cache = self.adb.cache.stats()
+        self.cache_label.setText(
+            f"Кэш ADB: {cache['hits']} попаданий / {cache['misses']} промахов "
+            f"({cache['hit_rate']}%)"
+        )
+
+    def show_adb_stats(self):
+        """Пишет в лог статистику вызовов main_window.adb по видам команд."""
+        cache = self.adb.cache.stats()
+        self.log_message(
+            f"Кэш ADB: попаданий {cache['hits']}, промахов {cache['misses']} "
+            f"({cache['hit_rate']}%), записей {cache['size']}, "
+            f"сброшено {cache['invalidations']}, вытеснено {cache['evictions']}"
+        )
+        stats = self.adb.stats()
+        if not stats:
+            self.log_message("Статистика ADB: вызовов ещё не было")
+            return
+        self.log_message("Статистика ADB (вызовов / ошибок / среднее / максимум):")
+        for kind, s in sorted(stats.items(), key=lambda kv: -kv[1]["calls"]):
+            self.log_message(f"  {kind:<24} {s['calls']:>5} {s['errors']:>4} "
+                             f"{s['mean_ms']:>8.1f} мс {s['max_ms']:>8.1f} мс")
+
     def toggle_dark_theme(self, checked: bool):
         if checked:
             self.apply_dark_palette()
@@ -211,80 +598,261 @@ class XHelperMainWindow(QMainWindow):
     #   Проверка ADB
     # ------------------------------------------------------------------
     def check_adb(self):
-        """Проверка доступа к ADB."""
+        """Проверка доступа к ADB; запускает отслеживание устройств."""
+        if self.adb_client.server_available():
+            self.log_message(f"ADB‑сервер доступен (протокол {self.adb_client.version()})")
+            self.device_tracker.start()
+            return
         try:
             result = subprocess.run(['adb', '--version'],
                                     capture_output=True,
                                     text=True)
             if result.returncode == 0:
                 self.log_message("ADB доступен в системе")
-                self.get_devices()
+                # трекер поднимет сервер через `adb devices` и подпишется
+                self.device_tracker.start()
             else:
                 self.log_message("ADB не найден. Установите его и добавьте в PATH.")
         except FileNotFoundError:
             self.log_message("ADB не найден. Установите его и добавьте в PATH.")
 
     def get_devices(self):
-        """Получаем список подключённых устройств."""
-        result = subprocess.run(['adb', 'devices'],
-                                capture_output=True,
-                                text=True)
-        lines = result.stdout.split('\n')[1:]                     # первая строка – заголовок
-        devices = [line.split('\t')[0] for line in lines
-                   if line.strip() and '\tdevice' in line]
-
-        self.device_list.clear()
+        """Кнопка «Обновить список»: список из реестра (без подписки – разовый опрос)."""
+        if not self.device_tracker.tracking:
+            try:
+                self.device_tracker.refresh()
+            except (OSError, subprocess.SubprocessError) as e:
+                self.log_message(f"Не удалось получить список устройств: {e}")
+        self.sync_device_list()
+        self.on_device_selection_changed()
+        devices = self.device_tracker.online()
         if devices:
-            self.device_list.addItems(devices)
             self.log_message(f"Найдено устройств: {len(devices)}")
         else:
             self.log_message("Устройства не найдены")
 
+    def sync_device_list(self):
+        """Приводит список устройств к реестру, не сбрасывая выделение."""
+        online = self.device_tracker.online()
+        shown = [self.device_list.item(i).text() for i in range(self.device_list.count())]
+        for row in reversed(range(len(shown))):
+            if shown[row] not in online:
+                self.device_list.takeItem(row)
+        self.device_list.addItems([serial for serial in online if serial not in shown])
+
+    def on_device_event(self, event):
+        """Слот device_event_signal: подключение, отключение, смена состояния."""
+        if event.kind == "disconnected" or event.previous is not None:
+            self.adb.props.forget(event.serial)    # переподключение / перезагрузка
+            self.telemetry.forget(event.serial)
+        if event.kind == "disconnected":
+            self.log_message(f"Устройство отключено: {event.serial}")
+            self.shell_sessions.close(event.serial)
+            self.adb.invalidate(event.serial)
+        elif event.state == "device":
+            model = event.info.get("model", "")
+            self.log_message(f"Устройство готово: {event.serial} {model}".rstrip())
+        elif event.state == "unauthorized":
+            self.log_message(f"{event.serial}: подтвердите отладку по USB на устройстве")
+        else:
+            self.log_message(f"{event.serial}: состояние {event.state}")
+            if event.previous == "device":
+                # recovery / sideload / offline – старая shell‑сессия уже мертва
+                self.shell_sessions.close(event.serial)
+                self.adb.invalidate(event.serial)
+        self.sync_device_list()
+        self.on_device_selection_changed()
+
     # ------------------------------------------------------------------
     #   Выполнение ADB‑команд
     # ------------------------------------------------------------------
-    def run_adb_command(self, command: str, device_specific: bool = True):
+    def run_adb_command(self, command: str, device_specific: bool = True,
+                        timeout: float = 30.0, stream: bool = False) -> list:
         """
         Выполняет ADB‑команду.
 
         Если device_specific=True – команда будет выполнена на выбранном(ых)
         устройстве(ах). При включённом чекбоксе «Выполнять на всех выбранных»
         команда будет выполнена на всех отмеченных, иначе – только на первом.
+
+        Команда уходит в AdbExecutor и не блокирует окно: результат попадает
+        в лог по завершении. Возвращает список JobHandle (по одному на устройство).
+        stream=True – потоковый режим (logcat, bugreport): без таймаута, вывод
+        во вкладке «Логи», только на первом выбранном устройстве.
         """
         if device_specific:
-            selected = self.device_list.selectedItems()
-            if not selected:
+            devices = self.target_serials()
+            if not devices:
                 self.log_message("Не выбрано устройство")
-                return
-            devices = [it.text() for it in selected]
-            if not self.run_all_checkbox.isChecked():
-                devices = [devices[0]]
+                return []
         else:
             devices = [None]  # глобальная команда
 
+        if stream:
+            handle = self.start_stream(command, devices[0])
+            return [handle] if handle is not None else []
+
+        if len(devices) > 1:
+            return self.run_adb_fan_out(command, devices, timeout)
+
+        handles = []
         for dev in devices:
-            if dev:
-                full_cmd = ['adb', '-s', dev] + command.split()
-            else:
-                full_cmd = ['adb'] + command.split()
-            try:
-                self.log_message(f"Выполняем: {' '.join(full_cmd)}")
-                result = subprocess.run(full_cmd,
-                                        capture_output=True,
-                                        text=True,
-                                        timeout=30)
-                if result.stdout:
-                    self.log_message("Результат:")
-                    self.log_message(result.stdout)
-                if result.stderr:
-                    self.log_message("Ошибки:")
-                    self.log_message(result.stderr)
-                if result.returncode != 0:
-                    self.log_message(f"Команда завершилась с кодом: {result.returncode}")
-            except subprocess.TimeoutExpired:
-                self.log_message("Команда превысила таймаут (30 сек.)")
-            except Exception as e:
-                self.log_message(f"Ошибка выполнения команды: {str(e)}")
+            args = command.split()
+            self.log_message(f"Выполняем: {' '.join(self.adb_client.command_line(args, dev))}")
+            handles.append(self.submit_adb(args, serial=dev, timeout=timeout,
+                                           on_done=self._log_command_result))
+        return handles
+
+    def run_adb_fan_out(self, command: str, devices: list, timeout: float = 30.0) -> list:
+        """
+        Параллельный запуск команды на нескольких устройствах: не больше
+        «Одновременно устройств» за раз, результаты – в таблице, а не в логе.
+        """
+        args = command.split()
+        limit = self.fanout_limit_spin.value()
+        self.log_message(f"Выполняем на {len(devices)} устройствах (по {limit} одновременно): "
+                         f"adb {command}")
+
+        if self.fanout_dialog is None:
+            self.fanout_dialog = FanOutResultsDialog(self)
+        dialog = self.fanout_dialog
+
+        remaining = [len(devices)]
+
+        def finished(handle):
+            dialog.update_handle(handle)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                failed = [h.serial for h in handles
+                          if h.status != "done" or h.result.returncode != 0]
+                if failed:
+                    self.log_message(f"adb {command}: ошибки на {', '.join(failed)}")
+                else:
+                    self.log_message(f"adb {command}: успешно на всех {len(devices)} устройствах")
+
+        handles = self.executor.fan_out(
+            args, devices, limit=limit, timeout=timeout,
+            callback=lambda h: self.job_signal.emit((finished, h)),
+        )
+        dialog.start(command, handles)
+        dialog.show()
+        dialog.raise_()
+        return handles
+
+    def submit_adb(self, args: list, serial=None, timeout: float = 30.0,
+                   on_done=None, text: bool = True):
+        """Ставит adb‑команду в исполнитель; on_done(handle) вызывается в GUI‑потоке."""
+        callback = (lambda h: self.job_signal.emit((on_done, h))) if on_done else None
+        return self.executor.submit(args, serial=serial, timeout=timeout,
+                                    text=text, callback=callback)
+
+    def submit_job(self, serial, factory, timeout=None, description: str = "",
+                   on_done=None):
+        """Ставит составное задание (корутину) в исполнитель; on_done – в GUI‑потоке."""
+        callback = (lambda h: self.job_signal.emit((on_done, h))) if on_done else None
+        return self.executor.submit_call(serial, factory, timeout=timeout,
+                                         description=description, callback=callback)
+
+    def subscribe_telemetry(self, sources: list, interval: float, slot, serial=None,
+                            widget=None, idle_interval=None):
+        """
+        Подписка на общую шину показателей: slot(MonitorSnapshot) вызывается
+        в GUI‑потоке не чаще раза в `interval` с; serial=None – текущее
+        устройство. Если задан widget, то пока он не виден (другая вкладка,
+        закрытый док, свёрнутое окно) период – idle_interval, а при None
+        опрос приостанавливается. Возвращает Subscription (cancel(),
+        refresh(), interval).
+        """
+        sub = self.telemetry.subscribe(
+            sources, interval, lambda snap: self.job_signal.emit((slot, snap)), serial,
+            idle_interval=idle_interval, visible=widget is None or self._shown(widget))
+        if widget is not None:
+            self.telemetry_widgets.append((sub, widget))
+        return sub
+
+    def _shown(self, widget) -> bool:
+        return widget.isVisible() and not self.isMinimized()
+
+    def update_telemetry_visibility(self, *_):
+        """Сверяет видимость виджетов‑подписчиков с шиной телеметрии."""
+        for sub, widget in self.telemetry_widgets:
+            self.telemetry.set_visible(sub, self._shown(widget))
+
+    def _dispatch_job(self, payload):
+        """Слот job_signal: вызывает колбэк задания уже в GUI‑потоке."""
+        on_done, handle = payload
+        on_done(handle)
+
+    def _log_command_result(self, handle):
+        """Пишет в лог результат adb‑команды, выполненной через исполнитель."""
+        if handle.status == "timeout":
+            self.log_message(f"Команда превысила таймаут: {handle.description}")
+            return
+        if handle.status == "cancelled":
+            self.log_message(f"Команда отменена: {handle.description}")
+            return
+        if handle.status == "failed":
+            self.log_message(f"Ошибка выполнения команды: {handle.error}")
+            return
+        result = handle.result
+        if result.stdout:
+            self.log_message("Результат:")
+            self.log_message(result.stdout)
+        if result.stderr:
+            self.log_message("Ошибки:")
+            self.log_message(result.stderr)
+        if result.returncode != 0:
+            self.log_message(f"Команда завершилась с кодом: {result.returncode}")
+
+    def target_serials(self) -> list:
+        """
+        Устройства, на которых выполняются команды: все выбранные при
+        включённом «Выполнять на всех выбранных», иначе – только первое.
+        """
+        devices = [it.text() for it in self.device_list.selectedItems()]
+        if devices and not self.run_all_checkbox.isChecked():
+            devices = devices[:1]
+        return devices
+
+    def current_serial(self):
+        """Первое выбранное устройство; если не выбрано – единственное подключённое."""
+        selected = self.device_list.selectedItems()
+        if selected:
+            return selected[0].text()
+        if self.device_list.count() == 1:
+            return self.device_list.item(0).text()
+        return None
+
+    def on_device_selection_changed(self):
+        """Выбрано другое устройство: шина телеметрии и строка состояния – на него."""
+        serial = self.current_serial()
+        if serial != self.telemetry.current:
+            self.clear_monitor()
+            self.device_ip = None        # новое устройство – адрес прочитает ip_sub
+            self.telemetry.set_current(serial)
+        self.update_device_info()
+
+    def update_device_info(self):
+        """
+        Сведения о выбранном устройстве в строке состояния. Свойства берутся
+        из реестра (один `getprop` на подключение), первый раз – в исполнителе.
+        """
+        serial = self.current_serial()
+        if serial is None or not self.device_tracker.is_online(serial):
+            self.device_info_label.setText("")
+            return
+        props = self.adb.props.cached(serial)
+        if props is not None:
+            self.device_info_label.setText(f"{serial}: {props.summary()}")
+            return
+
+        def loaded(handle):
+            if handle.status == "done" and self.current_serial() == serial:
+                self.device_info_label.setText(f"{serial}: {handle.result.summary()}")
+
+        self.executor.submit_blocking(serial, self.adb.props.get, serial,
+                                      description="getprop",
+                                      callback=lambda h: self.job_signal.emit((loaded, h)))
 
     def run_adb_package_command(self, base_cmd: str):
         """Запрашивает у пользователя имя пакета и исполняет команду."""
@@ -330,6 +898,16 @@ class XHelperMainWindow(QMainWindow):
         self.run_all_checkbox = QCheckBox("Выполнять на всех выбранных")
         device_layout.addWidget(self.run_all_checkbox)
 
+        # Сколько устройств обслуживать одновременно в режиме «на всех»
+        fanout_layout = QHBoxLayout()
+        fanout_layout.addWidget(QLabel("Одновременно устройств:"))
+        self.fanout_limit_spin = QSpinBox()
+        self.fanout_limit_spin.setRange(1, 64)
+        self.fanout_limit_spin.setValue(8)
+        fanout_layout.addWidget(self.fanout_limit_spin)
+        fanout_layout.addStretch()
+        device_layout.addLayout(fanout_layout)
+
         # Управление питанием
         reboot_group = QGroupBox("Управление питанием")
         reboot_layout = QGridLayout(reboot_group)
@@ -406,7 +984,7 @@ class XHelperMainWindow(QMainWindow):
 
     def select_apk(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Выберите APK файл", "", "APK Files (*.apk)"
+            self, "Выберите APK файл", "", "APK Files (*.apk *.apks *.xapk)"
         )
         if file_path:
             self.apk_path.setText(file_path)
@@ -419,7 +997,16 @@ class XHelperMainWindow(QMainWindow):
         if not os.path.exists(apk):
             QMessageBox.warning(self, "Ошибка", "Файл не существует")
             return
-        self.run_adb_command(f"install -r {apk}")
+        serials = self.target_serials()
+        if not serials:
+            self.log_message("Не выбрано устройство")
+            return
+        # тот же установщик, что и у массовой: потоковый режим и таймаут по размеру
+        self.log_message(f"Установка {os.path.basename(apk)} на {', '.join(serials)}")
+        MassInstall(self.executor, serials, [apk], parallel=len(serials),
+                    on_result=lambda result: self.job_signal.emit(
+                        (lambda r: self.log_message(self.format_install_result(r)), result))
+                    ).start()
 
     # ------------------------------------------------------------------
     #   Вкладка «Массовая установка APK»
@@ -448,17 +1035,52 @@ class XHelperMainWindow(QMainWindow):
         self.progress_bar    = QProgressBar()
         self.progress_bar.setVisible(False)
 
-        self.start_install_btn = QPushButton("Начать установку")
+        # у каждого выбранного устройства – своя очередь; сколько ставят разом
+        parallel_row = QHBoxLayout()
+        parallel_row.addWidget(QLabel("Одновременно устройств:"))
+        self.install_parallel_spin = QSpinBox()
+        self.install_parallel_spin.setRange(1, 32)
+        self.install_parallel_spin.setValue(4)
+        parallel_row.addWidget(self.install_parallel_spin)
+        # потоковая / инкрементальная установка без копии в /data/local/tmp
+        parallel_row.addWidget(QLabel("Режим:"))
+        self.install_mode_combo = QComboBox()
+        for title, mode in (("Авто", "auto"), ("Инкрементальный (.idsig)", "incremental"),
+                            ("Потоковый", "streamed"), ("Классический (push)", "legacy")):
+            self.install_mode_combo.addItem(title, mode)
+        parallel_row.addWidget(self.install_mode_combo)
+        parallel_row.addStretch()
+        # индекс APK папки (пакет, versionCode, SHA‑256) против `pm list packages`
+        self.skip_installed_checkbox = QCheckBox(
+            "Пропускать уже установленные (та же или более новая версия)")
+        self.skip_installed_checkbox.setChecked(True)
+
+        self.install_table = QTableWidget(0, 5)
+        self.install_table.setHorizontalHeaderLabels(
+            ["Устройство", "Прогресс", "Текущий APK", "Успешно", "Ошибки"])
+        self.install_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.install_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.install_table.verticalHeader().setVisible(False)
+
+        self.start_install_btn = QPushButton("Начать установку на выбранные устройства")
         self.start_install_btn.clicked.connect(self.start_mass_installation)
 
         self.stop_install_btn = QPushButton("Остановить установку")
         self.stop_install_btn.clicked.connect(self.stop_mass_installation)
         self.stop_install_btn.setEnabled(False)
 
+        # по журналу install_journal_*.jsonl: только то, что ещё не поставлено
+        self.resume_install_btn = QPushButton("Продолжить прерванную установку…")
+        self.resume_install_btn.clicked.connect(self.resume_mass_installation)
+
         install_layout.addWidget(self.apk_count_label)
+        install_layout.addLayout(parallel_row)
+        install_layout.addWidget(self.skip_installed_checkbox)
         install_layout.addWidget(self.progress_bar)
+        install_layout.addWidget(self.install_table)
         install_layout.addWidget(self.start_install_btn)
         install_layout.addWidget(self.stop_install_btn)
+        install_layout.addWidget(self.resume_install_btn)
 
         layout.addWidget(folder_group)
         layout.addWidget(install_group)
@@ -468,12 +1090,13 @@ class XHelperMainWindow(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Выберите папку с APK")
         if folder:
             self.folder_path.setText(folder)
-            self.apk_files = [
-                os.path.join(folder, f)
-                for f in os.listdir(folder)
-                if f.lower().endswith('.apk')
-            ]
-            self.apk_count_label.setText(f"Найдено APK‑файлов: {len(self.apk_files)}")
+            # *.apk, *.apks / *.xapk и подкаталоги split‑APK – по пакету на элемент
+            self.apk_files = find_packages(folder)
+            bundles = sum(not f.lower().endswith(".apk") for f in self.apk_files)
+            text = f"Найдено APK‑файлов: {len(self.apk_files)}"
+            if bundles:
+                text += f" (из них наборов split‑APK: {bundles})"
+            self.apk_count_label.setText(text)
 
     def start_mass_installation(self):
         if not self.apk_files:
@@ -482,123 +1105,198 @@ class XHelperMainWindow(QMainWindow):
         if self.install_in_progress:
             QMessageBox.information(self, "Информация", "Установка уже запущена")
             return
+        # все выбранные устройства (без выбора – единственное подключённое)
+        serials = [it.text() for it in self.device_list.selectedItems()]
+        if not serials and self.current_serial():
+            serials = [self.current_serial()]
+        if not serials:
+            QMessageBox.warning(self, "Ошибка", "Не выбрано ни одного устройства")
+            return
+        self.run_mass_installation(serials, InstallJournal.create())
 
+    def resume_mass_installation(self):
+        """Продолжает прогон по журналу: те же устройства и APK, без сделанного."""
+        if self.install_in_progress:
+            QMessageBox.information(self, "Информация", "Установка уже запущена")
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Журнал массовой установки", InstallJournal.latest() or "",
+            "Журнал установки (*.jsonl)")
+        if not path:
+            return
+        journal = InstallJournal(path)
+        serials, apk_files = journal.plan()
+        if not serials or not apk_files:
+            QMessageBox.warning(self, "Ошибка", "В журнале нет плана установки")
+            return
+        missing = [apk for apk in apk_files if not os.path.exists(apk)]
+        if missing:
+            self.log_message(f"Из журнала пропали {len(missing)} APK – они не ставятся")
+            apk_files = [apk for apk in apk_files if apk not in missing]
+        offline = [s for s in serials if s not in
+                   {self.device_list.item(i).text() for i in range(self.device_list.count())}]
+        if offline:
+            self.log_message(f"Не подключены: {', '.join(offline)} – их очередь будет с ошибкой")
+        self.apk_files = apk_files
+        self.folder_path.setText(os.path.dirname(apk_files[0]) if apk_files else "")
+        self.run_mass_installation(serials, journal)
+
+    def run_mass_installation(self, serials: list, journal):
+        """Запуск MassInstall на serials по self.apk_files с записью в journal."""
+        if not self.apk_files:
+            QMessageBox.warning(self, "Ошибка", "Нет APK‑файлов для установки")
+            return
         self.install_in_progress = True
-        self.stop_installation = False
         self.progress_bar.setVisible(True)
-        self.progress_bar.setMaximum(len(self.apk_files))
+        self.progress_bar.setMaximum(len(serials) * len(self.apk_files))
         self.progress_bar.setValue(0)
 
-        # подключаем сигнал прогресса к индикатору
-        self.progress_signal.connect(self.progress_bar.setValue)
+        # строка на устройство: прогресс по его очереди, текущий APK, итоги
+        self.install_table.setRowCount(len(serials))
+        self.install_rows = {}
+        for row, serial in enumerate(serials):
+            self.install_rows[serial] = row
+            self.install_table.setItem(row, 0, QTableWidgetItem(serial))
+            bar = QProgressBar()
+            bar.setMaximum(len(self.apk_files))
+            bar.setValue(0)
+            self.install_table.setCellWidget(row, 1, bar)
+            for col in (2, 3, 4):
+                self.install_table.setItem(row, col, QTableWidgetItem("0" if col > 2 else "в очереди"))
 
         self.start_install_btn.setEnabled(False)
+        self.resume_install_btn.setEnabled(False)
         self.stop_install_btn.setEnabled(True)
 
-        self.worker_thread = WorkerThread(self.install_apks_thread)
-        self.worker_thread.log_signal.connect(self.log_message)
-        self.worker_thread.finished_signal.connect(self.mass_installation_finished)
-        self.worker_thread.start()
+        self.install_log = open(f"install_log_{datetime.now():%Y%m%d_%H%M%S}.txt", "w",
+                                encoding="utf-8")
+        self.install_log.write(f"Лог массовой установки – {datetime.now()}\n")
+        self.install_log.write(f"Устройства: {', '.join(serials)}\n")
+        self.install_log.write("=" * 50 + "\n")
+
+        parallel = self.install_parallel_spin.value()
+        index = None
+        if self.skip_installed_checkbox.isChecked():
+            index = ApkIndex.for_folder(self.folder_path.text() or
+                                        os.path.dirname(self.apk_files[0]))
+        self.log_message(f"Начало массовой установки {len(self.apk_files)} APK‑файлов "
+                         f"на {len(serials)} устройств (по {parallel} одновременно)")
+        self.mass_install = MassInstall(
+            self.executor, serials, self.apk_files, parallel=parallel, index=index,
+            mode=self.install_mode_combo.currentData(), journal=journal,
+            on_start=lambda serial, index, apk: self.job_signal.emit(
+                (self.update_install_row, (serial, index, apk))),
+            on_result=lambda result: self.job_signal.emit((self.apply_install_result, result)),
+        )
+        if self.mass_install.resumed:
+            self.log_message(f"Продолжение по журналу {journal.path}: уже сделано "
+                             f"{self.mass_install.resumed} из {len(serials) * len(self.apk_files)}")
+        else:
+            self.log_message(f"Журнал установки: {journal.path}")
+        self.install_log.write(f"Журнал: {journal.path}\n")
+        for row, serial in enumerate(serials):
+            counts = self.mass_install.counts(serial)
+            self.install_table.cellWidget(row, 1).setValue(counts["done"])
+            self.install_table.item(row, 3).setText(str(counts["success"]))
+        self.progress_bar.setValue(self.mass_install.counts()["done"])
+        for handle in self.mass_install.start():
+            handle.add_done_callback(lambda h: self.job_signal.emit((self.mass_installation_done, h)))
 
     def stop_mass_installation(self):
         if self.install_in_progress:
-            self.stop_installation = True
+            self.mass_install.stop()       # прерывает и текущие установки
             self.log_message("Установка прервана пользователем")
             self.stop_install_btn.setEnabled(False)
 
+    def update_install_row(self, payload):
+        """Воркер устройства взялся за очередной APK (GUI‑поток)."""
+        serial, index, apk = payload
+        row = self.install_rows.get(serial)
+        if row is not None:
+            self.install_table.item(row, 2).setText(
+                f"[{index + 1}/{len(self.mass_install.queues[serial])}] {os.path.basename(apk)}")
+
+    @staticmethod
+    def format_install_result(result) -> str:
+        """Строка лога об итоге InstallResult."""
+        name = os.path.basename(result.apk)
+        if result.status == "success":
+            msg = f"УСПЕХ [{result.serial}]: {name} ({result.duration:.1f} с"
+            if result.size:
+                msg += f", {result.size / 1e6:.1f} МБ, {result.rate:.1f} МБ/с, {result.mode}"
+            msg += ")"
+        elif result.status == "skipped":
+            msg = f"ПРОПУЩЕН [{result.serial}]: {name} – {result.details}"
+        elif result.status == "cancelled":
+            msg = f"ПРЕРВАНО [{result.serial}]: {name}"
+        elif result.status == "timeout":
+            msg = f"ТАЙМАУТ [{result.serial}]: {name}"
+        else:
+            msg = f"ОШИБКА [{result.serial}]: {name} – {result.details}"
+        return msg
+
+    def apply_install_result(self, result):
+        """Итог одного APK на одном устройстве: строка таблицы, лог и файл лога."""
+        msg = self.format_install_result(result)
+        self.log_message(msg)
+        self.install_log.write(msg + "\n")
+
+        row = self.install_rows.get(result.serial)
+        if row is None:
+            return
+        counts = self.mass_install.counts(result.serial)
+        self.install_table.cellWidget(row, 1).setValue(counts["done"])
+        self.install_table.item(row, 3).setText(str(counts["success"]))
+        self.install_table.item(row, 4).setText(str(counts["failed"]))
+        self.progress_bar.setValue(self.mass_install.counts()["done"])
+
     def mass_installation_finished(self):
         self.install_in_progress = False
         self.progress_bar.setVisible(False)
-        try:
-            self.progress_signal.disconnect(self.progress_bar.setValue)
-        except TypeError:
-            pass
         self.start_install_btn.setEnabled(True)
+        self.resume_install_btn.setEnabled(True)
         self.stop_install_btn.setEnabled(False)
 
-    def install_apks_thread(self):
-        total = len(self.apk_files)
-        success = 0
-        failed = 0
-        entries = []
-
-        self.log_signal.emit(f"Начало массовой установки {total} APK‑файлов")
-        log_file = f"install_log_{datetime.now():%Y%m%d_%H%M%S}.txt"
-
-        with open(log_file, 'w', encoding='utf-8') as log_f:
-            log_f.write(f"Лог массовой установки – {datetime.now()}\n")
-            log_f.write("=" * 50 + "\n")
-
-            for i, apk_path in enumerate(self.apk_files):
-                if self.stop_installation:
-                    self.log_signal.emit("Установка остановлена пользователем")
-                    break
-
-                self.log_signal.emit(f"[{i+1}/{total}] Устанавливаем {apk_path}")
-
-                try:
-                    result = subprocess.run(
-                        ['adb', 'install', '-r', apk_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=360          # 6 минут максимум
-                    )
-                    if result.returncode == 0:
-                        success += 1
-                        status = "success"
-                        details = "Installed"
-                        msg = f"УСПЕХ: {apk_path}"
-                        self.log_signal.emit(msg)
-                        log_f.write(msg + "\n")
-                    else:
-                        failed += 1
-                        status = "failed"
-                        details = result.stderr.strip()
-                        msg = f"ОШИБКА: {apk_path}\n{details}"
-                        self.log_signal.emit(msg)
-                        log_f.write(msg + "\n")
-                except subprocess.TimeoutExpired:
-                    failed += 1
-                    status = "timeout"
-                    details = "Превышен таймаут (6 мин.)"
-                    msg = f"ТАЙМАУТ: {apk_path}"
-                    self.log_signal.emit(msg)
-                    log_f.write(msg + "\n")
-                except Exception as e:
-                    failed += 1
-                    status = "exception"
-                    details = str(e)
-                    msg = f"ИСКЛЮЧЕНИЕ: {apk_path} – {details}"
-                    self.log_signal.emit(msg)
-                    log_f.write(msg + "\n")
-
-                entries.append({
-                    "package": os.path.basename(apk_path),
-                    "status":  status,
-                    "details": details
-                })
-
-                self.progress_signal.emit(i + 1)
-
-            log_f.write("=" * 50 + "\n")
-            log_f.write(f"Успешно: {success}\n")
-            log_f.write(f"Не удалось: {failed}\n")
-            log_f.write(f"Всего обработано: {success + failed}\n")
-
-        # сохраняем отчёт JSON/HTML
-        report = {
-            "type":      "mass_install",
-            "timestamp": datetime.now().isoformat(),
-            "total":     total,
-            "success":   success,
-            "failed":    failed,
-            "entries":   entries
-        }
-        self.save_report(report, "mass_install_report")
-
-        self.log_signal.emit(f"Установка завершена! Успешно: {success}, Ошибки: {failed}")
-
-        if failed == 0:
+    def mass_installation_done(self, handle):
+        """Завершился воркер одного устройства (GUI‑поток); после последнего – отчёт."""
+        row = self.install_rows.get(handle.serial)
+        if row is not None:
+            self.install_table.item(row, 2).setText(
+                "готово" if handle.status == "done" else handle.status)
+        if handle.status == "failed":
+            self.log_message(f"Массовая установка на {handle.serial} не завершена: {handle.error}")
+        if not self.install_in_progress or not self.mass_install.done():
+            return
+        self.mass_installation_finished()
+
+        counts = self.mass_install.counts()
+        success, failed = counts["success"], counts["failed"]
+        index = self.mass_install.index
+        if index is not None and index.errors:
+            self.log_message(f"Не удалось прочитать манифест {len(index.errors)} APK – "
+                             f"они ставились без проверки версии")
+        self.install_log.write("=" * 50 + "\n")
+        self.install_log.write(f"Успешно: {success}\n")
+        self.install_log.write(f"Пропущено (уже установлены): {counts['skipped']}\n")
+        self.install_log.write(f"Не удалось: {failed}\n")
+        self.install_log.write(f"Всего обработано: {success + failed}\n")
+        for model, speeds in self.mass_install.throughput().items():
+            line = ", ".join(f"{mode} {speed:.1f} МБ/с" for mode, speed in speeds.items())
+            self.install_log.write(f"Скорость, {model}: {line}\n")
+            self.log_message(f"Скорость установки, {model}: {line}")
+        self.install_log.close()
+
+        # сохраняем отчёт JSON/HTML – с матрицей «APK × устройство»
+        self.save_report(self.mass_install.report(), "mass_install_report")
+        self.log_message(f"Установка завершена! Успешно: {success}, "
+                         f"пропущено: {counts['skipped']}, Ошибки: {failed}")
+
+        if self.mass_install.stopped:
+            QMessageBox.information(
+                self, "Остановлено",
+                f"Установка остановлена.\nУспешно: {success}\nОшибки: {failed}"
+            )
+        elif failed == 0:
             QMessageBox.information(self, "Готово", "Все APK‑файлы установлены успешно!")
         else:
             QMessageBox.warning(
@@ -653,8 +1351,17 @@ class XHelperMainWindow(QMainWindow):
         pull_layout.addWidget(browse_pull_btn)
         pull_layout.addWidget(pull_btn)
 
+        # прогресс передачи (по байтам, суммарно по всем устройствам)
+        self.transfer_bar = QProgressBar()
+        self.transfer_bar.setMaximum(1000)
+        self.transfer_bar.setFormat("%p%")
+        self.transfer_bar.setVisible(False)
+        self.transfer_label = QLabel()
+
         layout.addWidget(push_group)
         layout.addWidget(pull_group)
+        layout.addWidget(self.transfer_bar)
+        layout.addWidget(self.transfer_label)
         self.tabs.addTab(file_tab, "Файлы")
 
     def select_push_file(self):
@@ -676,7 +1383,9 @@ class XHelperMainWindow(QMainWindow):
         if not os.path.exists(local):
             QMessageBox.warning(self, "Ошибка", "Локальный файл не найден")
             return
-        self.run_adb_command(f"push {local} {remote}")
+        serials = self.target_serials() or [self.current_serial()]
+        for serial in serials:
+            self.start_transfer("push", local, remote, serial)
 
     def pull_file(self):
         remote = self.pull_remote.text()
@@ -684,7 +1393,52 @@ class XHelperMainWindow(QMainWindow):
         if not remote or not local:
             QMessageBox.warning(self, "Ошибка", "Заполните оба поля")
             return
-        self.run_adb_command(f"pull {remote} {local}")
+        self.start_transfer("pull", remote, local, self.current_serial())
+
+    def start_transfer(self, kind: str, src: str, dst: str, serial=None, on_done=None):
+        """
+        push/pull через sync‑протокол в исполнителе: прогресс по байтам и
+        скорость – на вкладке «Файлы», итог – в лог; on_done(handle) – в GUI‑потоке.
+        """
+        fn = self.adb.pull if kind == "pull" else self.adb.push
+        key = f"{kind}:{serial}:{time.monotonic()}"     # несколько передач на одно устройство
+        progress = TransferRate(lambda done, total, rate: self.transfer_signal.emit(key, done, total, rate))
+        self.transfers[key] = (0, 0, 0.0)
+        self.transfer_bar.setValue(0)
+        self.transfer_bar.setVisible(True)
+        self.log_message(f"{kind}: {src} → {dst}" + (f" ({serial})" if serial else ""))
+
+        def finished(handle):
+            self.transfers.pop(key, None)
+            if handle.status == "done":
+                speed = handle.result / max(handle.duration, 1e-6) / 1e6
+                self.log_message(f"{kind} завершён: {handle.result} байт за "
+                                 f"{handle.duration:.1f} с ({speed:.1f} МБ/с)")
+            else:
+                self.log_message(f"{kind} не выполнен ({handle.status}): {handle.error or ''}")
+            if not self.transfers:
+                self.transfer_bar.setVisible(False)
+            if on_done is not None:
+                on_done(handle)
+
+        return self.executor.submit_blocking(
+            serial, fn, src, dst, serial, progress,
+            description=f"{kind} {src} {dst}",
+            callback=lambda h: self.job_signal.emit((finished, h)),
+        )
+
+    def update_transfer_progress(self, key: str, done, total, rate: float):
+        """Слот transfer_signal: суммарный прогресс всех идущих передач."""
+        if key not in self.transfers:
+            return
+        self.transfers[key] = (done, total, rate)
+        done_all = sum(t[0] for t in self.transfers.values())
+        total_all = sum(t[1] for t in self.transfers.values())
+        rate_all = sum(t[2] for t in self.transfers.values())
+        self.transfer_bar.setValue(int(1000 * done_all / total_all) if total_all else 0)
+        self.transfer_label.setText(
+            f"{done_all / 1e6:.1f} / {total_all / 1e6:.1f} МБ, {rate_all / 1e6:.1f} МБ/с"
+        )
 
     # ------------------------------------------------------------------
     #   Вкладка «Команды» (системные)
@@ -735,14 +1489,91 @@ class XHelperMainWindow(QMainWindow):
             ("Полный дамп системы",                  "bugreport")
         ]
 
+        # бесконечные / огромные выводы идут потоком, а не одной строкой
+        streaming = {"logcat", "logcat *:E", "bugreport"}
+
         for txt, cmd in log_btns:
             btn = QPushButton(txt)
-            btn.clicked.connect(lambda _, c=cmd: self.run_adb_command(c))
+            btn.clicked.connect(lambda _, c=cmd: self.run_adb_command(c, stream=c in streaming))
             log_layout.addWidget(btn)
 
+        stream_controls = QHBoxLayout()
+        self.stream_tee_checkbox = QCheckBox("Дублировать поток в файл")
+        stop_stream_btn = QPushButton("Остановить")
+        stop_stream_btn.clicked.connect(self.stop_streams)
+        clear_stream_btn = QPushButton("Очистить окно")
+        stream_controls.addWidget(self.stream_tee_checkbox)
+        stream_controls.addStretch()
+        stream_controls.addWidget(stop_stream_btn)
+        stream_controls.addWidget(clear_stream_btn)
+        log_layout.addLayout(stream_controls)
+
+        self.stream_view = QPlainTextEdit()
+        self.stream_view.setReadOnly(True)
+        self.stream_view.setMaximumBlockCount(20000)    # старые строки уходят сами
+        self.stream_view.setFont(QFont("Consolas", 9))
+        clear_stream_btn.clicked.connect(self.stream_view.clear)
+        log_layout.addWidget(self.stream_view)
+
+        # вывод потоков забираем пачками, а не на каждый блок из сокета
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setInterval(100)
+        self.stream_timer.timeout.connect(self.flush_streams)
+
         layout.addWidget(log_group)
         self.tabs.addTab(logcat_tab, "Логи")
 
+    def start_stream(self, command: str, serial=None):
+        """
+        Запускает долгую команду потоком: без таймаута, вывод – во вкладку
+        «Логи» пачками раз в 100 мс, при включённом флажке – ещё и в файл.
+        """
+        tee_path = None
+        if self.stream_tee_checkbox.isChecked():
+            tee_path, _ = QFileDialog.getSaveFileName(
+                self, "Куда сохранять вывод",
+                f"{command.split()[0]}_{datetime.now():%Y%m%d_%H%M%S}.txt",
+                "Text Files (*.txt);;All Files (*)"
+            )
+            if not tee_path:
+                return None
+        args = command.split()
+        sink = StreamSink(tee_path)
+        self.log_message(f"Поток: {' '.join(self.adb_client.command_line(args, serial))}"
+                         + (f" → {tee_path}" if tee_path else ""))
+
+        def finished(handle):
+            self.flush_streams()
+            sink.close()
+            self.streams = [(h, s) for h, s in self.streams if h is not handle]
+            if not self.streams:
+                self.stream_timer.stop()
+            if handle.status == "failed":
+                self.log_message(f"Поток {command}: ошибка {handle.error}")
+            else:
+                state = "остановлен" if handle.status == "cancelled" else f"код {handle.result}"
+                self.log_message(f"Поток {command} завершён ({state}), "
+                                 f"{sink.total_bytes / 1e6:.1f} МБ")
+
+        handle = self.executor.submit_stream(args, serial, sink.feed,
+                                             callback=lambda h: self.job_signal.emit((finished, h)))
+        self.streams.append((handle, sink))
+        self.stream_timer.start()
+        return handle
+
+    def flush_streams(self):
+        """Слот stream_timer: дописывает накопившийся вывод всех потоков."""
+        for _handle, sink in self.streams:
+            text = sink.drain()
+            if text:
+                self.stream_view.moveCursor(QTextCursor.MoveOperation.End)
+                self.stream_view.insertPlainText(text)
+
+    def stop_streams(self):
+        """Кнопка «Остановить»: прерывает все потоковые команды."""
+        for handle, _sink in self.streams:
+            handle.cancel()
+
     # ------------------------------------------------------------------
     #   Вкладка «Перезагрузка»
     # ------------------------------------------------------------------
@@ -849,18 +1680,11 @@ class XHelperMainWindow(QMainWindow):
         """Получаем список пользовательских приложений."""
         self.log_message("Запрашиваем список пользовательских приложений...")
         try:
-            result = subprocess.run(
-                ["adb", "shell", "pm", "list", "packages", "-3"],
-                capture_output=True,
-                text=True,
-                check=True,
-                encoding='utf-8',
-                errors='ignore'
-            )
-            if result.stdout:
+            out = self.adb.output("shell pm list packages -3")
+            if out:
                 self.packages = [
                     line.replace("package:", "").strip()
-                    for line in result.stdout.splitlines()
+                    for line in out.splitlines()
                     if line.strip()
                 ]
                 self.log_message(f"Найдено {len(self.packages)} пользовательских приложений")
@@ -893,12 +1717,20 @@ class XHelperMainWindow(QMainWindow):
         self.test_progress.setValue(0)
         self.log_message("Запуск тестирования приложений…")
 
-        self.test_worker_thread = WorkerThread(self.test_applications_thread)
-        self.test_worker_thread.finished_signal.connect(self.app_testing_finished)
-        self.test_worker_thread.start()
+        serial = self.current_serial()
+        packages = list(self.packages)
+        delay = self.delay_spinbox.value()
+        self.test_job = self.submit_job(
+            serial,
+            lambda: self.test_applications(serial, packages, delay),
+            description="app testing",
+            on_done=lambda handle: self.app_testing_finished(),
+        )
 
     def stop_app_testing(self):
         self.testing = False
+        if getattr(self, "test_job", None):
+            self.test_job.cancel()
         self.log_message("Тестирование остановлено пользователем")
 
     def app_testing_finished(self):
@@ -915,22 +1747,22 @@ class XHelperMainWindow(QMainWindow):
             self.delete_selected_btn.setEnabled(False)
             self.delete_all_btn.setEnabled(False)
 
-    def test_applications_thread(self):
+    async def test_applications(self, serial, packages: list, delay: int):
+        """Задание исполнителя: по очереди тестирует пакеты на устройстве `serial`."""
         try:
-            delay = self.delay_spinbox.value()
-            for i, pkg in enumerate(self.packages):
+            for i, pkg in enumerate(packages):
                 if not self.testing:
                     break
 
-                result = self.test_application(pkg)
+                result = await self.test_application(pkg, serial)
 
                 if result["crashed"]:
-                    self.update_app_test_status(i,
-                                                f"Ошибок: {result['error_count']}",
-                                                "red")
+                    self.app_test_status_signal.emit(i,
+                                                     f"Ошибок: {result['error_count']}",
+                                                     "red")
                     self.crashed_apps[pkg] = result
                 else:
-                    self.update_app_test_status(i, "OK", "green")
+                    self.app_test_status_signal.emit(i, "OK", "green")
 
                 self.progress_signal.emit(i + 1)
 
@@ -938,13 +1770,15 @@ class XHelperMainWindow(QMainWindow):
                 for sec in range(delay, 0, -1):
                     if not self.testing:
                         break
-                    self.log_signal.emit(f"Ожидание {sec} сек. перед следующим тестом...")
-                    time.sleep(1)
+                    self.log_signal.emit(f"Ожидание {sec} сек. перед следующим тестом...")
+                    await asyncio.sleep(1)
 
             if self.crashed_apps:
                 self.log_signal.emit(f"Тестирование завершено. Проблемных приложений: {len(self.crashed_apps)}")
             else:
                 self.log_signal.emit("Тестирование завершено. Проблемных приложений не обнаружено")
+        except asyncio.CancelledError:
+            self.log_signal.emit("Тестирование прервано")
         except Exception as e:
             self.log_signal.emit(f"Ошибка в тестировщике: {e}")
 
@@ -957,24 +1791,24 @@ class XHelperMainWindow(QMainWindow):
     def update_test_progress(self, value: int):
         self.test_progress.setValue(value)
 
-    def test_application(self, package_name: str) -> dict:
+    async def test_application(self, package_name: str, serial=None) -> dict:
         """Запуск, сбор логов и проверка падений."""
+        client = self.adb_client
         result = {"crashed": False, "error_count": 0, "name": package_name}
         try:
-            subprocess.run(["adb", "logcat", "-c"], capture_output=True)
+            await client.arun(["logcat", "-c"], serial)
 
-            subprocess.run(
-                ["adb", "shell", "monkey", "-p", package_name,
+            await client.arun(
+                ["shell", "monkey", "-p", package_name,
                  "-c", "android.intent.category.LAUNCHER", "1"],
-                capture_output=True,
+                serial,
                 timeout=5
             )
-            time.sleep(3)
+            await asyncio.sleep(3)
 
-            log = subprocess.run(
-                ["adb", "logcat", "-d", "-v", "brief", "*:E"],
-                capture_output=True,
-                text=True,
+            log = await client.arun(
+                ["logcat", "-d", "-v", "brief", "*:E"],
+                serial,
                 timeout=10
             )
             if log.stdout:
@@ -983,9 +1817,8 @@ class XHelperMainWindow(QMainWindow):
                     result["crashed"]     = True
                     result["error_count"] = err_cnt
 
-            subprocess.run(["adb", "shell", "am", "force-stop", package_name],
-                           capture_output=True)
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            await client.arun(["shell", "am", "force-stop", package_name], serial)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, asyncio.TimeoutError):
             result["crashed"]     = True
             result["error_count"] = 1
         except Exception as e:
@@ -1049,19 +1882,16 @@ class XHelperMainWindow(QMainWindow):
 
     def uninstall_package(self, package_name: str) -> bool:
         try:
-            result = subprocess.run(
-                ["adb", "uninstall", package_name],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            if result.stdout and "Success" in result.stdout:
+            result = self.adb_client.run(["uninstall", package_name], timeout=30)
+            # код возврата настоящий (shell v2 / бинарный adb) – вывод не разбираем
+            if result.returncode == 0:
                 self.log_message(f"Успешно удалено: {package_name}")
                 return True
             else:
-                self.log_message(f"Не удалось удалить {package_name}: {result.stdout or result.stderr}")
+                self.log_message(f"Не удалось удалить {package_name}: "
+                                 f"{(result.stdout + result.stderr).strip()}")
                 return False
-        except subprocess.CalledProcessError as e:
+        except (OSError, subprocess.SubprocessError) as e:
             self.log_message(f"Ошибка удаления {package_name}: {e}")
             return False
 
@@ -1134,31 +1964,32 @@ class XHelperMainWindow(QMainWindow):
         if not file_path:
             return
 
-        try:
+        serial = self.current_serial()
+
+        # PNG пишется в файл кусками прямо из сокета (shell v2, без PTY)
+        def capture():
+            errors = bytearray()
             with open(file_path, "wb") as f:
-                subprocess.run(
-                    ["adb", "exec-out", "screencap", "-p"],
-                    stdout=f,
-                    check=True
-                )
+                code = self.adb.stream("screencap -p", f.write, errors.extend,
+                                       serial=serial, timeout=30)
+            if code != 0:
+                raise RuntimeError(errors.decode("utf-8", "replace").strip() or f"код {code}")
+
+        def finished(handle):
+            if handle.status != "done":
+                self.log_message(f"Ошибка скриншота: {handle.error or handle.status}")
+                QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить скриншот:\n{handle.error}")
+                return
             self.log_message(f"Скриншот сохранён: {file_path}")
             QMessageBox.information(self, "Успех", f"Скриншот сохранён:\n{file_path}")
-        except subprocess.CalledProcessError as e:
-            self.log_message(f"Ошибка скриншота: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить скриншот:\n{e}")
+
+        self.executor.submit_blocking(serial, capture, description="screencap",
+                                      callback=lambda h: self.job_signal.emit((finished, h)))
 
     def check_device_connected(self) -> bool:
-        try:
-            result = subprocess.run(
-                ["adb", "devices"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            lines = result.stdout.strip().splitlines()
-            return any("device" in line for line in lines[1:] if line.strip())
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        """Готово ли текущее устройство (или хоть одно) – по реестру, без запроса."""
+        serial = self.current_serial()
+        return self.device_tracker.is_online(serial)
 
     # ------------------------------------------------------------------
     #   Вкладка «Мониторинг» (CPU, память, батарея, сеть)
@@ -1170,68 +2001,276 @@ class XHelperMainWindow(QMainWindow):
         self.monitor_labels = {
             "Battery": QLabel("Battery: N/A"),
             "CPU":     QLabel("CPU: N/A"),
+            "Cores":   QLabel("Cores: N/A"),
             "Memory":  QLabel("Memory: N/A"),
-            "Network": QLabel("Network: N/A")
+            "Network": QLabel("Network: N/A"),
+            "Interfaces": QLabel("Interfaces: N/A"),
         }
 
         for lbl in self.monitor_labels.values():
             layout.addWidget(lbl)
-
-        self.monitor_timer = QTimer(self)
-        self.monitor_timer.timeout.connect(self.update_monitor)
-        self.monitor_timer.start(5000)   # раз в 5 сек.
+        # сколько стоит один замер (обмен с устройством + разбор)
+        self.monitor_latency_label = QLabel("Замер: –")
+        layout.addWidget(self.monitor_latency_label)
+
+        # история: график выбранного показателя и выгрузка в CSV
+        history = QGroupBox("История")
+        history_layout = QVBoxLayout(history)
+        controls = QHBoxLayout()
+        self.chart_metric = QComboBox()
+        self.chart_metric.currentTextChanged.connect(self.select_chart_metric)
+        self.chart_window = QComboBox()
+        for title, seconds in (("5 мин", 300), ("30 мин", 1800), ("2 ч", 7200), ("4 ч", 14400)):
+            self.chart_window.addItem(title, seconds)
+        self.chart_window.currentIndexChanged.connect(self.select_chart_metric)
+        export_btn = QPushButton("Экспорт CSV…")
+        export_btn.clicked.connect(self.export_metrics)
+        controls.addWidget(QLabel("Показатель:"))
+        controls.addWidget(self.chart_metric, 1)
+        controls.addWidget(self.chart_window)
+        controls.addWidget(export_btn)
+        history_layout.addLayout(controls)
+        self.metric_chart = MetricChart()
+        history_layout.addWidget(self.metric_chart)
+        layout.addWidget(history, 1)
+
+        # раз в 5 сек.; те же источники, что нужны плагинам, читаются один раз
+        # скрытая вкладка продолжает писать историю, но раз в 30 сек.
+        self.monitor_sub = self.subscribe_telemetry(
+            ["battery", "memory", "net", "cpu"], 5.0, self.apply_monitor_snapshot,
+            widget=monitor_tab, idle_interval=30.0)
+        # IP‑адреса почти не меняются: читаем при выборе устройства, раз в
+        # 10 мин. и сразу, как только меняется набор сетевых интерфейсов
+        self.ip_sub = self.subscribe_telemetry(["network"], 600.0, self.apply_ip_snapshot,
+                                               widget=monitor_tab, idle_interval=600.0)
+        self.device_ip = None
 
         self.tabs.addTab(monitor_tab, "Мониторинг")
 
-    def update_monitor(self):
-        """Обновление данных мониторинга."""
-        if not self.check_device_connected():
-            for key, lbl in self.monitor_labels.items():
-                lbl.setText(f"{key}: N/A")
+    def clear_monitor(self):
+        for key, lbl in self.monitor_labels.items():
+            lbl.setText(f"{key}: N/A")
+
+    def apply_ip_snapshot(self, snap):
+        """Кэш IP‑адреса устройства (источник «network» – `ip -f inet addr`)."""
+        if snap.serial == self.current_serial() and "network" in snap.data:
+            self.device_ip = snap.data["network"].get("ip")
+
+    def apply_monitor_snapshot(self, snap):
+        """Раскладывает готовый MonitorSnapshot по меткам (GUI‑поток)."""
+        if snap.errors and not snap.data:
+            self.log_message(f"Мониторинг: ошибка чтения данных устройства: "
+                             f"{next(iter(snap.errors.values()))}")
+            self.clear_monitor()
             return
-
-        # Battery
-        bat = subprocess.run(
-            ["adb", "shell", "dumpsys", "battery"],
-            capture_output=True, text=True
-        ).stdout
-        level = "?"
-        for line in bat.splitlines():
-            if "level:" in line:
-                level = line.split(":")[1].strip()
-                break
-        self.monitor_labels["Battery"].setText(f"Battery: {level}%")
-
-        # CPU – упрощённый вывод (можно расширить)
-        self.monitor_labels["CPU"].setText("CPU: N/A")
-
-        # Memory
-        mem = subprocess.run(
-            ["adb", "shell", "cat", "/proc/meminfo"],
-            capture_output=True, text=True
-        ).stdout
-        total = free = None
-        for line in mem.splitlines():
-            if line.startswith("MemTotal:"):
-                total = line.split(":")[1].strip()
-            elif line.startswith("MemFree:"):
-                free = line.split(":")[1].strip()
-        if total and free:
-            self.monitor_labels["Memory"].setText(f"Memory: {free} free / {total}")
+        self.metrics.record(snap)
+        if snap.serial != self.current_serial():
+            return                       # пока мерили, выбрали другое устройство
+
+        battery = snap.data.get("battery", {})
+        if "level" in battery:
+            text = f"Battery: {battery['level']}%"
+            if "temperature" in battery:
+                text += f", {battery['temperature']:.1f} °C"
+            self.monitor_labels["Battery"].setText(text)
+        else:
+            self.monitor_labels["Battery"].setText("Battery: N/A")
+
+        # CPU – разность счётчиков /proc/stat с прошлым замером
+        cpu = snap.data.get("cpu", {})
+        if cpu:
+            self.monitor_labels["CPU"].setText(
+                f"CPU: {cpu['total']:.0f}% (iowait {cpu['iowait']:.1f}%, irq {cpu['irq']:.1f}%)")
+            self.monitor_labels["Cores"].setText(
+                "Cores: " + "  ".join(f"{name[3:]}: {busy:.0f}%"
+                                      for name, busy in cpu["cores"].items()))
+        else:
+            self.monitor_labels["CPU"].setText("CPU: …")     # первый замер – только база
+            self.monitor_labels["Cores"].setText("Cores: …")
+
+        memory = snap.data.get("memory", {})
+        total = memory.get("MemTotal")
+        free = memory.get("MemAvailable", memory.get("MemFree"))
+        if total and free is not None:
+            self.monitor_labels["Memory"].setText(
+                f"Memory: {free // 1024} MB free / {total // 1024} MB")
         else:
             self.monitor_labels["Memory"].setText("Memory: N/A")
 
-        # Network (IP‑адрес wlan0)
-        ipinfo = subprocess.run(
-            ["adb", "shell", "ip", "-f", "inet", "addr", "show", "wlan0"],
-            capture_output=True, text=True
-        ).stdout
-        ip = "?"
-        for line in ipinfo.splitlines():
-            if "inet " in line:
-                ip = line.strip().split()[1]
-                break
-        self.monitor_labels["Network"].setText(f"Network (wlan0): {ip}")
+        # скорость – разность счётчиков /proc/net/dev; IP – из кэша
+        net = snap.data.get("net", {})
+        if net.get("changed"):
+            self.ip_sub.refresh()        # включили/выключили Wi‑Fi, модем, мобильные данные
+        text = f"Network: {self.device_ip or '?'}"
+        if net:
+            text += f" — ↓ {format_rate(net['rx'])}  ↑ {format_rate(net['tx'])}"
+        self.monitor_labels["Network"].setText(text)
+        active = sorted(net.get("interfaces", {}).items(),
+                        key=lambda item: item[1]["rx"] + item[1]["tx"], reverse=True)
+        if active:
+            self.monitor_labels["Interfaces"].setText("Interfaces: " + "   ".join(
+                f"{name} ↓ {format_rate(info['rx'])} ↑ {format_rate(info['tx'])} "
+                f"(пик ↓ {format_rate(info['rx_peak'])})" for name, info in active[:4]))
+        else:
+            self.monitor_labels["Interfaces"].setText("Interfaces: …")
+
+        stats = self.monitor.latency_stats()
+        self.monitor_latency_label.setText(
+            f"Замер: {snap.latency_ms:.0f} мс (чтение {snap.read_ms:.0f}, разбор "
+            f"{snap.parse_ms:.1f}); медиана {stats['median']:.0f} мс, "
+            f"максимум {stats['max']:.0f} мс")
+        for name, error in snap.errors.items():
+            self.log_message(f"Мониторинг ({name}): {error}")
+        self.update_chart()
+
+    def update_chart(self):
+        """Список показателей устройства и дорисовка графика после замера."""
+        serial = self.current_serial()
+        metrics = self.metrics.metrics(serial)
+        if metrics != [self.chart_metric.itemText(i) for i in range(self.chart_metric.count())]:
+            current = self.chart_metric.currentText() or "cpu.total"
+            self.chart_metric.blockSignals(True)
+            self.chart_metric.clear()
+            self.chart_metric.addItems(metrics)
+            if current in metrics:
+                self.chart_metric.setCurrentText(current)
+            self.chart_metric.blockSignals(False)
+        series = self.metrics.series(serial, self.chart_metric.currentText())
+        if series is not self.metric_chart.series:
+            self.select_chart_metric()
+        else:
+            self.metric_chart.refresh()
+
+    def select_chart_metric(self, *_):
+        serial = self.current_serial()
+        self.metric_chart.set_series(self.metrics.series(serial, self.chart_metric.currentText()),
+                                     self.chart_window.currentData())
+
+    def export_metrics(self):
+        """Вся накопленная история текущего устройства – в CSV."""
+        serial = self.current_serial()
+        if not self.metrics.metrics(serial):
+            QMessageBox.information(self, "Экспорт", "Для этого устройства ещё нет замеров.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Экспорт истории мониторинга",
+            f"monitor_{serial}_{datetime.now():%Y%m%d_%H%M%S}.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            rows = self.metrics.export_csv(path, serial)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить CSV:\n{e}")
+            return
+        self.log_message(f"История мониторинга ({rows} строк) сохранена: {path}")
+
+    # ------------------------------------------------------------------
+    #   Вкладка «Процессы» (диспетчер задач)
+    # ------------------------------------------------------------------
+    def create_task_manager_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        controls = QHBoxLayout()
+        self.process_filter = QLineEdit()
+        self.process_filter.setPlaceholderText("Фильтр по имени процесса / пакета")
+        kill_btn = QPushButton("Завершить процесс (kill)")
+        kill_btn.clicked.connect(self.kill_selected_process)
+        force_stop_btn = QPushButton("Остановить приложение (force-stop)")
+        force_stop_btn.clicked.connect(self.force_stop_selected_process)
+        controls.addWidget(self.process_filter, 1)
+        controls.addWidget(kill_btn)
+        controls.addWidget(force_stop_btn)
+        layout.addLayout(controls)
+
+        # модель обновляется на месте, сортирует и фильтрует прокси
+        self.process_model = ProcessTableModel(self)
+        self.process_proxy = QSortFilterProxyModel(self)
+        self.process_proxy.setSourceModel(self.process_model)
+        self.process_proxy.setSortRole(Qt.ItemDataRole.UserRole)
+        self.process_proxy.setFilterKeyColumn(1)
+        self.process_proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.process_proxy.setDynamicSortFilter(True)
+        self.process_filter.textChanged.connect(self.process_proxy.setFilterFixedString)
+
+        self.process_view = QTableView()
+        self.process_view.setModel(self.process_proxy)
+        self.process_view.setSortingEnabled(True)
+        self.process_view.sortByColumn(3, Qt.SortOrder.DescendingOrder)
+        self.process_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.process_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.process_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.process_view.verticalHeader().setVisible(False)
+        self.process_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.process_view)
+
+        self.process_status = QLabel("Процессы: –")
+        layout.addWidget(self.process_status)
+
+        # /proc/*/stat и statm всех процессов – одним чтением в секунду через шину
+        # (только пока вкладка открыта)
+        self.process_sub = self.subscribe_telemetry(["processes"], 1.0, self.apply_process_snapshot,
+                                                    widget=tab)
+        self.tabs.addTab(tab, "Процессы")
+
+    def apply_process_snapshot(self, snap):
+        if snap.serial != self.current_serial():
+            self.process_model.clear()
+            return
+        if "processes" in snap.errors:
+            self.process_status.setText(f"Процессы: ошибка чтения – {snap.errors['processes']}")
+            return
+        data = snap.data.get("processes")
+        if not data:
+            return
+        self.process_model.update(data["processes"])
+        busy = sum(proc.cpu for proc in data["processes"])
+        self.process_status.setText(
+            f"Процессов: {data['count']}, суммарно CPU {busy:.0f}%, "
+            f"замер {snap.read_ms:.0f} мс + разбор {snap.parse_ms:.0f} мс")
+
+    def selected_process(self):
+        rows = self.process_view.selectionModel().selectedRows()
+        if not rows:
+            QMessageBox.warning(self, "Внимание", "Выберите процесс в таблице.")
+            return None
+        return self.process_model.rows[self.process_proxy.mapToSource(rows[0]).row()]
+
+    def kill_selected_process(self):
+        proc = self.selected_process()
+        if proc is None:
+            return
+        reply = QMessageBox.question(
+            self, "Подтверждение", f"Завершить процесс {proc.name} (PID {proc.pid})?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.run_process_action(f"shell kill {proc.pid}", f"kill {proc.pid} ({proc.name})")
+
+    def force_stop_selected_process(self):
+        proc = self.selected_process()
+        if proc is None:
+            return
+        # процессы приложения называются по пакету: com.app или com.app:service
+        package = proc.name.split(":")[0]
+        if "." not in package or "/" in package:
+            QMessageBox.warning(self, "Внимание",
+                                f"{proc.name} – не процесс приложения, force-stop неприменим.")
+            return
+        self.run_process_action(f"shell am force-stop {package}", f"force-stop {package}")
+
+    def run_process_action(self, command: str, title: str):
+        def finished(handle):
+            result = handle.result if handle.status == "done" else None
+            if result is not None and result.returncode == 0:
+                self.log_message(f"Процессы: {title} – выполнено")
+            else:
+                detail = ((result.stdout + result.stderr).strip() if result is not None
+                          else handle.error or handle.status)
+                self.log_message(f"Процессы: {title} – ошибка: {detail}")
+            self.process_sub.refresh()
+
+        self.adb.submit(command, self.current_serial(), timeout=15,
+                        callback=lambda h: self.job_signal.emit((finished, h)))
 
     # ------------------------------------------------------------------
     #   Вкладка «Wi‑Fi ADB» (tcpip)
@@ -1361,9 +2400,17 @@ class XHelperMainWindow(QMainWindow):
         if not save_path:
             return
         self.log_message(f"Копирование записи в {save_path} …")
-        self.run_adb_command(f"pull /sdcard/xHelper_record.mp4 {save_path}", device_specific=False)
-        self.run_adb_command("shell rm /sdcard/xHelper_record.mp4", device_specific=False)
-        QMessageBox.information(self, "Готово", f"Запись сохранена:\n{save_path}")
+
+        def pulled(handle):
+            if handle.status != "done":
+                QMessageBox.critical(self, "Ошибка", "Не удалось скопировать запись с устройства")
+                return
+            # файл на устройстве удаляем только после успешного pull
+            self.run_adb_command("shell rm /sdcard/xHelper_record.mp4", device_specific=False)
+            QMessageBox.information(self, "Готово", f"Запись сохранена:\n{save_path}")
+
+        self.start_transfer("pull", "/sdcard/xHelper_record.mp4", save_path,
+                            self.current_serial(), on_done=pulled)
         self.save_record_btn.setEnabled(False)
 
     # ------------------------------------------------------------------
@@ -1394,15 +2441,28 @@ class XHelperMainWindow(QMainWindow):
             QMessageBox.information(self, "Инфо", "Скрипт пуст")
             return
 
-        def exec_lines():
-            for cmd in lines:
-                self.log_message(f"Выполняю: {cmd}")
-                self.run_adb_command(cmd, device_specific=True)
-                time.sleep(0.2)
+        # строки выполняются строго по очереди: следующая – после того, как
+        # предыдущая завершилась на всех устройствах
+        def exec_line(index: int = 0):
+            if index >= len(lines):
+                return
+            cmd = lines[index]
+            self.log_message(f"Выполняю: {cmd}")
+            handles = self.run_adb_command(cmd, device_specific=True)
+            if not handles:
+                return
+
+            remaining = [len(handles)]
 
-        self.script_thread = WorkerThread(exec_lines)
-        self.script_thread.log_signal.connect(self.log_message)
-        self.script_thread.start()
+            def line_done(_handle):
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    QTimer.singleShot(200, lambda: exec_line(index + 1))
+
+            for handle in handles:
+                handle.add_done_callback(lambda h: self.job_signal.emit((line_done, h)))
+
+        exec_line()
 
     # ------------------------------------------------------------------
     #   Вкладка «Fastboot»
@@ -1525,9 +2585,33 @@ class XHelperMainWindow(QMainWindow):
 
         # HTML (простейшая таблица)
         try:
+            per_device = any("device" in entry for entry in data.get("entries", []))
             rows = ""
             for entry in data.get("entries", []):
-                rows += f"<tr><td>{entry.get('package','')}</td><td>{entry.get('status','')}</td><td>{entry.get('details','')}</td></tr>\n"
+                device = f"<td>{entry.get('device','')}</td>" if per_device else ""
+                rows += f"<tr><td>{entry.get('package','')}</td>{device}<td>{entry.get('status','')}</td><td>{entry.get('details','')}</td></tr>\n"
+            header = "<th>Пакет</th>" + ("<th>Устройство</th>" if per_device else "")
+            # массовая установка: сводная матрица «APK × устройство»
+            matrix = ""
+            if data.get("matrix"):
+                devices = data.get("devices", [])
+                colors = {"success": "#c8e6c9", "skipped": "#e3f2fd", "cancelled": "#eeeeee",
+                          "": "#ffffff"}
+                matrix = "<h3>APK × устройство</h3>\n<table>\n<tr><th>APK</th>" + "".join(
+                    f"<th>{serial}</th>" for serial in devices) + "</tr>\n"
+                for name, statuses in data["matrix"].items():
+                    matrix += f"<tr><td>{name}</td>" + "".join(
+                        f"<td style=\"background:{colors.get(statuses.get(serial, ''), '#ffcdd2')}\">"
+                        f"{statuses.get(serial, '')}</td>" for serial in devices) + "</tr>\n"
+                matrix += "</table>\n"
+            if data.get("throughput"):
+                # МБ/с по моделям и режимам – сравнить потоковую установку с push
+                matrix += "<h3>Скорость установки, МБ/с</h3>\n<table>\n" \
+                          "<tr><th>Модель</th><th>Режим</th><th>МБ/с</th></tr>\n"
+                for model, speeds in data["throughput"].items():
+                    for mode, speed in speeds.items():
+                        matrix += f"<tr><td>{model}</td><td>{mode}</td><td>{speed}</td></tr>\n"
+                matrix += "</table>\n"
             html = f"""<!DOCTYPE html>
 <html>
 <head>
@@ -1542,8 +2626,8 @@ th {{background:#f2f2f2;}}
 </head>
 <body>
 <h2>{base_name} report – {datetime.now():%Y-%m-%d %H:%M:%S}</h2>
-<table>
-<tr><th>Пакет</th><th>Статус</th><th>Подробности</th></tr>
+{matrix}<table>
+<tr>{header}<th>Статус</th><th>Подробности</th></tr>
 {rows}
 </table>
 </body>
@@ -1587,6 +2671,20 @@ th {{background:#f2f2f2;}}
         self.save_report(report, "app_testing_report")
         QMessageBox.information(self, "Отчёт", "Отчёт о тестировании сохранён в текущей папке.")
 
+    # ------------------------------------------------------------------
+    #   Закрытие окна
+    # ------------------------------------------------------------------
+    def closeEvent(self, event):
+        """Останавливаем исполнитель, закрываем shell‑сессии и соединения с adb‑сервером."""
+        self.telemetry.stop()
+        self.executor.shutdown()
+        self.device_tracker.stop()
+        for _handle, sink in self.streams:
+            sink.close()
+        self.shell_sessions.close_all()
+        self.adb_client.close()
+        super().closeEvent(event)
+
     # ------------------------------------------------------------------
     #   Точка входа
     # ------------------------------------------------------------------
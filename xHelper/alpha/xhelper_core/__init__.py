@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+xhelper_core – «движок» xHelper без зависимостей от Qt.
+
+Здесь живёт всё, что общается с ADB напрямую: клиент протокола
+adb‑сервера, тестовый (фейковый) сервер и вспомогательные структуры.
+Главное окно и плагины пользуются этими модулями через атрибуты
+XHelperMainWindow, а не импортируют их сами.
+"""
+
+from .adb_client import AdbClient, AdbError
+from .adb_service import AdbService, ShellBatch
+from .adb_sync import AdbSync, SyncConnection, SyncEntry, TransferRate
+from .apk_bundle import ApkBundle, load_bundle
+from .apk_index import ApkIndex, ApkInfo
+from .cpu_stat import CpuUsage
+from .device_props import DeviceProperties, PropertyRegistry
+from .device_tracker import DeviceEvent, DeviceTracker
+from .executor import AdbExecutor, JobHandle
+from .install_journal import InstallJournal
+from .installer import InstallResult, MassInstall
+from .monitor import MonitorSampler, MonitorSnapshot
+from .net_stat import NetUsage
+from .procstat import ProcessInfo, ProcessUsage
+from .result_cache import ResultCache
+from .shell_session import ShellSession, ShellSessionPool
+from .telemetry import Subscription, TelemetryBus
+from .thermal import ThermalEvent, ThermalMonitor
+from .timeseries import MetricStore, RingSeries
+
+__all__ = [
+    "AdbClient",
+    "AdbError",
+    "AdbExecutor",
+    "AdbService",
+    "AdbSync",
+    "ApkBundle",
+    "ApkIndex",
+    "ApkInfo",
+    "CpuUsage",
+    "DeviceEvent",
+    "DeviceProperties",
+    "DeviceTracker",
+    "InstallJournal",
+    "InstallResult",
+    "JobHandle",
+    "MassInstall",
+    "MetricStore",
+    "MonitorSampler",
+    "MonitorSnapshot",
+    "NetUsage",
+    "ProcessInfo",
+    "ProcessUsage",
+    "PropertyRegistry",
+    "ResultCache",
+    "RingSeries",
+    "ShellBatch",
+    "ShellSession",
+    "ShellSessionPool",
+    "Subscription",
+    "SyncConnection",
+    "SyncEntry",
+    "TelemetryBus",
+    "ThermalEvent",
+    "ThermalMonitor",
+    "TransferRate",
+    "load_bundle",
+]
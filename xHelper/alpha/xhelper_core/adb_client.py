@@ -0,0 +1,726 @@
+# -*- coding: utf-8 -*-
+"""
+adb_client – клиент «smart‑socket» протокола adb‑сервера.
+
+Вместо того чтобы запускать процесс `adb` на каждую команду, клиент
+подключается к уже работающему adb‑серверу (127.0.0.1:5037) по TCP и
+разговаривает с ним напрямую:
+
+    host:version, host:devices-l   – служебные запросы сервера;
+    host:transport:<serial>        – переключение сокета на устройство;
+    shell:<cmd>, exec:<cmd>        – сервисы самого устройства;
+    shell,v2,raw:<cmd>             – shell v2: раздельные stdout/stderr и
+                                     настоящий код возврата (см. shell_protocol).
+
+Каждый сервис «съедает» свой сокет (сервер закрывает его по окончании),
+поэтому пул держит несколько заранее открытых соединений, готовых к
+следующему запросу. Если сервер не запущен, клиент прозрачно
+переключается на бинарный `adb` (он же заодно и поднимет сервер).
+
+Результаты возвращаются как `subprocess.CompletedProcess`, чтобы код,
+написанный под `subprocess.run`, работал без изменений. Для asyncio есть
+асинхронные варианты (`arun`, `aopen_service`) – ими пользуется
+AdbExecutor.
+"""
+
+import asyncio
+import os
+import select
+import shlex
+import socket
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+from . import shell_protocol
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5037
+
+
+class AdbError(Exception):
+    """Ответ FAIL от adb‑сервера или нарушение протокола."""
+
+
+# ----------------------------------------------------------------------
+#   Низкоуровневые операции протокола
+# ----------------------------------------------------------------------
+def send_request(sock: socket.socket, payload: str):
+    """Отправляет запрос в формате «<4 hex‑цифры длины><payload>»."""
+    data = payload.encode("utf-8")
+    sock.sendall(b"%04x" % len(data) + data)
+
+
+def read_exact(sock: socket.socket, size: int) -> bytes:
+    """Читает ровно `size` байт или бросает AdbError при обрыве."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise AdbError("adb‑сервер неожиданно закрыл соединение")
+        buf += chunk
+    return bytes(buf)
+
+
+def read_length_prefixed(sock: socket.socket) -> bytes:
+    """Читает блок «<4 hex‑цифры длины><данные>»."""
+    length = int(read_exact(sock, 4), 16)
+    return read_exact(sock, length)
+
+
+def read_status(sock: socket.socket):
+    """Ждёт OKAY; на FAIL бросает AdbError с текстом сервера."""
+    status = read_exact(sock, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        raise AdbError(read_length_prefixed(sock).decode("utf-8", "replace"))
+    raise AdbError(f"Неожиданный ответ adb‑сервера: {status!r}")
+
+
+def _recv_until(sock: socket.socket, deadline: Optional[float]) -> bytes:
+    """Один recv() с учётом общего дедлайна (time.monotonic())."""
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("timed out")
+        sock.settimeout(remaining)
+    return sock.recv(65536)
+
+
+def read_until_close(sock: socket.socket, deadline: Optional[float]) -> bytes:
+    """Читает поток до закрытия сокета; `deadline` – time.monotonic()."""
+    chunks = []
+    while True:
+        chunk = _recv_until(sock, deadline)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def _dispatch_shell_packet(packet_id: int, payload: bytes, stdout: Callable,
+                           stderr: Callable, returncode: Optional[int]) -> Optional[int]:
+    """Раздаёт пакет shell v2 по потокам; возвращает код выхода, если он пришёл."""
+    if packet_id == shell_protocol.ID_STDOUT:
+        stdout(payload)
+    elif packet_id == shell_protocol.ID_STDERR:
+        stderr(payload)
+    elif packet_id == shell_protocol.ID_EXIT and payload:
+        return payload[0]
+    return returncode
+
+
+def _read_shell_v2(sock: socket.socket, deadline: Optional[float],
+                   stdout: Callable, stderr: Callable) -> int:
+    """Читает пакеты shell v2 до кадра exit; обрыв без него – код 255."""
+    decoder = shell_protocol.PacketDecoder()
+    returncode = None
+    while returncode is None:
+        chunk = _recv_until(sock, deadline)
+        if not chunk:
+            break
+        for packet_id, payload in decoder.feed(chunk):
+            returncode = _dispatch_shell_packet(packet_id, payload, stdout, stderr, returncode)
+    return 255 if returncode is None else returncode
+
+
+def _shell_v2_result(argv: list, returncode: Optional[int], out: bytearray,
+                     err: bytearray, text: bool) -> subprocess.CompletedProcess:
+    returncode = 255 if returncode is None else returncode
+    if text:
+        return subprocess.CompletedProcess(argv, returncode, out.decode("utf-8", "replace"),
+                                           err.decode("utf-8", "replace"))
+    return subprocess.CompletedProcess(argv, returncode, bytes(out), bytes(err))
+
+
+async def aread_exact(reader: asyncio.StreamReader, size: int) -> bytes:
+    """Асинхронный вариант read_exact."""
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        raise AdbError("adb‑сервер неожиданно закрыл соединение")
+
+
+async def aread_status(reader: asyncio.StreamReader):
+    """Асинхронный вариант read_status."""
+    status = await aread_exact(reader, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        length = int(await aread_exact(reader, 4), 16)
+        raise AdbError((await aread_exact(reader, length)).decode("utf-8", "replace"))
+    raise AdbError(f"Неожиданный ответ adb‑сервера: {status!r}")
+
+
+def parse_devices(raw: str) -> list:
+    """
+    Разбирает вывод `adb devices -l` / `host:devices-l`.
+
+    Возвращает список словарей вида
+    {'serial': 'emulator-5554', 'state': 'device', 'model': 'Pixel_7', …}.
+    """
+    devices = []
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line or line.startswith("List of devices") or line.startswith("*"):
+            continue
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        entry = {"serial": parts[0], "state": parts[1]}
+        for attr in parts[2:]:
+            if ":" in attr:
+                key, val = attr.split(":", 1)
+                entry[key] = val
+        devices.append(entry)
+    return devices
+
+
+def _socket_is_idle(sock: socket.socket) -> bool:
+    """Простаивающий сокет не должен быть «читаемым» – иначе сервер его закрыл."""
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return not readable
+    except (OSError, ValueError):
+        return False
+
+
+# ----------------------------------------------------------------------
+#   Пул заранее открытых соединений
+# ----------------------------------------------------------------------
+class _SocketPool:
+    """
+    Держит `size` уже установленных TCP‑соединений с adb‑сервером.
+
+    Соединение одноразовое (после сервиса сервер его закрывает), поэтому
+    пул не «возвращает» сокеты, а только пополняется после каждого запроса,
+    когда результат уже получен.
+    """
+
+    def __init__(self, host: str, port: int, size: int = 2, connect_timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.connect_timeout = connect_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def get(self) -> socket.socket:
+        with self._lock:
+            while self._idle:
+                sock = self._idle.pop()
+                if _socket_is_idle(sock):
+                    return sock
+                sock.close()
+        return self._connect()
+
+    def prefill(self):
+        with self._lock:
+            missing = self.size - len(self._idle)
+        for _ in range(missing):
+            try:
+                sock = self._connect()
+            except OSError:
+                return
+            with self._lock:
+                self._idle.append(sock)
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock in idle:
+            sock.close()
+
+
+# ----------------------------------------------------------------------
+#   Клиент
+# ----------------------------------------------------------------------
+class AdbClient:
+    """
+    Клиент adb‑сервера с откатом на бинарный `adb`.
+
+    Пример:
+        client = AdbClient()
+        client.run(["shell", "getprop", "ro.product.model"], serial="emulator-5554")
+    """
+
+    # через сколько секунд снова пробовать сервер после отказа в соединении
+    RETRY_NATIVE_AFTER = 5.0
+
+    def __init__(self, adb_path: str = "adb", host: str = DEFAULT_HOST,
+                 port: Optional[int] = None, pool_size: int = 2):
+        if port is None:
+            port = int(os.environ.get("ANDROID_ADB_SERVER_PORT", DEFAULT_PORT))
+        self.adb_path = adb_path
+        self._pool = _SocketPool(host, port, size=pool_size)
+        self._native_down_until = 0.0
+        # callable(serial, args) – вызываются перед каждой run()/arun()
+        # (через них кэш ответов узнаёт о командах, меняющих устройство)
+        self.command_hooks = []
+        self._features = {}
+
+    # ------------------------------------------------------------------
+    #   Соединение с сервером
+    # ------------------------------------------------------------------
+    def _connect(self) -> socket.socket:
+        if time.monotonic() < self._native_down_until:
+            raise ConnectionRefusedError("adb‑сервер недоступен")
+        try:
+            return self._pool.get()
+        except OSError as e:
+            self._native_down_until = time.monotonic() + self.RETRY_NATIVE_AFTER
+            # любая ошибка соединения с сервером – «недоступен»: команда ещё
+            # не ушла, и run() может безопасно повторить её бинарником
+            if isinstance(e, ConnectionRefusedError):
+                raise
+            raise ConnectionRefusedError(f"adb‑сервер недоступен: {e}") from e
+
+    def server_available(self) -> bool:
+        """True, если adb‑сервер принимает соединения."""
+        try:
+            sock = self._connect()
+        except OSError:
+            return False
+        sock.close()
+        self._pool.prefill()
+        return True
+
+    def close(self):
+        """Закрывает простаивающие соединения пула."""
+        self._pool.clear()
+
+    def command_line(self, args: list, serial: Optional[str] = None) -> list:
+        """Эквивалентная командная строка бинарного adb (для логов и отката)."""
+        return [self.adb_path] + (["-s", serial] if serial else []) + list(args)
+
+    def host_request(self, request: str, timeout: float = 10.0) -> bytes:
+        """Запрос `host:*`, на который сервер отвечает OKAY + блок данных."""
+        sock = self._connect()
+        try:
+            sock.settimeout(timeout)
+            send_request(sock, request)
+            read_status(sock)
+            return read_length_prefixed(sock)
+        finally:
+            sock.close()
+            self._pool.prefill()
+
+    def track_devices(self, long: bool = True) -> socket.socket:
+        """
+        Подписка `host:track-devices(-l)`: сокет, в который сервер пишет
+        блок «<длина><список устройств>» сразу и при каждом изменении.
+        """
+        sock = self._connect()
+        try:
+            sock.settimeout(10.0)
+            send_request(sock, "host:track-devices-l" if long else "host:track-devices")
+            read_status(sock)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            self._pool.prefill()
+        return sock
+
+    def open_service(self, serial: Optional[str], service: str,
+                     timeout: float = 10.0) -> socket.socket:
+        """
+        Переключает новое соединение на устройство и открывает на нём сервис
+        (`shell:…`, `exec:…`, `sync:` …). Возвращает сокет с потоком сервиса.
+        """
+        serial = serial or os.environ.get("ANDROID_SERIAL")
+        sock = self._connect()
+        try:
+            sock.settimeout(timeout)
+            send_request(sock, f"host:transport:{serial}" if serial else "host:transport-any")
+            read_status(sock)
+            send_request(sock, service)
+            read_status(sock)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            self._pool.prefill()
+        return sock
+
+    # ------------------------------------------------------------------
+    #   Высокоуровневые запросы
+    # ------------------------------------------------------------------
+    def version(self) -> int:
+        """Версия протокола adb‑сервера."""
+        return int(self.host_request("host:version"), 16)
+
+    def features(self, serial: Optional[str] = None) -> set:
+        """
+        Возможности устройства (`stat_v2`, `ls_v2`, `shell_v2` …). Ответ
+        запоминается на время жизни клиента; старые серверы дают пустое множество.
+        """
+        serial = serial or os.environ.get("ANDROID_SERIAL")
+        cached = self._features.get(serial)
+        if cached is not None:
+            return cached
+        request = f"host-serial:{serial}:features" if serial else "host:features"
+        try:
+            raw = self.host_request(request).decode("utf-8", "replace")
+        except AdbError:
+            raw = ""
+        features = {f for f in raw.strip().split(",") if f}
+        self._features[serial] = features
+        return features
+
+    def forget_features(self, serial: Optional[str] = None):
+        """Сбрасывает запомненные возможности (после переподключения устройства)."""
+        if serial is None:
+            self._features.clear()
+        else:
+            self._features.pop(serial, None)
+
+    def devices(self) -> list:
+        """Список устройств (см. parse_devices); через сервер или `adb devices -l`."""
+        try:
+            raw = self.host_request("host:devices-l").decode("utf-8", "replace")
+        except OSError:
+            raw = self._run_binary(self.command_line(["devices", "-l"]), 15, True).stdout
+        return parse_devices(raw)
+
+    def supports_shell_v2(self, serial: Optional[str] = None) -> bool:
+        """Понимает ли устройство shell v2 (False, если сервер недоступен)."""
+        try:
+            return "shell_v2" in self.features(serial)
+        except OSError:
+            return False
+
+    def shell(self, serial: Optional[str], command: str, timeout: float = 30.0,
+              text: bool = True) -> subprocess.CompletedProcess:
+        """
+        Выполняет команду на устройстве и возвращает весь вывод. Через
+        shell v2 stdout и stderr приходят раздельно, а returncode – код
+        выхода команды; на старых устройствах – `shell:` (код всегда 0).
+        """
+        argv = self.command_line(["shell", command], serial)
+        if self.supports_shell_v2(serial):
+            return self._run_shell_v2(serial, command, argv, timeout, text)
+        return self._run_service(serial, f"shell:{command}", argv, timeout, text)
+
+    def shell_stream(self, serial: Optional[str], command: str,
+                     stdout: Callable, stderr: Optional[Callable] = None,
+                     timeout: Optional[float] = None) -> int:
+        """
+        Потоковый вывод без декодирования: stdout(bytes)/stderr(bytes)
+        вызываются по мере прихода данных, возвращается код выхода.
+
+            with open("screen.png", "wb") as f:
+                client.shell_stream(serial, "screencap -p", f.write)
+
+        Без shell v2 идёт через `exec:` (stderr не отделяется, код 0).
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        if not self.supports_shell_v2(serial):
+            sock = self.open_service(serial, f"exec:{command}", timeout or 10.0)
+            try:
+                while True:
+                    chunk = _recv_until(sock, deadline)
+                    if not chunk:
+                        return 0
+                    stdout(chunk)
+            finally:
+                sock.close()
+        sock = self.open_service(serial, shell_protocol.service_name(command), timeout or 10.0)
+        try:
+            sock.sendall(shell_protocol.encode_packet(shell_protocol.ID_CLOSE_STDIN))
+            return _read_shell_v2(sock, deadline, stdout, stderr or (lambda _data: None))
+        finally:
+            sock.close()
+
+    def exec_out(self, serial: Optional[str], command: str, timeout: float = 30.0,
+                 text: bool = False) -> subprocess.CompletedProcess:
+        """Выполняет `exec:<command>` – «сырой» вывод без PTY (например, screencap)."""
+        argv = self.command_line(["exec-out", command], serial)
+        return self._run_service(serial, f"exec:{command}", argv, timeout, text)
+
+    def notify(self, serial: Optional[str], args: list):
+        """Сообщает command_hooks о команде (её можно выполнить и в обход run())."""
+        for hook in self.command_hooks:
+            hook(serial, args)
+
+    def run(self, args: list, serial: Optional[str] = None, timeout: float = 30.0,
+            text: bool = True) -> subprocess.CompletedProcess:
+        """
+        Аналог `subprocess.run(["adb", "-s", serial] + args)`.
+
+        `shell`, `exec-out` и `devices` идут через протокол сервера, всё
+        остальное (install, push, pull, reboot…) и любые команды при
+        недоступном сервере – через бинарный adb. Бинарником повторяется
+        только то, что не дошло до сервера (ConnectionRefusedError): обрыв
+        уже открытого сервиса – исключение, иначе `rm` или `uninstall`
+        выполнились бы дважды.
+        """
+        args = list(args)
+        self.notify(serial, args)
+        argv = self.command_line(args, serial)
+        native = len(args) > 1 and not args[1].startswith("-")
+        try:
+            if native and args[0] == "shell":
+                return self.shell(serial, " ".join(args[1:]), timeout, text)
+            if args[0] == "uninstall" and self._native_uninstall(serial):
+                # как делает сам adb: `cmd package uninstall`, но код возврата
+                # приходит кадром shell v2 – без поиска «Success» в выводе
+                command = "cmd package " + " ".join(args)
+                return self._run_shell_v2(serial, command, argv, timeout, text)
+            if native and args[0] == "exec-out":
+                return self.exec_out(serial, " ".join(args[1:]), timeout, text)
+            if args in (["devices"], ["devices", "-l"]):
+                raw = self.host_request(
+                    "host:devices-l" if len(args) > 1 else "host:devices", timeout
+                ).decode("utf-8", "replace")
+                out = "List of devices attached\n" + raw + "\n"
+                return subprocess.CompletedProcess(argv, 0, out if text else out.encode(), "" if text else b"")
+        except ConnectionRefusedError:
+            pass   # сервер недоступен – пробуем бинарник
+        return self._run_binary(argv, timeout, text)
+
+    # ------------------------------------------------------------------
+    #   Асинхронные варианты (для asyncio‑цикла AdbExecutor)
+    # ------------------------------------------------------------------
+    async def aopen_service(self, serial: Optional[str], service: str) -> tuple:
+        """Как open_service, но возвращает пару (StreamReader, StreamWriter)."""
+        if time.monotonic() < self._native_down_until:
+            raise ConnectionRefusedError("adb‑сервер недоступен")
+        serial = serial or os.environ.get("ANDROID_SERIAL")
+        try:
+            reader, writer = await asyncio.open_connection(self._pool.host, self._pool.port)
+        except OSError:
+            self._native_down_until = time.monotonic() + self.RETRY_NATIVE_AFTER
+            raise
+        try:
+            for request in (f"host:transport:{serial}" if serial else "host:transport-any", service):
+                data = request.encode("utf-8")
+                writer.write(b"%04x" % len(data) + data)
+                await writer.drain()
+                await aread_status(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def arun(self, args: list, serial: Optional[str] = None,
+                   timeout: Optional[float] = 30.0,
+                   text: bool = True) -> subprocess.CompletedProcess:
+        """Асинхронный вариант run(); отмена задачи прерывает команду."""
+        args = list(args)
+        self.notify(serial, args)
+        argv = self.command_line(args, serial)
+        if len(args) > 1 and not args[1].startswith("-") and args[0] in ("shell", "exec-out"):
+            service = ("shell:" if args[0] == "shell" else "exec:") + " ".join(args[1:])
+            try:
+                if args[0] == "shell" and "shell_v2" in await self._afeatures(serial):
+                    return await self._arun_shell_v2(serial, " ".join(args[1:]), argv, timeout, text)
+                return await self._arun_service(serial, service, argv, timeout, text)
+            except ConnectionRefusedError:
+                pass   # сервер недоступен – пробуем бинарник
+        if args[0] == "uninstall" and {"shell_v2", "cmd"} <= await self._afeatures(serial):
+            command = "cmd package " + " ".join(args)
+            try:
+                return await self._arun_shell_v2(serial, command, argv, timeout, text)
+            except ConnectionRefusedError:
+                pass
+        return await self._arun_binary(argv, timeout, text)
+
+    async def astream(self, args: list, serial: Optional[str], on_data: Callable) -> int:
+        """
+        Долгая команда (`logcat`, `bugreport`, `shell top -d 1` …) без
+        таймаута: вывод по мере поступления уходит в on_data(bytes) и не
+        копится в памяти. Возвращает код выхода; отмена задачи закрывает
+        поток (уже отданные данные остаются у получателя).
+        """
+        args = list(args)
+        self.notify(serial, args)
+        command = None
+        if args[0] == "shell" and len(args) > 1 and not args[1].startswith("-"):
+            command = " ".join(args[1:])
+        elif args[0] in ("logcat", "bugreport"):
+            # как adb: аргументы экранируются, иначе sh раскроет «*:E»
+            command = " ".join(shlex.quote(a) for a in args)
+        if command is not None:
+            try:
+                v2 = "shell_v2" in await self._afeatures(serial)
+                service = shell_protocol.service_name(command) if v2 else f"shell:{command}"
+                reader, writer = await self.aopen_service(serial, service)
+            except ConnectionRefusedError:
+                pass       # сервер недоступен – бинарник
+            else:
+                try:
+                    if not v2:
+                        while True:
+                            chunk = await reader.read(65536)
+                            if not chunk:
+                                return 0
+                            on_data(chunk)
+                    writer.write(shell_protocol.encode_packet(shell_protocol.ID_CLOSE_STDIN))
+                    await writer.drain()
+                    decoder = shell_protocol.PacketDecoder()
+                    returncode = None
+                    while returncode is None:
+                        chunk = await reader.read(65536)
+                        if not chunk:
+                            return 255
+                        for packet_id, payload in decoder.feed(chunk):
+                            returncode = _dispatch_shell_packet(packet_id, payload, on_data,
+                                                                on_data, returncode)
+                    return returncode
+                finally:
+                    writer.close()
+
+        proc = await asyncio.create_subprocess_exec(
+            *self.command_line(args, serial),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        )
+        try:
+            while True:
+                chunk = await proc.stdout.read(65536)
+                if not chunk:
+                    break
+                on_data(chunk)
+            return await proc.wait()
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    async def _afeatures(self, serial: Optional[str]) -> set:
+        # features() блокирующий – первый запрос уходит в пул потоков
+        cached = self._features.get(serial or os.environ.get("ANDROID_SERIAL"))
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self.features, serial)
+        except OSError:
+            return set()
+
+    async def _arun_shell_v2(self, serial, command, argv, timeout, text):
+        try:
+            reader, writer = await asyncio.wait_for(
+                self.aopen_service(serial, shell_protocol.service_name(command)), 10.0)
+        except AdbError as e:
+            err = f"error: {e}\n"
+            return subprocess.CompletedProcess(argv, 1, "" if text else b"", err if text else err.encode())
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        out, err = bytearray(), bytearray()
+        decoder = shell_protocol.PacketDecoder()
+        returncode = None
+
+        async def pump():
+            nonlocal returncode
+            writer.write(shell_protocol.encode_packet(shell_protocol.ID_CLOSE_STDIN))
+            await writer.drain()
+            while returncode is None:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                for packet_id, payload in decoder.feed(chunk):
+                    returncode = _dispatch_shell_packet(packet_id, payload, out.extend,
+                                                        err.extend, returncode)
+        try:
+            await asyncio.wait_for(pump(), timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        finally:
+            writer.close()
+        return _shell_v2_result(argv, returncode, out, err, text)
+
+    async def _arun_service(self, serial, service, argv, timeout, text):
+        empty = "" if text else b""
+        try:
+            reader, writer = await asyncio.wait_for(self.aopen_service(serial, service), 10.0)
+        except AdbError as e:
+            err = f"error: {e}\n"
+            return subprocess.CompletedProcess(argv, 1, empty, err if text else err.encode())
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        try:
+            data = await asyncio.wait_for(reader.read(), timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        finally:
+            writer.close()
+        out = data.decode("utf-8", "replace") if text else data
+        return subprocess.CompletedProcess(argv, 0, out, empty)
+
+    async def _arun_binary(self, argv, timeout, text):
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(argv, timeout)
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+        if text:
+            out = out.decode("utf-8", "replace")
+            err = err.decode("utf-8", "replace")
+        return subprocess.CompletedProcess(argv, proc.returncode, out, err)
+
+    # ------------------------------------------------------------------
+    #   Внутреннее
+    # ------------------------------------------------------------------
+    def _run_service(self, serial, service, argv, timeout, text):
+        empty = "" if text else b""
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            sock = self.open_service(serial, service, timeout or 10.0)
+        except AdbError as e:
+            err = f"error: {e}\n"
+            return subprocess.CompletedProcess(argv, 1, empty, err if text else err.encode())
+        except ConnectionRefusedError:
+            return self._run_binary(argv, timeout, text)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        try:
+            data = read_until_close(sock, deadline)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        finally:
+            sock.close()
+        out = data.decode("utf-8", "replace") if text else data
+        return subprocess.CompletedProcess(argv, 0, out, empty)
+
+    def _native_uninstall(self, serial) -> bool:
+        try:
+            return {"shell_v2", "cmd"} <= self.features(serial)
+        except OSError:
+            return False
+
+    def _run_shell_v2(self, serial, command, argv, timeout, text):
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            sock = self.open_service(serial, shell_protocol.service_name(command), timeout or 10.0)
+        except AdbError as e:
+            err = f"error: {e}\n"
+            return subprocess.CompletedProcess(argv, 1, "" if text else b"", err if text else err.encode())
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        out, err = bytearray(), bytearray()
+        try:
+            sock.sendall(shell_protocol.encode_packet(shell_protocol.ID_CLOSE_STDIN))
+            returncode = _read_shell_v2(sock, deadline, out.extend, err.extend)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(argv, timeout)
+        finally:
+            sock.close()
+        return _shell_v2_result(argv, returncode, out, err, text)
+
+    def _run_binary(self, argv, timeout, text):
+        kwargs = {"encoding": "utf-8", "errors": "replace"} if text else {}
+        return subprocess.run(argv, capture_output=True, timeout=timeout, **kwargs)
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""
+adb_service – единая точка доступа к ADB для главного окна и плагинов.
+
+Раньше каждый плагин держал свою копию `_run_adb` со своим таймаутом, без
+выбора устройства и без переиспользования соединений. Теперь всё идёт через
+`main_window.adb`:
+
+    out = main_window.adb.output("shell pm list packages -3")
+    res = main_window.adb.run(["pull", remote, local], timeout=120)
+    txt = main_window.adb.query("shell dumpsys battery", tag="Battery")
+    job = main_window.adb.submit("shell getprop", callback=on_done)
+    main_window.adb.pull("/sdcard/DCIM", "C:/backup", progress=cb)
+    bat, mem = main_window.adb.run_batch(["dumpsys battery", "cat /proc/meminfo"])
+    if main_window.adb.props.get().sdk >= 30: ...
+
+Сервис сам выбирает устройство (по умолчанию – текущее в главном окне),
+пускает короткие `shell …` через постоянные shell‑сессии, кэширует ответы
+на «читающие» команды (см. result_cache) и ведёт статистику вызовов, так
+что любое ускорение транспорта сразу достаётся всем плагинам.
+"""
+
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, Union
+
+from .adb_client import AdbClient
+from .adb_sync import AdbSync, SyncEntry
+from .device_props import PropertyRegistry
+from .executor import AdbExecutor, JobHandle
+from .result_cache import ResultCache, normalize
+from .shell_session import ShellSessionPool
+
+Command = Union[str, list]
+
+
+class AdbCallStats:
+    """Накопленная статистика по одному виду команд (`shell dumpsys`, `pull`, …)."""
+
+    __slots__ = ("calls", "errors", "total_time", "max_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls":     self.calls,
+            "errors":    self.errors,
+            "mean_ms":   round(self.mean_time * 1000, 1),
+            "max_ms":    round(self.max_time * 1000, 1),
+        }
+
+
+class ShellBatch:
+    """
+    Накопитель shell‑команд от нескольких потребителей (вкладка, плагины):
+    каждый добавляет свои команды, run() отправляет всё одним обменом и
+    раздаёт результаты обратно – в колбэки и в слоты по индексу.
+
+        batch = main_window.adb.batch()
+        i = batch.add("cat /proc/meminfo")
+        batch.add("dumpsys battery", callback=on_battery)
+        batch.run(); mem = batch.stdout(i)
+    """
+
+    def __init__(self, service: "AdbService", serial: Optional[str] = None,
+                 timeout: float = 10.0):
+        self.service = service
+        self.serial = serial
+        self.timeout = timeout
+        self.commands = []
+        self.results = []
+        self._callbacks = []
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def add(self, command: str, callback: Optional[Callable] = None) -> int:
+        """Добавляет команду (без префикса `shell`); возвращает её индекс."""
+        self.commands.append(command)
+        self._callbacks.append(callback)
+        return len(self.commands) - 1
+
+    def run(self) -> list:
+        """Выполняет пакет; callback(result) зовутся в вызывающем потоке."""
+        self.results = self.service.run_batch(self.commands, self.serial, timeout=self.timeout)
+        for callback, result in zip(self._callbacks, self.results):
+            if callback is not None:
+                callback(result)
+        return self.results
+
+    def stdout(self, index: int) -> str:
+        """Вывод команды `index` (пустая строка, если она завершилась с ошибкой)."""
+        result = self.results[index]
+        return result.stdout if result.returncode == 0 else ""
+
+
+class AdbService:
+    """
+    :param client:          AdbClient главного окна
+    :param sessions:        пул постоянных shell‑сессий
+    :param executor:        asyncio‑исполнитель для фоновых заданий
+    :param serial_provider: callable() -> serial|None – «текущее» устройство
+    :param log:             callable(str) для сообщений об ошибках (потокобезопасный)
+    """
+
+    HISTORY_SIZE = 200
+
+    def __init__(self, client: AdbClient, sessions: ShellSessionPool,
+                 executor: AdbExecutor,
+                 serial_provider: Optional[Callable] = None,
+                 log: Optional[Callable] = None):
+        self.client = client
+        self.sessions = sessions
+        self.executor = executor
+        self.serial_provider = serial_provider
+        self.log = log
+        self.history = deque(maxlen=self.HISTORY_SIZE)   # последние вызовы
+        self.cache = ResultCache()
+        self.sync = AdbSync(client)
+        self.props = PropertyRegistry(self)    # getprop устройства – до перезагрузки
+        self._stats = {}
+        self._lock = threading.Lock()
+        client.command_hooks.append(self.cache.note_command)
+
+    # ------------------------------------------------------------------
+    #   Разбор команды и выбор устройства
+    # ------------------------------------------------------------------
+    @staticmethod
+    def split(command: Command) -> list:
+        """
+        "shell rm -f \"a b\"" → ["shell", "rm -f \"a b\""]: команду shell
+        отдаём устройству целиком (кавычки разберёт его sh), остальное
+        разбираем как командную строку.
+        """
+        if not isinstance(command, str):
+            return list(command)
+        command = command.strip()
+        if command.startswith("shell "):
+            return ["shell", command[len("shell "):].strip()]
+        return shlex.split(command)
+
+    def target(self, serial: Optional[str] = None) -> Optional[str]:
+        """Явно заданный serial или текущее устройство главного окна."""
+        if serial is None and self.serial_provider is not None:
+            serial = self.serial_provider()
+        return serial
+
+    # ------------------------------------------------------------------
+    #   Синхронные вызовы
+    # ------------------------------------------------------------------
+    def run(self, command: Command, serial: Optional[str] = None,
+            timeout: float = 30.0, text: bool = True,
+            cache_ttl: Optional[float] = None,
+            persistent: bool = True) -> subprocess.CompletedProcess:
+        """
+        Выполняет adb‑команду и возвращает CompletedProcess (ненулевой код
+        возврата исключением не считается).
+
+        `shell …` с текстовым выводом идут через постоянную сессию устройства
+        (persistent=False – отдельным сервисом shell:). stderr команды всегда
+        отдельно от stdout: в сессии – через файл сессии на устройстве, иначе –
+        кадрами shell v2; output() / query() возвращают только stdout, текст
+        ошибки – в result.stderr у run(). Смешаны они лишь там, где нет ни
+        того, ни другого (старые устройства без shell_v2 и без записи в
+        /data/local/tmp). `cache_ttl` – сколько
+        секунд можно отдавать сохранённый ответ вместо нового запроса; по
+        умолчанию берётся из правил кэша, 0 – не кэшировать.
+        """
+        args = self.split(command)
+        serial = self.target(serial)
+        key = normalize(args)
+        ttl = self.cache.ttl_for(key) if cache_ttl is None else cache_ttl
+        ttl = ttl if text else None
+        if ttl:
+            cached = self.cache.get(serial, key)
+            if cached is not None:
+                return cached
+
+        started = time.monotonic()
+        error = True
+        try:
+            if persistent and text and len(args) == 2 and args[0] == "shell":
+                self.client.notify(serial, args)
+                result = self.sessions.run(serial, args[1], timeout=timeout)
+            else:
+                result = self.client.run(args, serial=serial, timeout=timeout, text=text)
+            error = result.returncode != 0
+        finally:
+            self._record(args, serial, time.monotonic() - started, error)
+
+        if ttl and result.returncode == 0:
+            self.cache.put(serial, key, result, ttl)
+        return result
+
+    def output(self, command: Command, serial: Optional[str] = None,
+               timeout: float = 30.0, cache_ttl: Optional[float] = None) -> str:
+        """stdout команды; при ненулевом коде – subprocess.CalledProcessError."""
+        result = self.run(command, serial, timeout=timeout, cache_ttl=cache_ttl)
+        result.check_returncode()
+        return result.stdout
+
+    def query(self, command: Command, serial: Optional[str] = None,
+              timeout: float = 30.0, cache_ttl: Optional[float] = None,
+              tag: Optional[str] = "ADB") -> str:
+        """
+        Как output(), но никогда не бросает исключение: при ошибке пишет
+        «[tag] Ошибка adb: …» в лог (tag=None – молча) и возвращает пустую строку.
+        """
+        try:
+            return self.output(command, serial, timeout=timeout, cache_ttl=cache_ttl)
+        except Exception as e:
+            if self.log is not None and tag is not None:
+                self.log(f"[{tag}] Ошибка adb: {e}")
+            return ""
+
+    def stream(self, command: str, stdout: Callable, stderr: Optional[Callable] = None,
+               serial: Optional[str] = None, timeout: Optional[float] = None) -> int:
+        """
+        Бинарный вывод shell‑команды кусками в stdout(bytes) – без
+        декодирования и без накопления в памяти; возвращает код выхода.
+
+            with open(path, "wb") as f:
+                main_window.adb.stream("screencap -p", f.write)
+        """
+        serial = self.target(serial)
+        args = ["shell", command]
+        self.client.notify(serial, args)
+        started = time.monotonic()
+        error = True
+        try:
+            code = self.client.shell_stream(serial, command, stdout, stderr, timeout=timeout)
+            error = code != 0
+            return code
+        finally:
+            self._record(args, serial, time.monotonic() - started, error)
+
+    # ------------------------------------------------------------------
+    #   Пакеты команд
+    # ------------------------------------------------------------------
+    def run_batch(self, commands: list, serial: Optional[str] = None,
+                  timeout: float = 10.0, use_cache: bool = True) -> list:
+        """
+        Несколько shell‑команд (без префикса `shell`) за один обмен с
+        устройством через постоянную сессию. Возвращает CompletedProcess на
+        каждую команду в том же порядке; ответы из кэша на устройство не
+        уходят, остальные отправляются одним скриптом.
+        """
+        serial = self.target(serial)
+        results = [None] * len(commands)
+        pending = []
+        for i, command in enumerate(commands):
+            key = normalize(["shell", command])
+            ttl = self.cache.ttl_for(key) if use_cache else None
+            cached = self.cache.get(serial, key) if ttl else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                self.client.notify(serial, ["shell", command])
+                pending.append((i, key, ttl))
+        if not pending:
+            return results
+
+        started = time.monotonic()
+        error = True
+        try:
+            fresh = self.sessions.run_many(serial, [commands[i] for i, _, _ in pending], timeout)
+            error = any(r.returncode != 0 for r in fresh)
+        finally:
+            self._record(["batch"], serial, time.monotonic() - started, error)
+        for (i, key, ttl), result in zip(pending, fresh):
+            results[i] = result
+            if ttl and result.returncode == 0:
+                self.cache.put(serial, key, result, ttl)
+        return results
+
+    def batch(self, serial: Optional[str] = None, timeout: float = 10.0) -> ShellBatch:
+        """Пустой ShellBatch для устройства `serial` (по умолчанию – текущего)."""
+        return ShellBatch(self, self.target(serial), timeout)
+
+    def submit_batch(self, commands: list, serial: Optional[str] = None,
+                     timeout: float = 10.0,
+                     callback: Optional[Callable] = None) -> JobHandle:
+        """run_batch в исполнителе; handle.result – список CompletedProcess."""
+        serial = self.target(serial)
+        return self.executor.submit_blocking(
+            serial, self.run_batch, list(commands), serial, timeout,
+            timeout=timeout + 5, description=f"batch×{len(commands)}", callback=callback,
+        )
+
+    # ------------------------------------------------------------------
+    #   Асинхронные вызовы
+    # ------------------------------------------------------------------
+    async def arun(self, command: Command, serial: Optional[str] = None,
+                   timeout: float = 30.0, text: bool = True) -> subprocess.CompletedProcess:
+        """Корутина для заданий исполнителя (или собственного цикла плагина)."""
+        args = self.split(command)
+        serial = self.target(serial)
+        started = time.monotonic()
+        error = True
+        try:
+            result = await self.client.arun(args, serial, timeout=timeout, text=text)
+            error = result.returncode != 0
+            return result
+        finally:
+            self._record(args, serial, time.monotonic() - started, error)
+
+    def submit(self, command: Command, serial: Optional[str] = None,
+               timeout: float = 30.0, text: bool = True,
+               callback: Optional[Callable] = None) -> JobHandle:
+        """
+        Ставит команду в исполнитель и сразу возвращает JobHandle.
+        callback(handle) вызывается в потоке исполнителя – для работы с
+        виджетами переправляйте результат сигналом.
+        """
+        serial = self.target(serial)
+        args = self.split(command)
+        return self.executor.submit_call(
+            serial,
+            lambda: self.arun(args, serial, timeout=None, text=text),
+            timeout=timeout,
+            description=" ".join(self.client.command_line(args, serial)),
+            callback=callback,
+        )
+
+    # ------------------------------------------------------------------
+    #   Файлы (sync‑протокол)
+    # ------------------------------------------------------------------
+    def pull(self, remote: str, local: str, serial: Optional[str] = None,
+             progress: Optional[Callable] = None) -> int:
+        """
+        Файл/каталог с устройства; progress(done, total) – по байтам.
+        Блокирующий вызов: из GUI‑потока запускайте через executor.
+        """
+        return self._transfer("pull", self.sync.pull, remote, local, serial, progress)
+
+    def push(self, local: str, remote: str, serial: Optional[str] = None,
+             progress: Optional[Callable] = None) -> int:
+        """Файл/каталог на устройство; см. pull()."""
+        return self._transfer("push", self.sync.push, local, remote, serial, progress)
+
+    def listdir(self, path: str, serial: Optional[str] = None) -> list:
+        """Содержимое каталога устройства: список SyncEntry (без . и ..)."""
+        return self.sync.listdir(self.target(serial), path)
+
+    def stat(self, path: str, serial: Optional[str] = None) -> SyncEntry:
+        """SyncEntry пути; для несуществующего – entry.exists == False."""
+        return self.sync.stat(self.target(serial), path)
+
+    def _transfer(self, kind: str, fn: Callable, src: str, dst: str,
+                  serial: Optional[str], progress: Optional[Callable]) -> int:
+        serial = self.target(serial)
+        started = time.monotonic()
+        error = True
+        try:
+            size = fn(serial, src, dst, progress)
+            error = False
+            return size
+        finally:
+            self._record([kind], serial, time.monotonic() - started, error)
+
+    # ------------------------------------------------------------------
+    #   Кэш
+    # ------------------------------------------------------------------
+    def invalidate(self, serial: Optional[str] = None):
+        """Сбрасывает кэш одного устройства (или весь, если serial не задан)."""
+        self.cache.invalidate(serial)
+
+    # ------------------------------------------------------------------
+    #   Метрики
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _kind(args: list) -> str:
+        """Вид команды для статистики: `shell dumpsys`, `pull`, `install` …"""
+        if not args:
+            return ""
+        if args[0] == "shell" and len(args) > 1:
+            head = args[1].split(None, 1)
+            return "shell " + head[0] if head else "shell"
+        return args[0]
+
+    def _record(self, args: list, serial: Optional[str], elapsed: float, error: bool):
+        kind = self._kind(args)
+        with self._lock:
+            stats = self._stats.get(kind)
+            if stats is None:
+                stats = self._stats[kind] = AdbCallStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            self.history.append((time.time(), serial, kind, elapsed, error))
+
+    def stats(self) -> dict:
+        """{вид команды: {calls, errors, mean_ms, max_ms}}."""
+        with self._lock:
+            return {kind: s.as_dict() for kind, s in self._stats.items()}
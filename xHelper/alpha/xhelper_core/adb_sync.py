@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+adb_sync – собственная реализация sync‑протокола adb (push / pull / ls / stat).
+
+Вместо `adb push` / `adb pull` открываем на устройстве сервис `sync:` и
+говорим с adbd напрямую. Каждый запрос – 4‑байтный id и длина (uint32 LE):
+
+    STAT / STA2 <path>      – stat файла (v2: 64‑битные размеры, uid/gid …)
+    LIST / LIS2 <path>      – содержимое каталога со stat каждого элемента
+    SEND <path>,<mode>      – затем DATA‑блоки (≤ 64 КБ) и DONE <mtime>
+    RECV <path>             – в ответ DATA‑блоки и DONE
+    QUIT                    – конец сессии
+
+По одному соединению можно гнать сколько угодно запросов, поэтому много
+мелких файлов передаются конвейером: следующие RECV уходят, не дожидаясь
+конца текущего файла, а подтверждения SEND читаются пачкой. Колбэк
+progress(done, total) получает точное число переданных байт.
+
+Если adb‑сервер недоступен, AdbSync откатывается на `adb push/pull`.
+"""
+
+import os
+import posixpath
+import stat as stat_module
+import struct
+import time
+from typing import Callable, NamedTuple, Optional
+
+from .adb_client import AdbClient, AdbError, read_exact
+
+SYNC_DATA_MAX = 64 * 1024          # максимальный DATA‑блок adbd
+PIPELINE_WINDOW = 16               # сколько запросов держим «в полёте»
+
+_STAT_V1 = struct.Struct("<III")                   # mode, size, mtime
+_STAT_V2 = struct.Struct("<IQQIIIIQqqq")           # error, dev, ino, mode, nlink,
+                                                   # uid, gid, size, atime, mtime, ctime
+_DENT_V1 = struct.Struct("<IIII")                  # mode, size, mtime, namelen
+
+
+class SyncEntry(NamedTuple):
+    """stat одного файла или элемента каталога."""
+    name: str
+    mode: int
+    size: int
+    mtime: int
+    uid: int = 0
+    gid: int = 0
+
+    @property
+    def exists(self) -> bool:
+        return self.mode != 0
+
+    @property
+    def is_dir(self) -> bool:
+        return stat_module.S_ISDIR(self.mode)
+
+    @property
+    def is_file(self) -> bool:
+        return stat_module.S_ISREG(self.mode)
+
+    @property
+    def is_link(self) -> bool:
+        return stat_module.S_ISLNK(self.mode)
+
+
+class SyncConnection:
+    """
+    Одна sync‑сессия на устройстве. Используется как контекстный менеджер:
+
+        with SyncConnection(client, serial) as sync:
+            for entry in sync.list("/sdcard"):
+                print(entry.name, entry.size)
+            sync.pull("/sdcard/a.mp4", "a.mp4", progress=print)
+    """
+
+    def __init__(self, client: AdbClient, serial: Optional[str], timeout: float = 30.0):
+        features = client.features(serial)
+        self.stat_v2 = "stat_v2" in features
+        self.ls_v2 = "ls_v2" in features
+        self.sock = client.open_service(serial, "sync:", timeout)
+        self.sock.settimeout(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            self._send(b"QUIT", b"")
+        except OSError:
+            pass
+        self.sock.close()
+        self.sock = None
+
+    # ------------------------------------------------------------------
+    #   Кадры протокола
+    # ------------------------------------------------------------------
+    def _send(self, cmd: bytes, payload: bytes):
+        self.sock.sendall(cmd + struct.pack("<I", len(payload)) + payload)
+
+    def _read_header(self) -> tuple:
+        header = read_exact(self.sock, 8)
+        return header[:4], struct.unpack("<I", header[4:])[0]
+
+    def _read_fail(self, length: int) -> AdbError:
+        return AdbError(read_exact(self.sock, length).decode("utf-8", "replace"))
+
+    @staticmethod
+    def _path(path: str) -> bytes:
+        data = path.encode("utf-8")
+        if len(data) > 1024:
+            raise AdbError(f"слишком длинный путь: {path}")
+        return data
+
+    # ------------------------------------------------------------------
+    #   STAT / LIST
+    # ------------------------------------------------------------------
+    def stat(self, path: str) -> SyncEntry:
+        """stat удалённого пути; для несуществующего – entry.exists == False."""
+        return self.stat_many([path])[0]
+
+    def stat_many(self, paths: list) -> list:
+        """stat сразу для многих путей: все запросы уходят одним пакетом."""
+        cmd = b"STA2" if self.stat_v2 else b"STAT"
+        self.sock.sendall(b"".join(cmd + struct.pack("<I", len(p)) + p
+                                   for p in map(self._path, paths)))
+        return [self._read_stat(path, cmd) for path in paths]
+
+    def _read_stat(self, path: str, cmd: bytes) -> SyncEntry:
+        reply = read_exact(self.sock, 4)
+        if reply != cmd:
+            raise AdbError(f"неожиданный ответ на {cmd.decode()}: {reply!r}")
+        if cmd == b"STAT":
+            mode, size, mtime = _STAT_V1.unpack(read_exact(self.sock, _STAT_V1.size))
+            return SyncEntry(path, mode, size, mtime)
+        (error, _dev, _ino, mode, _nlink, uid, gid,
+         size, _atime, mtime, _ctime) = _STAT_V2.unpack(read_exact(self.sock, _STAT_V2.size))
+        if error:
+            return SyncEntry(path, 0, 0, 0)
+        return SyncEntry(path, mode, size, mtime, uid, gid)
+
+    def list(self, path: str) -> list:
+        """Содержимое каталога (без «.» и «..») со stat каждого элемента."""
+        v2 = self.ls_v2
+        self._send(b"LIS2" if v2 else b"LIST", self._path(path))
+        entries = []
+        while True:
+            reply = read_exact(self.sock, 4)
+            if reply == b"DONE":
+                # хвост DONE имеет размер обычной записи
+                read_exact(self.sock, _STAT_V2.size + 4 if v2 else _DENT_V1.size)
+                break
+            if reply == b"FAIL":
+                raise self._read_fail(struct.unpack("<I", read_exact(self.sock, 4))[0])
+            if v2 and reply == b"DNT2":
+                (error, _dev, _ino, mode, _nlink, uid, gid,
+                 size, _atime, mtime, _ctime) = _STAT_V2.unpack(read_exact(self.sock, _STAT_V2.size))
+                namelen = struct.unpack("<I", read_exact(self.sock, 4))[0]
+            elif not v2 and reply == b"DENT":
+                mode, size, mtime, namelen = _DENT_V1.unpack(read_exact(self.sock, _DENT_V1.size))
+                uid = gid = error = 0
+            else:
+                raise AdbError(f"неожиданный ответ на LIST: {reply!r}")
+            name = read_exact(self.sock, namelen).decode("utf-8", "replace")
+            if name in (".", "..") or error:
+                continue
+            entries.append(SyncEntry(name, mode, size, mtime, uid, gid))
+        return entries
+
+    def walk(self, root: str) -> list:
+        """
+        Все обычные файлы под каталогом `root`: [(путь, SyncEntry), …].
+        Символические ссылки внутри дерева не раскрываются (как у `adb pull`).
+        """
+        files = []
+        pending = [root]
+        while pending:
+            current = pending.pop()
+            for entry in self.list(current):
+                full = posixpath.join(current, entry.name)
+                if entry.is_dir:
+                    pending.append(full)
+                elif entry.is_file:
+                    files.append((full, entry))
+        return files
+
+    # ------------------------------------------------------------------
+    #   RECV
+    # ------------------------------------------------------------------
+    def pull(self, remote: str, local: str,
+             progress: Optional[Callable] = None) -> int:
+        """Скачивает один файл; возвращает число байт."""
+        size = self.stat(remote).size
+        return self.pull_many([(remote, local, size)], progress)
+
+    def pull_many(self, items: list, progress: Optional[Callable] = None) -> int:
+        """
+        Конвейерное скачивание: items – [(remote, local, size|None), …].
+        RECV на следующие файлы уходят, пока читается текущий.
+        """
+        items = list(items)
+        unknown = [i for i, item in enumerate(items) if len(item) < 3 or item[2] is None]
+        if unknown:
+            stats = self.stat_many([items[i][0] for i in unknown])
+            for i, entry in zip(unknown, stats):
+                items[i] = (items[i][0], items[i][1], entry.size)
+        total = sum(item[2] for item in items)
+        done = 0
+        sent = received = 0
+
+        def send_more():
+            nonlocal sent
+            while sent < len(items) and sent - received < PIPELINE_WINDOW:
+                self._send(b"RECV", self._path(items[sent][0]))
+                sent += 1
+
+        send_more()
+        for remote, local, _size in items:
+            tmp = local + ".part"
+            with open(tmp, "wb") as f:
+                while True:
+                    cmd, length = self._read_header()
+                    if cmd == b"DATA":
+                        f.write(read_exact(self.sock, length))
+                        done += length
+                        if progress is not None:
+                            progress(done, total)
+                    elif cmd == b"DONE":
+                        break
+                    elif cmd == b"FAIL":
+                        error = self._read_fail(length)
+                        f.close()
+                        os.remove(tmp)
+                        raise AdbError(f"{remote}: {error}")
+                    else:
+                        raise AdbError(f"неожиданный ответ на RECV: {cmd!r}")
+            os.replace(tmp, local)
+            received += 1
+            send_more()
+        return done
+
+    # ------------------------------------------------------------------
+    #   SEND
+    # ------------------------------------------------------------------
+    def push(self, local: str, remote: str, progress: Optional[Callable] = None) -> int:
+        """Отправляет один файл; права и mtime берутся с локального файла."""
+        return self.push_many([(local, remote)], progress)
+
+    def push_many(self, items: list, progress: Optional[Callable] = None) -> int:
+        """
+        Конвейерная отправка: items – [(local, remote), …]. Подтверждения
+        (OKAY/FAIL после DONE) читаются отложенно, пачками.
+        """
+        items = list(items)
+        total = sum(os.path.getsize(local) for local, _ in items)
+        done = 0
+        unacked = []
+
+        for local, remote in items:
+            st = os.stat(local)
+            mode = stat_module.S_IMODE(st.st_mode) | stat_module.S_IFREG
+            self._send(b"SEND", self._path(f"{remote},{mode}"))
+            with open(local, "rb") as f:
+                while True:
+                    chunk = f.read(SYNC_DATA_MAX)
+                    if not chunk:
+                        break
+                    self._send(b"DATA", chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, total)
+            self.sock.sendall(b"DONE" + struct.pack("<I", int(st.st_mtime)))
+            unacked.append(remote)
+            if len(unacked) >= PIPELINE_WINDOW:
+                self._read_ack(unacked.pop(0))
+        for remote in unacked:
+            self._read_ack(remote)
+        return done
+
+    def _read_ack(self, remote: str):
+        cmd, length = self._read_header()
+        if cmd == b"OKAY":
+            return
+        if cmd == b"FAIL":
+            raise AdbError(f"{remote}: {self._read_fail(length)}")
+        raise AdbError(f"неожиданный ответ на SEND: {cmd!r}")
+
+
+class AdbSync:
+    """
+    Высокоуровневые push / pull с семантикой `adb push/pull`: каталоги
+    копируются рекурсивно, путь‑папка на приёмной стороне дополняется
+    именем источника. Возвращают число переданных байт.
+    """
+
+    def __init__(self, client: AdbClient):
+        self.client = client
+
+    def connect(self, serial: Optional[str], timeout: float = 30.0) -> SyncConnection:
+        return SyncConnection(self.client, serial, timeout)
+
+    def stat(self, serial: Optional[str], path: str) -> SyncEntry:
+        with self.connect(serial) as sync:
+            return sync.stat(path)
+
+    def listdir(self, serial: Optional[str], path: str) -> list:
+        with self.connect(serial) as sync:
+            return sync.list(path)
+
+    def pull(self, serial: Optional[str], remote: str, local: str,
+             progress: Optional[Callable] = None, timeout: float = 30.0) -> int:
+        """
+        Файл или каталог с устройства. `timeout` – на каждую операцию
+        сокета (простой), а не на всю передачу.
+        """
+        try:
+            sync = self.connect(serial, timeout)
+        except OSError:
+            return self._binary(["pull", remote, local], serial)
+        with sync:
+            entry = sync.stat(remote)
+            if entry.is_link:
+                # STAT v1 не раскрывает ссылки; «путь/» раскроет (/sdcard → …)
+                entry = sync.stat(remote.rstrip("/") + "/")._replace(name=remote)
+            if not entry.exists:
+                raise AdbError(f"{remote}: нет такого файла или каталога")
+            if os.path.isdir(local):
+                local = os.path.join(local, posixpath.basename(remote.rstrip("/")) or "root")
+            if not entry.is_dir:
+                return sync.pull_many([(remote, local, entry.size)], progress)
+
+            items = []
+            for path, file_entry in sync.walk(remote.rstrip("/") or "/"):
+                rel = posixpath.relpath(path, remote)
+                target = os.path.join(local, *rel.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                items.append((path, target, file_entry.size))
+            os.makedirs(local, exist_ok=True)
+            return sync.pull_many(items, progress)
+
+    def pull_many(self, serial: Optional[str], items: list,
+                  progress: Optional[Callable] = None, timeout: float = 30.0) -> int:
+        """Набор отдельных файлов [(remote, local), …] одним соединением."""
+        with self.connect(serial, timeout) as sync:
+            return sync.pull_many([(r, l, None) for r, l in items], progress)
+
+    def push(self, serial: Optional[str], local: str, remote: str,
+             progress: Optional[Callable] = None, timeout: float = 30.0) -> int:
+        """Файл или каталог на устройство (родительские каталоги создаёт adbd)."""
+        try:
+            sync = self.connect(serial, timeout)
+        except OSError:
+            return self._binary(["push", local, remote], serial)
+        with sync:
+            target = sync.stat(remote)
+            if target.is_dir:
+                remote = posixpath.join(remote, os.path.basename(os.path.normpath(local)))
+            if not os.path.isdir(local):
+                return sync.push_many([(local, remote)], progress)
+
+            items = []
+            for root, _dirs, files in os.walk(local):
+                rel = os.path.relpath(root, local)
+                base = remote if rel == "." else posixpath.join(remote, *rel.split(os.sep))
+                items.extend((os.path.join(root, name), posixpath.join(base, name))
+                             for name in files)
+            return sync.push_many(items, progress)
+
+    def _binary(self, args: list, serial: Optional[str]) -> int:
+        """Откат на бинарный adb, когда сервер недоступен (без прогресса)."""
+        result = self.client.run(args, serial=serial, timeout=None)
+        if result.returncode != 0:
+            raise AdbError((result.stderr or result.stdout).strip())
+        return 0
+
+
+class TransferRate:
+    """
+    Обёртка над progress‑колбэком: добавляет скорость и не дёргает GUI
+    чаще, чем раз в `interval` секунд (последний вызов проходит всегда).
+
+        progress = TransferRate(lambda done, total, rate: ...)
+    """
+
+    def __init__(self, callback: Callable, interval: float = 0.1):
+        self.callback = callback
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = 0.0
+
+    def __call__(self, done: int, total: int):
+        now = time.monotonic()
+        if done < total and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = max(now - self.started, 1e-6)
+        self.callback(done, total, done / elapsed)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+apk_bundle – что в папке массовой установки считается «пакетом».
+
+Кроме одиночных `*.apk` приложение может прийти набором split‑APK
+(base + конфигурационные части по ABI, плотности экрана, языку):
+
+    * каталог с несколькими APK (`app/base.apk`, `app/split_config.arm64_v8a.apk` …);
+    * `.apks` – zip от bundletool (`splits/base-master.apk`, `splits/base-arm64_v8a.apk` …);
+    * `.xapk` – zip с `manifest.json` и APK в корне (OBB‑расширения не ставятся).
+
+Части набора читаются прямо из архива на хосте – без распаковки во
+временный каталог:
+
+    bundle = load_bundle(path)
+    bundle.splits                      # (('splits/base-master.apk', 31457280), …)
+    with bundle.open(name) as f: …     # файловый объект части
+"""
+
+import os
+import zipfile
+from typing import NamedTuple, Optional
+
+BUNDLE_SUFFIXES = (".apks", ".xapk")
+
+# ABI в именах частей (base-arm64_v8a.apk, split_config.armeabi_v7a.apk)
+_ABI_TOKENS = ("arm64_v8a", "armeabi_v7a", "armeabi", "x86_64", "x86", "mips64", "mips")
+
+
+class ApkBundle(NamedTuple):
+    """Одиночный APK или набор split‑APK."""
+    path: str
+    kind: str                 # apk, dir, apks, xapk
+    splits: tuple             # ((имя части, размер), …): путь к файлу или имя в архиве
+
+    @property
+    def size(self) -> int:
+        return sum(size for _name, size in self.splits)
+
+    @property
+    def is_split(self) -> bool:
+        return self.kind != "apk"
+
+    def open(self, name: str):
+        """Файловый объект части (для архива – поток из zip, без распаковки на диск)."""
+        if self.kind in ("apk", "dir"):
+            return open(name, "rb")
+        # открытая часть держит файл архива сама – ZipFile можно закрыть сразу
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.open(name)
+
+
+def load_bundle(path: str) -> ApkBundle:
+    """Пакет по пути: `.apk`, каталог с APK, `.apks` или `.xapk` (ValueError – не пакет)."""
+    if os.path.isdir(path):
+        splits = tuple((os.path.join(path, name), os.path.getsize(os.path.join(path, name)))
+                       for name in sorted(os.listdir(path)) if name.lower().endswith(".apk"))
+        if not splits:
+            raise ValueError(f"в каталоге нет APK: {path}")
+        return ApkBundle(path, "dir", splits)
+    lower = path.lower()
+    if lower.endswith(BUNDLE_SUFFIXES):
+        with zipfile.ZipFile(path) as archive:
+            members = [info for info in archive.infolist()
+                       if info.filename.lower().endswith(".apk") and not info.is_dir()]
+        if lower.endswith(".apks"):
+            # bundletool: части для Android 5+ – в splits/, standalones/ – для старых
+            split_dir = [info for info in members if info.filename.startswith("splits/")]
+            members = split_dir or [info for info in members if "/" not in info.filename]
+        else:
+            members = [info for info in members if "/" not in info.filename]
+        if not members:
+            raise ValueError(f"в архиве нет APK: {path}")
+        return ApkBundle(path, lower.rsplit(".", 1)[1],
+                         tuple((info.filename, info.file_size) for info in members))
+    return ApkBundle(path, "apk", ((path, os.path.getsize(path)),))
+
+
+def find_packages(folder: str) -> list:
+    """Пакеты папки: `*.apk`, `*.apks`, `*.xapk` и подкаталоги с APK (наборы split)."""
+    found = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if os.path.isdir(path):
+            if any(child.lower().endswith(".apk") for child in os.listdir(path)):
+                found.append(path)
+        elif name.lower().endswith((".apk",) + BUNDLE_SUFFIXES):
+            found.append(path)
+    return found
+
+
+def split_abi(name: str) -> Optional[str]:
+    """ABI части по имени (`base-arm64_v8a.apk` → 'arm64-v8a'), None – не ABI‑часть."""
+    stem = os.path.basename(name).lower()[:-4].replace("-", "_").replace(".", "_")
+    tokens = stem.split("_")
+    for abi in _ABI_TOKENS:
+        parts = abi.split("_")
+        for i in range(len(tokens) - len(parts) + 1):
+            if tokens[i:i + len(parts)] == parts:
+                return abi.replace("_", "-")
+    return None
+
+
+def select_splits(bundle: ApkBundle, abis: list) -> tuple:
+    """
+    Части для устройства с `abis` (ro.product.cpu.abilist): ABI‑части
+    чужих архитектур отбрасываются; если не подошла ни одна – ставим все.
+    """
+    if not abis:
+        return bundle.splits
+    keep = [split for split in bundle.splits if split_abi(split[0]) in (None, *abis)]
+    if any(split_abi(name) for name, _size in bundle.splits) and \
+            not any(split_abi(name) for name, _size in keep):
+        return bundle.splits
+    return tuple(keep)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+apk_index – сведения об APK папки (пакет, versionCode, SHA‑256) с кэшем на диске.
+
+Повторный прогон массовой установки по папке на 300 APK ставил всё заново,
+даже то, что уже стоит той же версии, – а каждая переустановка это передача
+файла и dexopt. Чтобы решить, что ставить, нужно знать пакет и версию
+каждого APK: их даёт бинарный AndroidManifest.xml внутри архива (разбираем
+сами, без aapt), а сравниваем с одним `pm list packages --show-versioncode`
+на устройство.
+
+Для наборов split‑APK (каталог, `.apks`, `.xapk` – см. apk_bundle) пакет и
+версия берутся из базовой части (манифест без атрибута split).
+
+Разбор манифеста и SHA‑256 гигабайтного APK – не бесплатны, поэтому итог
+хранится в индексе рядом с APK (`.xhelper_apk_index.json`) по ключу
+«путь + размер + mtime»: повторный прогон читает только изменившиеся файлы.
+
+    index = ApkIndex.for_folder(folder)
+    infos = index.scan(apk_files)               # {путь: ApkInfo}
+    installed = parse_package_versions(out)     # {пакет: versionCode}
+    skip_reason(infos[apk], installed)          # None – ставить
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import zipfile
+from typing import NamedTuple, Optional
+
+from .apk_bundle import load_bundle
+
+# типы блоков бинарного XML (frameworks/base/libs/androidfw/ResourceTypes.h)
+_RES_STRING_POOL = 0x0001
+_RES_XML = 0x0003
+_RES_XML_START_ELEMENT = 0x0102
+_RES_XML_RESOURCE_MAP = 0x0180
+_UTF8_FLAG = 0x100
+_TYPE_STRING = 0x03
+_NO_INDEX = 0xFFFFFFFF
+
+# атрибуты <manifest> по id ресурса: имена атрибутов в пуле строк могут быть
+# вырезаны обфускатором, id – нет
+_ATTRIBUTE_IDS = {
+    0x0101021B: "versionCode",
+    0x0101021C: "versionName",
+    0x01010576: "versionCodeMajor",
+}
+
+
+class ApkInfo(NamedTuple):
+    """Что известно об APK на хосте."""
+    path: str
+    size: int
+    mtime_ns: int
+    package: str
+    version_code: int         # «длинный» код: versionCodeMajor << 32 | versionCode
+    version_name: str
+    sha256: str
+
+
+# ----------------------------------------------------------------------
+#   Бинарный AndroidManifest.xml
+# ----------------------------------------------------------------------
+def _string_pool(data: bytes, offset: int) -> list:
+    _type, header_size, _size, count, _styles, flags, strings_start, _ = \
+        struct.unpack_from("<HHIIIIII", data, offset)
+    base = offset + strings_start
+    strings = []
+    for off in struct.unpack_from(f"<{count}I", data, offset + header_size):
+        pos = base + off
+        if flags & _UTF8_FLAG:
+            pos += 2 if data[pos] & 0x80 else 1          # длина в UTF‑16 – не нужна
+            length = data[pos]
+            if length & 0x80:
+                length = ((length & 0x7F) << 8) | data[pos + 1]
+                pos += 1
+            pos += 1
+            strings.append(data[pos:pos + length].decode("utf-8", "replace"))
+        else:
+            length, = struct.unpack_from("<H", data, pos)
+            pos += 2
+            if length & 0x8000:
+                length = ((length & 0x7FFF) << 16) | struct.unpack_from("<H", data, pos)[0]
+                pos += 2
+            strings.append(data[pos:pos + 2 * length].decode("utf-16-le", "replace"))
+    return strings
+
+
+def parse_manifest(data: bytes) -> dict:
+    """
+    Атрибуты корневого <manifest> бинарного манифеста:
+    {'package': …, 'versionCode': …, 'versionName': …}. ValueError – не AXML.
+    """
+    if len(data) < 8 or struct.unpack_from("<H", data)[0] != _RES_XML:
+        raise ValueError("не бинарный AndroidManifest.xml")
+    strings, resource_ids = [], ()
+    pos = struct.unpack_from("<H", data, 2)[0]
+    while pos + 8 <= len(data):
+        chunk_type, header_size, chunk_size = struct.unpack_from("<HHI", data, pos)
+        if chunk_size < 8:
+            break
+        if chunk_type == _RES_STRING_POOL:
+            strings = _string_pool(data, pos)
+        elif chunk_type == _RES_XML_RESOURCE_MAP:
+            resource_ids = struct.unpack_from(f"<{(chunk_size - header_size) // 4}I",
+                                              data, pos + header_size)
+        elif chunk_type == _RES_XML_START_ELEMENT:
+            _ns, name, attr_start, attr_size, attr_count = \
+                struct.unpack_from("<IIHHH", data, pos + header_size)
+            if name < len(strings) and strings[name] == "manifest":
+                attributes = {}
+                for i in range(attr_count):
+                    _ans, key, raw, _vsize, _res0, data_type, value = struct.unpack_from(
+                        "<IIIHBBI", data, pos + header_size + attr_start + i * attr_size)
+                    key = (_ATTRIBUTE_IDS.get(resource_ids[key]) if key < len(resource_ids)
+                           else None) or (strings[key] if key < len(strings) else "")
+                    if data_type == _TYPE_STRING and value < len(strings):
+                        attributes[key] = strings[value]
+                    elif raw != _NO_INDEX and raw < len(strings):
+                        attributes[key] = strings[raw]
+                    else:
+                        attributes[key] = value
+                return attributes
+        pos += chunk_size
+    raise ValueError("в манифесте нет <manifest>")
+
+
+def signature(path: str) -> tuple:
+    """(размер, mtime_ns) файла; для каталога‑набора – сумма и самый свежий APK."""
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    stats = [os.stat(os.path.join(path, name)) for name in os.listdir(path)
+             if name.lower().endswith(".apk")]
+    return sum(s.st_size for s in stats), max((s.st_mtime_ns for s in stats), default=0)
+
+
+def read_apk(path: str) -> ApkInfo:
+    """
+    Манифест и SHA‑256 APK или набора split‑APK
+    (OSError / ValueError / zipfile.BadZipFile).
+    """
+    size, mtime_ns = signature(path)
+    bundle = load_bundle(path)
+    manifest = None
+    for name, _size in bundle.splits:
+        with bundle.open(name) as f, zipfile.ZipFile(f) as archive:
+            attributes = parse_manifest(archive.read("AndroidManifest.xml"))
+        if "split" not in attributes:
+            manifest = attributes
+            break
+    if manifest is None:
+        raise ValueError("в наборе нет базового APK")
+    digest = hashlib.sha256()
+    for name in ([path] if bundle.kind != "dir" else [name for name, _size in bundle.splits]):
+        with open(name, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    code = manifest.get("versionCode", 0)
+    major = manifest.get("versionCodeMajor", 0)
+    return ApkInfo(
+        path, size, mtime_ns,
+        str(manifest.get("package", "")),
+        (major << 32 | code) if isinstance(code, int) and isinstance(major, int) else 0,
+        manifest.get("versionName", "") if isinstance(manifest.get("versionName"), str) else "",
+        digest.hexdigest(),
+    )
+
+
+# ----------------------------------------------------------------------
+#   Сравнение с устройством
+# ----------------------------------------------------------------------
+def parse_package_versions(text: str) -> dict:
+    """
+    `pm list packages --show-versioncode` → {пакет: versionCode}; на Android
+    до 9 ключа нет – версия None (такие пакеты не пропускаем).
+    """
+    versions = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith("package:"):
+            continue
+        name, _sep, rest = line[len("package:"):].partition(" versionCode:")
+        versions[name.strip()] = int(rest) if rest.strip().isdigit() else None
+    return versions
+
+
+def skip_reason(info: Optional[ApkInfo], installed: dict) -> Optional[str]:
+    """Почему APK ставить не нужно (None – ставить: нет на устройстве или новее)."""
+    if info is None or not info.package or info.package not in installed:
+        return None
+    current = installed[info.package]
+    if current is None:
+        return None
+    if info.version_code == current:
+        return f"Уже установлен {info.package} ({current})"
+    if info.version_code < current:
+        return f"На устройстве новее: {info.package} {current} > {info.version_code}"
+    return None
+
+
+# ----------------------------------------------------------------------
+#   Индекс
+# ----------------------------------------------------------------------
+class ApkIndex:
+    """
+    {путь: ApkInfo} с файлом JSON на диске; запись действительна, пока у
+    файла те же размер и mtime.
+    """
+
+    FILENAME = ".xhelper_apk_index.json"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.errors = {}                 # путь -> текст ошибки разбора (последний scan)
+        self._entries = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+            self._entries = {key: ApkInfo(key, *(entry[field] for field in ApkInfo._fields[1:]))
+                             for key, entry in raw.get("apks", {}).items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass                         # индекса ещё нет или он битый – соберём заново
+
+    @classmethod
+    def for_folder(cls, folder: str) -> "ApkIndex":
+        return cls(os.path.join(folder, cls.FILENAME))
+
+    def lookup(self, path: str) -> Optional[ApkInfo]:
+        """Запись индекса, если файл с тех пор не менялся."""
+        key = os.path.abspath(path)
+        try:
+            size, mtime_ns = signature(key)
+        except OSError:
+            return None
+        with self._lock:
+            info = self._entries.get(key)
+        if info is not None and info.size == size and info.mtime_ns == mtime_ns:
+            return info
+        return None
+
+    def scan(self, paths: list) -> dict:
+        """
+        {путь: ApkInfo} для всех разборчивых APK; новые и изменившиеся
+        файлы читаются, индекс сохраняется. Блокирующий – не из GUI‑потока.
+        """
+        infos, changed = {}, False
+        errors = {}
+        for path in paths:
+            info = self.lookup(path)
+            if info is None:
+                key = os.path.abspath(path)
+                try:
+                    info = read_apk(key)
+                except (OSError, ValueError, KeyError, struct.error, zipfile.BadZipFile) as e:
+                    errors[path] = str(e) or type(e).__name__
+                    continue
+                with self._lock:
+                    self._entries[key] = info
+                changed = True
+            infos[path] = info
+        self.errors = errors
+        if changed:
+            self.save()
+        return infos
+
+    def save(self):
+        with self._lock:
+            data = {"version": 1,
+                    "apks": {key: info._asdict() for key, info in sorted(self._entries.items())}}
+        for entry in data["apks"].values():
+            entry.pop("path")
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass                         # папка только для чтения – индекс живёт в памяти
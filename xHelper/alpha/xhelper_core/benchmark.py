@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark – замеры задержек транспорта xHelper.
+
+Сравнивает, сколько стоит одно обновление вкладки «Мониторинг» (и
+похожих плагинов), если команды идут по одной и если пакетом:
+
+    python -m xhelper_core.benchmark                   # фейковый сервер, 20 мс RTT
+    python -m xhelper_core.benchmark --latency 0.005
+    python -m xhelper_core.benchmark --serial R58M123  # реальное устройство
+
+На реальном устройстве нужен запущенный adb‑сервер.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Optional
+
+from .adb_client import AdbClient
+from .adb_service import AdbService
+from .executor import AdbExecutor
+from .fake_adb_server import FakeAdbServer
+from .shell_session import ShellSessionPool
+
+# что читает одно обновление мониторинга / сведений об устройстве
+REFRESH_COMMANDS = [
+    "getprop ro.product.model",
+    "getprop ro.build.version.release",
+    "getprop ro.build.version.sdk",
+    "ip -f inet addr show wlan0",
+    "dumpsys battery",
+    "cat /proc/meminfo",
+]
+
+
+def _timed(fn, rounds: int) -> list:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def bench_batch(service: AdbService, serial: Optional[str],
+                commands: list = REFRESH_COMMANDS, rounds: int = 20) -> dict:
+    """
+    Медиана (мс) одного «обновления»: команды по одной через сессию и
+    одним пакетом. Кэш не используется – меряем именно транспорт.
+    """
+    service.run_batch(commands, serial, use_cache=False)      # прогрев сессии
+
+    def sequential():
+        for command in commands:
+            service.run(["shell", command], serial, cache_ttl=0)
+
+    def batched():
+        service.run_batch(commands, serial, use_cache=False)
+
+    seq = statistics.median(_timed(sequential, rounds))
+    bat = statistics.median(_timed(batched, rounds))
+    return {
+        "commands":      len(commands),
+        "sequential_ms": round(seq, 2),
+        "batched_ms":    round(bat, 2),
+        "speedup":       round(seq / bat, 1) if bat else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры задержек ADB‑транспорта xHelper")
+    parser.add_argument("--serial", help="реальное устройство вместо фейкового сервера")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="RTT фейкового сервера, с (по умолчанию 0.02)")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    server = None
+    if args.serial:
+        client, serial = AdbClient(), args.serial
+    else:
+        server = FakeAdbServer({"bench": "device"}, latency=args.latency)
+        _host, port = server.start()
+        client, serial = AdbClient(port=port), "bench"
+
+    sessions = ShellSessionPool(client)
+    executor = AdbExecutor(client)
+    service = AdbService(client, sessions, executor)
+    try:
+        result = bench_batch(service, serial, rounds=args.rounds)
+    finally:
+        sessions.close_all()
+        executor.shutdown()
+        if server is not None:
+            server.stop()
+
+    print(f"Обновление из {result['commands']} команд ({args.rounds} повторов, медиана):")
+    print(f"  по одной: {result['sequential_ms']:8.2f} мс")
+    print(f"  пакетом:  {result['batched_ms']:8.2f} мс   (×{result['speedup']})")
+
+
+if __name__ == "__main__":
+    main()
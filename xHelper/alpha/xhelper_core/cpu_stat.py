@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+cpu_stat – загрузка процессора устройства по счётчикам `/proc/stat`.
+
+`top` на устройстве дорог и в каждой версии toybox печатает своё, поэтому
+загрузку считаем сами: `/proc/stat` – это накопленные с загрузки тики по
+каждому ядру (user nice system idle iowait irq softirq steal). Разность
+двух снимков за интервал и есть доля времени в каждом состоянии:
+
+    usage = CpuUsage()
+    usage.update(text, serial)   # первый вызов – только запоминает базу, {}
+    usage.update(text, serial)   # {'total': 23.4, 'iowait': 0.8, 'irq': 0.3,
+                                 #  'cores': {'cpu0': 41.0, 'cpu1': 12.5, …}}
+
+Разность считается на хосте матрицей «ядро × счётчик»: с numpy – одной
+векторной операцией, без него – тем же расчётом на списках.
+"""
+
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:          # numpy необязателен – считаем на списках
+    np = None
+
+# первые восемь столбцов строки `cpuN`; guest/guest_nice уже входят в user/nice
+FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+_IDLE, _IOWAIT, _IRQ, _SOFTIRQ = 3, 4, 5, 6
+
+
+def parse_proc_stat(text: str) -> tuple:
+    """`/proc/stat` → (['cpu', 'cpu0', …], [[8 счётчиков], …])."""
+    names, rows = [], []
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            if names:
+                break                    # строки cpu идут первыми
+            continue
+        parts = line.split()
+        values = [int(v) for v in parts[1:len(FIELDS) + 1]]
+        values += [0] * (len(FIELDS) - len(values))
+        names.append(parts[0])
+        rows.append(values)
+    return names, rows
+
+
+def _usage_numpy(cur, old) -> Optional[tuple]:
+    delta = cur - old
+    if (delta[0] < 0).any() or not delta[0].any():
+        return None                      # счётчики сброшены (перезагрузка) или не сдвинулись
+    delta = np.maximum(delta, 0)
+    total = delta.sum(axis=1)
+    idle = delta[:, _IDLE] + delta[:, _IOWAIT]
+    denom = np.where(total == 0, 1, total).astype(np.float64)
+    busy = 100.0 * (total - idle) / denom
+    iowait = 100.0 * delta[:, _IOWAIT] / denom
+    irq = 100.0 * (delta[:, _IRQ] + delta[:, _SOFTIRQ]) / denom
+    return busy.round(1).tolist(), iowait.round(1).tolist(), irq.round(1).tolist()
+
+
+def _usage_python(cur, old) -> Optional[tuple]:
+    if any(c < o for c, o in zip(cur[0], old[0])) or cur[0] == old[0]:
+        return None
+    busy, iowait, irq = [], [], []
+    for row, prev in zip(cur, old):
+        delta = [max(c - o, 0) for c, o in zip(row, prev)]
+        total = sum(delta)
+        denom = total or 1
+        busy.append(round(100.0 * (total - delta[_IDLE] - delta[_IOWAIT]) / denom, 1))
+        iowait.append(round(100.0 * delta[_IOWAIT] / denom, 1))
+        irq.append(round(100.0 * (delta[_IRQ] + delta[_SOFTIRQ]) / denom, 1))
+    return busy, iowait, irq
+
+
+class CpuUsage:
+    """Предыдущий снимок счётчиков по serial и расчёт загрузки за интервал."""
+
+    def __init__(self):
+        self._prev = {}                  # serial -> (имена строк, матрица счётчиков)
+
+    def update(self, text: str, serial: Optional[str] = None) -> dict:
+        """
+        Новый снимок `/proc/stat` → загрузка с прошлого вызова, %.
+        Пустой словарь, если сравнивать пока не с чем.
+        """
+        names, rows = parse_proc_stat(text)
+        if not names:
+            return {}
+        counters = np.array(rows, dtype=np.int64) if np is not None else rows
+        prev = self._prev.get(serial)
+        self._prev[serial] = (names, counters)
+        if prev is None:
+            return {}
+
+        old_names, old = prev
+        cur = counters
+        if old_names != names:
+            # ядро ушло в offline / вернулось – сравниваем только общие строки
+            index = {name: i for i, name in enumerate(old_names)}
+            keep = [i for i, name in enumerate(names) if name in index]
+            if not keep or names[keep[0]] != "cpu":
+                return {}
+            back = [index[names[i]] for i in keep]
+            if np is not None:
+                cur, old = counters[keep], old[back]
+            else:
+                cur, old = [counters[i] for i in keep], [old[i] for i in back]
+            names = [names[i] for i in keep]
+
+        usage = _usage_numpy(cur, old) if np is not None else _usage_python(cur, old)
+        if usage is None:
+            return {}
+        busy, iowait, irq = usage
+        return {
+            "total":  busy[0],
+            "iowait": iowait[0],
+            "irq":    irq[0],
+            "cores":  dict(zip(names[1:], busy[1:])),
+        }
+
+    def forget(self, serial: Optional[str] = None):
+        """Сбрасывает базу одного устройства (None – всех)."""
+        if serial is None:
+            self._prev.clear()
+        else:
+            self._prev.pop(serial, None)
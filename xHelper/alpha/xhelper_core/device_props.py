@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+device_props – реестр системных свойств устройств (`getprop`).
+
+Свойства сборки (модель, версия Android, ABI, отпечаток) не меняются до
+перезагрузки, поэтому вместо отдельного `getprop <ключ>` на каждый вопрос
+реестр один раз на подключение забирает полный дамп `getprop`, разбирает
+его в словарь и дальше отвечает из памяти:
+
+    props = main_window.adb.props.get(serial)
+    if props.sdk >= 31: ...
+    props.model, props.abi, props.fingerprint, props["persist.sys.locale"]
+
+Запись устройства сбрасывается при перезагрузке (команды reboot/root/unroot
+через AdbClient), при отключении и смене состояния (см. DeviceTracker).
+"""
+
+import re
+import threading
+from typing import Optional
+
+_START = re.compile(r"^\[([^\]]+)\]: \[(.*)$")
+
+# команды, после которых свойства надо перечитать
+_RESET_COMMANDS = ("reboot", "root", "unroot", "shell reboot", "shell setprop")
+
+
+def parse_getprop(text: str) -> dict:
+    """Вывод `getprop` («[ключ]: [значение]» по строке) → словарь."""
+    props = {}
+    key, value = None, []
+    for line in text.splitlines():
+        if key is None:
+            match = _START.match(line)
+            if not match:
+                continue
+            key, rest = match.groups()
+            value = [rest]
+        else:
+            value.append(line)           # значение с переводами строк
+        if value[-1].endswith("]"):
+            value[-1] = value[-1][:-1]
+            props[key] = "\n".join(value)
+            key = None
+    return props
+
+
+class DeviceProperties:
+    """Словарь свойств одного устройства с типизированными полями."""
+
+    def __init__(self, serial: Optional[str], props: dict):
+        self.serial = serial
+        self.props = props
+
+    def __getitem__(self, key: str) -> str:
+        return self.props[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.props
+
+    def get(self, key: str, default: str = "") -> str:
+        return self.props.get(key, default)
+
+    def _int(self, key: str) -> int:
+        try:
+            return int(self.props.get(key, ""))
+        except ValueError:
+            return 0
+
+    @property
+    def model(self) -> str:
+        return self.get("ro.product.model")
+
+    @property
+    def manufacturer(self) -> str:
+        return self.get("ro.product.manufacturer")
+
+    @property
+    def release(self) -> str:
+        """Версия Android («14»)."""
+        return self.get("ro.build.version.release")
+
+    @property
+    def sdk(self) -> int:
+        """API level (0, если не удалось прочитать)."""
+        return self._int("ro.build.version.sdk")
+
+    @property
+    def abi(self) -> str:
+        return self.get("ro.product.cpu.abi")
+
+    @property
+    def abis(self) -> list:
+        """Все поддерживаемые ABI в порядке предпочтения."""
+        raw = self.get("ro.product.cpu.abilist")
+        return [a for a in raw.split(",") if a] or ([self.abi] if self.abi else [])
+
+    @property
+    def fingerprint(self) -> str:
+        return self.get("ro.build.fingerprint")
+
+    @property
+    def serialno(self) -> str:
+        return self.get("ro.serialno") or (self.serial or "")
+
+    @property
+    def density(self) -> int:
+        """Плотность экрана (dpi) – нужна для выбора split‑APK."""
+        return self._int("ro.sf.lcd_density") or self._int("qemu.sf.lcd_density")
+
+    @property
+    def locale(self) -> str:
+        return self.get("persist.sys.locale") or self.get("ro.product.locale")
+
+    @property
+    def debuggable(self) -> bool:
+        return self.get("ro.debuggable") == "1"
+
+    def summary(self) -> str:
+        """«Pixel 7, Android 14 (SDK 34), arm64-v8a» – для строки состояния."""
+        parts = [self.model or self.serialno]
+        if self.release:
+            parts.append(f"Android {self.release} (SDK {self.sdk})")
+        if self.abi:
+            parts.append(self.abi)
+        return ", ".join(parts)
+
+
+class PropertyRegistry:
+    """
+    Кэш DeviceProperties по serial; заполняется одним `getprop` на устройство.
+
+    :param service: AdbService (через него идёт запрос и узнаём о reboot)
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.loads = 0                   # сколько раз реально ходили на устройство
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        service.client.command_hooks.append(self._on_command)
+
+    def get(self, serial: Optional[str] = None, timeout: float = 10.0) -> DeviceProperties:
+        """Свойства устройства (первый вызов после подключения – один getprop)."""
+        serial = self.service.target(serial)
+        entry = self._entries.get(serial)
+        if entry is not None:
+            return entry
+        with self._lock:
+            lock = self._locks.setdefault(serial, threading.Lock())
+        with lock:                       # параллельные вызовы ждут один запрос
+            entry = self._entries.get(serial)
+            if entry is None:
+                out = self.service.output("shell getprop", serial, timeout=timeout, cache_ttl=0)
+                entry = DeviceProperties(serial, parse_getprop(out))
+                self.loads += 1
+                self._entries[serial] = entry
+            return entry
+
+    def cached(self, serial: Optional[str]) -> Optional[DeviceProperties]:
+        """Свойства, если уже загружены (без обращения к устройству)."""
+        return self._entries.get(serial)
+
+    def forget(self, serial: Optional[str] = None):
+        """Сбрасывает одно устройство (None – все)."""
+        if serial is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(serial, None)
+
+    def _on_command(self, serial: Optional[str], args: list):
+        command = " ".join(str(a) for a in args)
+        if any(command == c or command.startswith(c + " ") for c in _RESET_COMMANDS):
+            self.forget(serial)
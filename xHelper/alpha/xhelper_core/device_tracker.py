@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+device_tracker – живой реестр устройств по подписке `host:track-devices-l`.
+
+Вместо `adb devices` перед каждым обновлением мониторинга, скриншотом и
+записью экрана держим одно долгоживущее соединение с adb‑сервером: сервер
+сам присылает полный список устройств при каждом изменении. Реестр
+сравнивает его с прошлым и рассылает события:
+
+    connected      – устройство появилось (в любом состоянии)
+    disconnected   – устройство пропало
+    state          – сменилось состояние: device / unauthorized / offline /
+                     recovery / sideload / bootloader …
+
+Читать реестр (devices(), online(), is_online()) можно из любого потока
+бесплатно – это просто словарь в памяти. Если сервер недоступен, трекер
+раз в `retry_interval` секунд опрашивает `adb devices` бинарником (это же
+поднимет сервер) и снова пытается подписаться.
+"""
+
+import socket
+import threading
+from typing import Callable, NamedTuple, Optional
+
+from .adb_client import AdbClient, AdbError, parse_devices, read_length_prefixed
+
+
+class DeviceEvent(NamedTuple):
+    """Изменение в реестре; info – поля `adb devices -l` (model, product …)."""
+    kind: str                 # connected | disconnected | state
+    serial: str
+    state: Optional[str]      # новое состояние (None для disconnected)
+    previous: Optional[str]   # прежнее состояние (None для connected)
+    info: dict
+
+
+class DeviceTracker:
+    """
+    :param client:         AdbClient
+    :param retry_interval: пауза между попытками переподписаться, с
+
+        tracker = DeviceTracker(client)
+        tracker.add_listener(lambda event: print(event))
+        tracker.start()
+        tracker.online()          # ['emulator-5554', …]
+    """
+
+    def __init__(self, client: AdbClient, retry_interval: float = 2.0):
+        self.client = client
+        self.retry_interval = retry_interval
+        self.tracking = False            # True, пока подписка активна
+        self._devices = {}               # serial -> dict из parse_devices
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sock = None
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    #   Чтение реестра
+    # ------------------------------------------------------------------
+    def devices(self) -> dict:
+        """Снимок реестра: {serial: {'serial', 'state', 'model', …}}."""
+        with self._lock:
+            return {serial: dict(info) for serial, info in self._devices.items()}
+
+    def state(self, serial: str) -> Optional[str]:
+        with self._lock:
+            info = self._devices.get(serial)
+            return info["state"] if info else None
+
+    def online(self) -> list:
+        """Устройства в состоянии `device` – те, с которыми можно работать."""
+        with self._lock:
+            return [s for s, info in self._devices.items() if info["state"] == "device"]
+
+    def is_online(self, serial: Optional[str] = None) -> bool:
+        """Готово ли устройство `serial` (None – хоть одно)."""
+        if serial is None:
+            return bool(self.online())
+        return self.state(serial) == "device"
+
+    # ------------------------------------------------------------------
+    #   Подписчики
+    # ------------------------------------------------------------------
+    def add_listener(self, fn: Callable):
+        """fn(DeviceEvent) – вызывается в потоке трекера."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    # ------------------------------------------------------------------
+    #   Запуск / остановка
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="adb-track-devices", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    def refresh(self):
+        """Разовый опрос `adb devices -l` (когда подписки нет)."""
+        self._apply(self.client.devices())
+
+    # ------------------------------------------------------------------
+    #   Внутреннее
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sock = self.client.track_devices()
+            except (OSError, AdbError):
+                # сервер не запущен: бинарный adb его поднимет, заодно узнаем список
+                try:
+                    self.refresh()
+                except Exception:
+                    self._apply([])
+                self._stop.wait(self.retry_interval)
+                continue
+            self._sock = sock
+            self.tracking = True
+            try:
+                sock.settimeout(None)
+                while not self._stop.is_set():
+                    raw = read_length_prefixed(sock).decode("utf-8", "replace")
+                    self._apply(parse_devices(raw))
+            except (OSError, AdbError, ValueError):
+                pass          # сервер перезапущен / остановлен – переподписываемся
+            finally:
+                self.tracking = False
+                self._sock = None
+                sock.close()
+            if not self._stop.is_set():
+                self._stop.wait(self.retry_interval)
+
+    def _apply(self, listing: list):
+        fresh = {d["serial"]: d for d in listing}
+        events = []
+        with self._lock:
+            old = self._devices
+            for serial, info in fresh.items():
+                before = old.get(serial)
+                if before is None:
+                    events.append(DeviceEvent("connected", serial, info["state"], None, info))
+                elif before["state"] != info["state"]:
+                    events.append(DeviceEvent("state", serial, info["state"], before["state"], info))
+            for serial, info in old.items():
+                if serial not in fresh:
+                    events.append(DeviceEvent("disconnected", serial, None, info["state"], info))
+            self._devices = fresh
+        for event in events:
+            # после переподключения у устройства могли смениться возможности
+            self.client.forget_features(event.serial)
+            for fn in list(self._listeners):
+                fn(event)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+executor – asyncio‑исполнитель ADB‑заданий.
+
+Один фоновый поток крутит asyncio‑цикл, в котором выполняются все задания
+(отдельные adb‑команды или составные корутины). На каждое устройство
+заводится свой семафор, поэтому одно «тяжёлое» устройство не забивает
+остальные, а десятки устройств обслуживаются без потока на задачу.
+
+Каждое задание возвращает JobHandle: по нему можно узнать статус, дождаться
+результата или отменить задание. Колбэки завершения вызываются в потоке
+цикла – главное окно переправляет их в GUI‑поток через Qt‑сигнал.
+"""
+
+import asyncio
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+from .adb_client import AdbClient
+
+
+class JobHandle:
+    """
+    Дескриптор задания.
+
+    status: pending → running → done | failed | timeout | cancelled
+    result: значение, которое вернуло задание (для adb‑команд – CompletedProcess)
+    error:  исключение, если status == "failed"
+    """
+
+    def __init__(self, serial: Optional[str], description: str):
+        self.serial = serial
+        self.description = description
+        self.status = "pending"
+        self.result = None
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._future = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        """Время выполнения в секундах (без ожидания в очереди)."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Блокирует вызывающий поток до завершения задания."""
+        return self._event.wait(timeout)
+
+    def cancel(self):
+        """Отменяет задание (ожидающее – сразу, выполняющееся – прерывает)."""
+        if self._future is not None and not self.done():
+            self._future.cancel()
+
+    def add_done_callback(self, fn: Callable):
+        """fn(handle); если задание уже завершено – вызывается сразу."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self, status: str):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.status = status
+            self.finished = time.monotonic()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+class AdbExecutor:
+    """
+    Исполнитель заданий с ограничением параллелизма на устройство.
+
+        executor = AdbExecutor(client, per_device_limit=2)
+        handle = executor.submit(["shell", "getprop"], serial="emulator-5554")
+        handle.wait(); print(handle.result.stdout)
+    """
+
+    def __init__(self, client: AdbClient, per_device_limit: int = 2):
+        self.client = client
+        self.per_device_limit = per_device_limit
+        self._semaphores = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="adb-executor", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _semaphore(self, serial: Optional[str]) -> asyncio.Semaphore:
+        # вызывается только из потока цикла
+        sem = self._semaphores.get(serial)
+        if sem is None:
+            sem = self._semaphores[serial] = asyncio.Semaphore(self.per_device_limit)
+        return sem
+
+    # ------------------------------------------------------------------
+    #   Постановка заданий
+    # ------------------------------------------------------------------
+    def submit(self, args: list, serial: Optional[str] = None,
+               timeout: Optional[float] = 30.0, text: bool = True,
+               callback: Optional[Callable] = None) -> JobHandle:
+        """Одна adb‑команда; результат – CompletedProcess."""
+        description = " ".join(self.client.command_line(args, serial))
+        return self.submit_call(
+            serial,
+            lambda: self.client.arun(args, serial, timeout=None, text=text),
+            timeout=timeout,
+            description=description,
+            callback=callback,
+        )
+
+    def submit_call(self, serial: Optional[str], factory: Callable,
+                    timeout: Optional[float] = None, description: str = "",
+                    callback: Optional[Callable] = None,
+                    gate: Optional[asyncio.Semaphore] = None,
+                    device_limit: bool = True) -> JobHandle:
+        """
+        Составное задание: `factory()` должна вернуть корутину. Она выполняется
+        под семафором устройства `serial`; `timeout` – на всё задание целиком.
+        `gate` – общий семафор группы заданий (см. fan_out). device_limit=False –
+        без семафора устройства (бесконечные потоки вроде logcat не должны
+        занимать слот, которого ждут обычные команды).
+        """
+        handle = JobHandle(serial, description)
+        if callback is not None:
+            handle.add_done_callback(callback)
+        handle._future = asyncio.run_coroutine_threadsafe(
+            self._run_job(handle, factory, timeout, gate, device_limit), self._loop
+        )
+        # отмена до старта корутины: _run_job так и не выполнится.
+        # Уже запущенное задание завершит себя само (и может вернуть
+        # частичный результат, если перехватит CancelledError).
+        handle._future.add_done_callback(
+            lambda f: handle._finish("cancelled") if f.cancelled() and handle.started is None else None
+        )
+        return handle
+
+    def fan_out(self, args: list, serials: list, limit: int = 8,
+                timeout: Optional[float] = 30.0, text: bool = True,
+                callback: Optional[Callable] = None) -> list:
+        """
+        Одна и та же adb‑команда сразу на нескольких устройствах.
+
+        Одновременно выполняется не больше `limit` команд (остальные ждут
+        в очереди), таймаут считается для каждого устройства отдельно.
+        Возвращает список JobHandle в порядке `serials`.
+        """
+        gate = asyncio.Semaphore(max(1, limit))
+        handles = []
+        for serial in serials:
+            handles.append(self.submit_call(
+                serial,
+                lambda serial=serial: self.client.arun(args, serial, timeout=None, text=text),
+                timeout=timeout,
+                description=" ".join(self.client.command_line(args, serial)),
+                callback=callback,
+                gate=gate,
+            ))
+        return handles
+
+    def submit_stream(self, args: list, serial: Optional[str], on_data: Callable,
+                      callback: Optional[Callable] = None) -> JobHandle:
+        """
+        Потоковая команда без таймаута (см. AdbClient.astream): on_data(bytes)
+        вызывается в потоке цикла, handle.result – код выхода. Остановка –
+        handle.cancel().
+        """
+        return self.submit_call(
+            serial,
+            lambda: self.client.astream(args, serial, on_data),
+            timeout=None,
+            description=" ".join(self.client.command_line(args, serial)),
+            callback=callback,
+            device_limit=False,
+        )
+
+    def submit_blocking(self, serial: Optional[str], fn: Callable, *args,
+                        timeout: Optional[float] = None, description: str = "",
+                        callback: Optional[Callable] = None) -> JobHandle:
+        """Блокирующая функция fn(*args) в пуле потоков, но под семафором устройства."""
+        loop = self._loop
+        return self.submit_call(
+            serial,
+            lambda: loop.run_in_executor(None, fn, *args),
+            timeout=timeout,
+            description=description or getattr(fn, "__name__", "job"),
+            callback=callback,
+        )
+
+    async def _run_job(self, handle: JobHandle, factory: Callable, timeout: Optional[float],
+                       gate: Optional[asyncio.Semaphore] = None, device_limit: bool = True):
+        status = "failed"
+        gates = [g for g in (self._semaphore(handle.serial) if device_limit else None, gate)
+                 if g is not None]
+        acquired = []
+        try:
+            try:
+                for g in gates:
+                    await g.acquire()
+                    acquired.append(g)
+                handle.status = "running"
+                handle.started = time.monotonic()
+                if timeout:
+                    handle.result = await asyncio.wait_for(factory(), timeout)
+                else:
+                    handle.result = await factory()
+            finally:
+                for g in acquired:
+                    g.release()
+            status = "done"
+        except asyncio.CancelledError:
+            status = "cancelled"
+        except (asyncio.TimeoutError, subprocess.TimeoutExpired) as e:
+            handle.error = e
+            status = "timeout"
+        except Exception as e:
+            handle.error = e
+            status = "failed"
+        finally:
+            if handle.started is None:
+                handle.started = time.monotonic()
+            handle._finish(status)
+
+    # ------------------------------------------------------------------
+    #   Завершение
+    # ------------------------------------------------------------------
+    def shutdown(self, timeout: float = 2.0):
+        """Отменяет все задания и останавливает цикл."""
+        def stop():
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.call_soon(self._loop.stop)
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(stop)
+            self._thread.join(timeout)
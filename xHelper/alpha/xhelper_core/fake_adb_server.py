@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+"""
+fake_adb_server – локальный «поддельный» adb‑сервер для проверки без телефона.
+
+Понимает тот же smart‑socket протокол, что и настоящий сервер, и отвечает
+на команды заранее заданными данными. Удобно гонять xHelper и его клиент
+на машине без подключённых устройств:
+
+    python -m xhelper_core.fake_adb_server --port 5038
+    ANDROID_ADB_SERVER_PORT=5038 python "xHelper alpha 1.0.1.py"
+
+Или из кода:
+
+    server = FakeAdbServer({"emulator-5554": "device"})
+    host, port = server.start()
+    client = AdbClient(port=port)
+    ...
+    server.stop()
+"""
+
+import argparse
+import posixpath
+import queue
+import re
+import socket
+import stat
+import struct
+import threading
+import time
+from typing import Callable, Optional
+
+from . import shell_protocol
+from .adb_client import read_exact
+from .net_stat import NET_COMMAND
+from .procstat import PROC_COMMAND
+from .thermal import THERMAL_COMMAND
+
+
+# Ответы «по умолчанию» для самых частых запросов xHelper
+def _fake_proc_stat() -> str:
+    """`/proc/stat` четырёхъядерного устройства: тики растут со временем (100 Гц)."""
+    ticks = int(time.monotonic() * 100)
+    lines = []
+    for core, load in enumerate((0.6, 0.3, 0.15, 0.05)):
+        busy = int(ticks * load)
+        lines.append(f"cpu{core} {busy * 7 // 10} 0 {busy * 2 // 10} {ticks - busy} "
+                     f"{busy // 20} {busy // 40} {busy // 40} 0 0 0")
+    total = [sum(int(line.split()[i]) for line in lines) for i in range(1, 11)]
+    return "\n".join(["cpu  " + " ".join(map(str, total))] + lines) + "\nintr 0\n"
+
+
+def _fake_net_dev() -> str:
+    """Ответ на NET_COMMAND: uptime и /proc/net/dev с растущими счётчиками."""
+    now = time.monotonic()
+    lines = [f"{now:.2f} {now * 3:.2f}",
+             "Inter-|   Receive                                                |  Transmit",
+             " face |bytes    packets errs drop fifo frame compressed multicast|"
+             "bytes    packets errs drop fifo colls carrier compressed"]
+    for name, rx, tx in (("lo", 2000, 2000), ("dummy0", 0, 0), ("rmnet_data0", 50000, 8000),
+                         ("wlan0", 1200000, 90000)):
+        rx_bytes, tx_bytes = int(now * rx), int(now * tx)
+        lines.append(f"{name:>6}: {rx_bytes} {rx_bytes // 1400} 0 0 0 0 0 0 "
+                     f"{tx_bytes} {tx_bytes // 600} 0 0 0 0 0 0")
+    return "\n".join(lines) + "\n"
+
+
+def _fake_thermal() -> str:
+    """Ответ на THERMAL_COMMAND: зоны греются, на горячем устройстве big‑ядра ограничены."""
+    heat = (time.monotonic() % 120) / 120          # цикл «нагрев – остывание» за 2 мин.
+    temps = {"cpu-0-0-usr": 38 + 20 * heat, "cpu-1-0-usr": 40 + 22 * heat,
+             "gpuss-0-usr": 36 + 12 * heat, "battery": 30 + 6 * heat, "xo-therm": 33.0}
+    lines = [f"zone|thermal_zone{i}|{name}|{int(temp * 1000)}"
+             for i, (name, temp) in enumerate(temps.items())]
+    lines.append("zone|thermal_zone9|disabled|-273000")
+    for core in range(4):
+        hw_max = 1800000 if core < 2 else 2800000
+        cap = hw_max if core < 2 or heat < 0.5 else 1900000
+        lines.append(f"freq|cpu{core}|{min(cap, 1500000 + core * 100000)}|{cap}|{hw_max}")
+    return "\n".join(lines) + "\n"
+
+
+def _fake_processes(count: int = 600) -> str:
+    """Ответ на PROC_COMMAND: `count` процессов, тики растут со временем."""
+    ticks = int(time.monotonic() * 100)
+    lines = ["4096", _fake_proc_stat().splitlines()[0]]
+    for pid in range(1, count + 1):
+        busy = ticks * (pid % 7) // 400
+        name = f"com.example.app{pid}" if pid > 100 else f"kworker/{pid}"
+        lines.append(f"{pid} ({name[:15]}) S 1 {pid} 0 0 -1 0 0 0 0 0 {busy} {busy // 3} 0 0 "
+                     f"20 0 {pid % 40 + 1} 0 {pid * 10} 0 {pid * 3} 0|"
+                     f"{pid * 100} {pid * 3 + (ticks // 100) % 5} 0 0 0 0 0|"
+                     f"{name if pid > 100 else ''}")
+    return "\n".join(lines) + "\n"
+
+
+DEFAULT_SHELL_RESPONSES = {
+    "getprop ro.product.model": "Fake Phone\n",
+    "getprop ro.build.version.release": "14\n",
+    "getprop ro.build.version.sdk": "34\n",
+    "getprop": (
+        "[ro.build.fingerprint]: [fake/fake/fake:14/UP1A.231005.007/1:user/release-keys]\n"
+        "[ro.build.version.release]: [14]\n"
+        "[ro.build.version.sdk]: [34]\n"
+        "[ro.product.cpu.abi]: [arm64-v8a]\n"
+        "[ro.product.cpu.abilist]: [arm64-v8a,armeabi-v7a,armeabi]\n"
+        "[ro.product.manufacturer]: [Fake]\n"
+        "[ro.product.model]: [Fake Phone]\n"
+        "[ro.sf.lcd_density]: [420]\n"
+        "[ro.serialno]: [FAKE0001]\n"
+    ),
+    "dumpsys battery": (
+        "Current Battery Service state:\n"
+        "  AC powered: false\n"
+        "  USB powered: true\n"
+        "  status: 2\n"
+        "  level: 87\n"
+        "  voltage: 4213\n"
+        "  temperature: 305\n"
+    ),
+    "cat /proc/meminfo": (
+        "MemTotal:        7812340 kB\n"
+        "MemFree:          512220 kB\n"
+        "MemAvailable:    3104552 kB\n"
+    ),
+    "cat /proc/stat": _fake_proc_stat,
+    NET_COMMAND: _fake_net_dev,
+    THERMAL_COMMAND: _fake_thermal,
+    "ip -f inet addr": (
+        "1: lo: <LOOPBACK,UP,LOWER_UP> mtu 65536 qdisc noqueue state UNKNOWN group default qlen 1000\n"
+        "    inet 127.0.0.1/8 scope host lo\n"
+        "       valid_lft forever preferred_lft forever\n"
+        "30: wlan0: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc mq state UP group default qlen 3000\n"
+        "    inet 192.168.1.42/24 brd 192.168.1.255 scope global wlan0\n"
+        "       valid_lft forever preferred_lft forever\n"
+    ),
+    PROC_COMMAND: _fake_processes,
+    "dumpsys wifi": (
+        "Wi-Fi is enabled\n"
+        "mWifiInfo SSID: \"FakeNet\", BSSID: 02:00:00:00:00:00, "
+        "Supplicant state: COMPLETED, RSSI: -58, Link speed: 433Mbps\n"
+    ),
+    "pm list packages -3": "package:com.example.one\npackage:com.example.two\n",
+}
+
+
+class FakeAdbServer:
+    """
+    Минимальная реализация adb‑сервера в отдельном потоке.
+
+    :param devices:          {serial: state}, например {"emulator-5554": "device"}
+    :param shell_responses:  {команда: вывод} для shell:/exec: (вместо вывода –
+                             callable() без аргументов для меняющихся ответов)
+    :param shell_handler:    callable(serial, command) -> str|bytes|None,
+                             вызывается раньше таблицы ответов; может вернуть
+                             (stdout, stderr, код) – для shell v2
+    :param files:            {путь: bytes} – «файловая система» для sync:
+                             (общая для всех устройств, каталоги – по префиксам)
+    :param features:         что отвечать на host‑serial:<serial>:features
+    :param latency:          имитация задержки USB/сети: ответ на каждую
+                             shell‑команду уходит не раньше, чем через `latency`
+                             секунд после прихода запроса (запросы, пришедшие
+                             пачкой, обслуживаются параллельно – как у adbd)
+    """
+
+    def __init__(self, devices: Optional[dict] = None,
+                 shell_responses: Optional[dict] = None,
+                 shell_handler: Optional[Callable] = None,
+                 host: str = "127.0.0.1", port: int = 0,
+                 files: Optional[dict] = None,
+                 features: str = "shell_v2,cmd,stat_v2,ls_v2",
+                 latency: float = 0.0):
+        self.devices = dict(devices if devices is not None else {"emulator-5554": "device"})
+        self.shell_responses = dict(DEFAULT_SHELL_RESPONSES)
+        self.shell_responses.update(shell_responses or {})
+        self.shell_handler = shell_handler
+        self.files = dict(files or {})
+        self.features = features
+        self.latency = latency
+        self.requests = []            # журнал всех полученных запросов
+        self.sessions = {}            # id -> {"serial", "size", "splits": {имя: bytes}, "state"}
+        self.streamed = []            # (serial, байт) – потоковые `cmd package install -S`
+        self._changed = threading.Condition()   # будит подписчиков track-devices
+        self._host = host
+        self._port = port
+        self._sock = None
+        self._thread = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    #   Запуск / остановка
+    # ------------------------------------------------------------------
+    def start(self) -> tuple:
+        """Запускает сервер и возвращает (host, port)."""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self._host, self._port))
+        self._sock.listen(64)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self._sock.getsockname()
+
+    def stop(self):
+        self._running = False
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        with self._changed:
+            self._changed.notify_all()
+
+    def set_device(self, serial: str, state: Optional[str]):
+        """Подключает / меняет состояние / (state=None) отключает устройство."""
+        with self._changed:
+            if state is None:
+                self.devices.pop(serial, None)
+            else:
+                self.devices[serial] = state
+            self._changed.notify_all()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    # ------------------------------------------------------------------
+    #   Протокол
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _okay(conn, payload: Optional[bytes] = None):
+        data = b"OKAY"
+        if payload is not None:
+            data += b"%04x" % len(payload) + payload
+        conn.sendall(data)
+
+    @staticmethod
+    def _fail(conn, message: str):
+        msg = message.encode("utf-8")
+        conn.sendall(b"FAIL" + b"%04x" % len(msg) + msg)
+
+    def _device_listing(self, long: bool) -> bytes:
+        lines = []
+        for serial, state in self.devices.items():
+            if long:
+                lines.append(f"{serial:<22} {state} product:fake model:Fake_Phone device:fake")
+            else:
+                lines.append(f"{serial}\t{state}")
+        return ("\n".join(lines) + ("\n" if lines else "")).encode("utf-8")
+
+    def _track_devices(self, conn: socket.socket, long: bool):
+        """Полный список сразу и заново при каждом set_device()."""
+        while self._running:
+            with self._changed:
+                listing = self._device_listing(long)
+                conn.sendall(b"%04x" % len(listing) + listing)
+                self._changed.wait()
+
+    def _install_session(self, serial: str, command: str) -> Optional[str]:
+        """`pm install-create / install-commit / install-abandon` – сессии в self.sessions."""
+        match = re.search(r"install-(create|commit|abandon)(?:.* -S (\d+))?(?: (\d+))?\s*$", command)
+        if not match:
+            return None
+        action, size, session = match.groups()
+        if action == "create":
+            with self._changed:
+                session = str(len(self.sessions) + 1)
+                self.sessions[session] = {"serial": serial, "size": int(size or 0),
+                                          "splits": {}, "state": "open"}
+            return f"Success: created install session [{session}]\n"
+        if session not in self.sessions:
+            return f"Failure [INSTALL_FAILED_INTERNAL_ERROR: no session {session}]\n"
+        entry = self.sessions[session]
+        if action == "abandon":
+            entry["state"] = "abandoned"
+            return "Success\n"
+        written = sum(len(data) for data in entry["splits"].values())
+        if entry["size"] and written != entry["size"]:
+            entry["state"] = "failed"
+            return f"Failure [INSTALL_FAILED_INVALID_APK: {written} of {entry['size']} bytes]\n"
+        entry["state"] = "committed"
+        return "Success\n"
+
+    def _install_write(self, conn: socket.socket, serial: str, command: str) -> Optional[bytes]:
+        """
+        `exec:pm install-write -S <размер> <id> <имя> -`: часть читается из stdin;
+        `exec:cmd package install -r -S <размер>` – целый APK тем же способом.
+        """
+        streamed = re.search(r"package install (?:-r )?-S (\d+)$", command)
+        if streamed:
+            data = read_exact(conn, int(streamed.group(1)))
+            with self._changed:
+                self.streamed.append((serial, len(data)))
+            return b"Success\n"
+        match = re.search(r"install-write -S (\d+) (\d+) (\S+) -$", command)
+        if not match:
+            return None
+        size, session, name = int(match.group(1)), match.group(2), match.group(3)
+        data = read_exact(conn, size)
+        if session not in self.sessions:
+            return f"Failure [no session {session}]\n".encode("utf-8")
+        self.sessions[session]["splits"][name] = data
+        return f"Success: streamed {size} bytes\n".encode("utf-8")
+
+    def _shell_result(self, serial: str, command: str) -> tuple:
+        """(stdout, stderr, код) в байтах."""
+        out = None
+        if self.shell_handler:
+            out = self.shell_handler(serial, command)
+        if out is None:
+            out = self._install_session(serial, command)
+        if out is None:
+            out = self.shell_responses.get(command.strip(), "")
+            if callable(out):
+                out = out()              # «живые» ответы (счётчики /proc/stat)
+        out, err, code = out if isinstance(out, tuple) else (out, b"", 0)
+        encode = lambda v: v.encode("utf-8") if isinstance(v, str) else v
+        return encode(out), encode(err), code
+
+    def _delay(self, arrived: float):
+        """Ждёт до arrived + latency (time.monotonic())."""
+        remaining = arrived + self.latency - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _shell_output(self, serial: str, command: str) -> bytes:
+        """Вывод для старого `shell:` – stdout и stderr вперемешку, без кода."""
+        out, err, _code = self._shell_result(serial, command)
+        return out + err
+
+    def _shell_v2(self, conn: socket.socket, serial: str, command: str):
+        """shell,v2: stdout/stderr отдельными пакетами и кадр exit."""
+        arrived = time.monotonic()
+        header = read_exact(conn, 5)          # клиент сразу закрывает stdin
+        read_exact(conn, struct.unpack("<BI", header)[1])
+        self._delay(arrived)
+        out, err, code = self._shell_result(serial, command)
+        for start in range(0, len(out), 4096):   # как adbd – кусками
+            conn.sendall(shell_protocol.encode_packet(shell_protocol.ID_STDOUT, out[start:start + 4096]))
+        if err:
+            conn.sendall(shell_protocol.encode_packet(shell_protocol.ID_STDERR, err))
+        conn.sendall(shell_protocol.encode_packet(shell_protocol.ID_EXIT, bytes([code & 0xFF])))
+
+    def _interactive_shell(self, conn: socket.socket, serial: str):
+        """
+        Интерактивный shell: каждая строка – команда. Группа «{ cmd … }»
+        выполняется целиком, `printf '…%s %d…' MARKER $?` печатает маркер
+        с кодом команды, а при `2>"$XH_E"` за ним – stderr и второй маркер;
+        проверка файла для stderr всегда удачна – этого достаточно для ShellSession.
+        """
+        stream = conn.makefile("rb")
+        lines = queue.Queue()
+
+        def read_lines():
+            # время прихода строки фиксируем сразу – для имитации latency
+            try:
+                for raw in iter(stream.readline, b""):
+                    lines.put((time.monotonic(), raw))
+            except (OSError, ValueError):
+                pass
+            lines.put(None)
+        threading.Thread(target=read_lines, daemon=True).start()
+
+        group = None
+        for arrived, raw in iter(lines.get, None):
+            line = raw.decode("utf-8", "replace").rstrip("\n")
+            if group is None and line.startswith("{ "):
+                group = [line[2:]]
+                continue
+            if group is not None and not line.startswith("}"):
+                group.append(line)
+                continue
+            if group is not None:
+                self._delay(arrived)
+                out, err, code = self._shell_result(serial, "\n".join(group))
+                group = None
+                err_marker = re.search(r"printf '\\n%s\\n' (\S+)$", line)
+                conn.sendall(out if err_marker else out + err)
+                match = re.search(r"printf '\\n%s %d\\n' (\S+) \$\?", line)
+                if match:
+                    conn.sendall(f"\n{match.group(1)} {code}\n".encode())
+                if err_marker:
+                    conn.sendall(err + f"\n{err_marker.group(1)}\n".encode())
+                continue
+            probe = re.search(r"then echo (\S+) 1;", line)
+            if probe:
+                conn.sendall(f"{probe.group(1)} 1\n".encode())
+                continue
+            self._delay(arrived)
+            conn.sendall(self._shell_output(serial, line))
+
+    # ------------------------------------------------------------------
+    #   sync: (push / pull / ls / stat) поверх словаря self.files
+    # ------------------------------------------------------------------
+    def _lookup(self, path: str) -> tuple:
+        """(mode, size) пути: файл, каталог (префикс других путей) или (0, 0)."""
+        path = path.rstrip("/") or "/"
+        if path in self.files:
+            return stat.S_IFREG | 0o644, len(self.files[path])
+        prefix = path if path.endswith("/") else path + "/"
+        if path == "/" or any(p.startswith(prefix) for p in self.files):
+            return stat.S_IFDIR | 0o755, 4096
+        return 0, 0
+
+    @staticmethod
+    def _stat_v2(mode: int, size: int) -> bytes:
+        now = int(time.time())
+        return struct.pack("<IQQIIIIQqqq", 0 if mode else 2, 0, 0, mode, 1,
+                           0, 0, size, now, now, now)
+
+    def _sync(self, conn: socket.socket):
+        while True:
+            try:
+                header = read_exact(conn, 8)
+            except Exception:
+                return                      # клиент закрыл сессию без QUIT
+            cmd, length = header[:4], struct.unpack("<I", header[4:])[0]
+            data = read_exact(conn, length) if length else b""
+            if cmd == b"QUIT":
+                return
+            path = data.decode("utf-8", "replace")
+            if cmd == b"STAT":
+                mode, size = self._lookup(path)
+                conn.sendall(b"STAT" + struct.pack("<III", mode, size, int(time.time()) if mode else 0))
+            elif cmd in (b"STA2", b"LST2"):
+                # ссылок в «файловой системе» нет – stat и lstat совпадают
+                conn.sendall(cmd + self._stat_v2(*self._lookup(path)))
+            elif cmd in (b"LIST", b"LIS2"):
+                prefix = path.rstrip("/") + "/"
+                names = sorted({p[len(prefix):].split("/", 1)[0]
+                                for p in self.files if p.startswith(prefix)})
+                for name in [".", ".."] + names:
+                    mode, size = self._lookup(prefix + name) if name not in (".", "..") \
+                        else (stat.S_IFDIR | 0o755, 4096)
+                    raw = name.encode("utf-8")
+                    if cmd == b"LIS2":
+                        conn.sendall(b"DNT2" + self._stat_v2(mode, size) + struct.pack("<I", len(raw)) + raw)
+                    else:
+                        conn.sendall(b"DENT" + struct.pack("<IIII", mode, size, int(time.time()), len(raw)) + raw)
+                conn.sendall(b"DONE" + bytes(72 if cmd == b"LIS2" else 16))
+            elif cmd == b"RECV":
+                if path not in self.files:
+                    msg = b"No such file or directory"
+                    conn.sendall(b"FAIL" + struct.pack("<I", len(msg)) + msg)
+                    return
+                content = self.files[path]
+                for i in range(0, len(content), 64 * 1024):
+                    chunk = content[i:i + 64 * 1024]
+                    conn.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+                conn.sendall(b"DONE" + struct.pack("<I", 0))
+            elif cmd == b"SEND":
+                remote = path.rsplit(",", 1)[0]
+                chunks = []
+                while True:
+                    header = read_exact(conn, 8)
+                    if header[:4] == b"DONE":
+                        break
+                    chunks.append(read_exact(conn, struct.unpack("<I", header[4:])[0]))
+                self.files[posixpath.normpath(remote)] = b"".join(chunks)
+                conn.sendall(b"OKAY" + struct.pack("<I", 0))
+            else:
+                msg = f"unknown sync command {cmd!r}".encode()
+                conn.sendall(b"FAIL" + struct.pack("<I", len(msg)) + msg)
+                return
+
+    def _serve(self, conn: socket.socket):
+        serial = None
+        try:
+            while True:
+                try:
+                    length = int(read_exact(conn, 4), 16)
+                    request = read_exact(conn, length).decode("utf-8")
+                except Exception:
+                    return
+                self.requests.append(request)
+
+                if request == "host:version":
+                    self._okay(conn, b"0029")
+                    return
+                if request in ("host:devices", "host:devices-l"):
+                    self._okay(conn, self._device_listing(request.endswith("-l")))
+                    return
+                if request in ("host:track-devices", "host:track-devices-l"):
+                    self._okay(conn)
+                    self._track_devices(conn, request.endswith("-l"))
+                    return
+                if request == "host:features" or (
+                        request.startswith("host-serial:") and request.endswith(":features")):
+                    self._okay(conn, self.features.encode())
+                    return
+                if request.startswith("host:transport:"):
+                    wanted = request.split(":", 2)[2]
+                    state = self.devices.get(wanted)
+                    if state is None:
+                        self._fail(conn, f"device '{wanted}' not found")
+                        return
+                    if state != "device":
+                        self._fail(conn, f"device {state}")
+                        return
+                    serial = wanted
+                    self._okay(conn)
+                    continue
+                if request == "host:transport-any":
+                    online = [s for s, st in self.devices.items() if st == "device"]
+                    if not online:
+                        self._fail(conn, "no devices/emulators found")
+                        return
+                    if len(online) > 1:
+                        self._fail(conn, "more than one device/emulator")
+                        return
+                    serial = online[0]
+                    self._okay(conn)
+                    continue
+                if request in ("shell:", "exec:sh") and serial:
+                    self._okay(conn)
+                    self._interactive_shell(conn, serial)
+                    return
+                if request == "sync:" and serial:
+                    self._okay(conn)
+                    self._sync(conn)
+                    return
+                if request.startswith("shell,v2,") and serial:
+                    self._okay(conn)
+                    self._shell_v2(conn, serial, request.split(":", 1)[1])
+                    return
+                if request.startswith(("shell:", "exec:")) and serial:
+                    self._okay(conn)
+                    arrived = time.monotonic()
+                    command = request.split(":", 1)[1]
+                    out = self._install_write(conn, serial, command) if request.startswith("exec:") else None
+                    self._delay(arrived)
+                    conn.sendall(out if out is not None else self._shell_output(serial, command))
+                    return
+                self._fail(conn, f"unknown service: {request}")
+                return
+        finally:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поддельный adb‑сервер для xHelper")
+    parser.add_argument("--port", type=int, default=5038)
+    parser.add_argument("--device", action="append", default=None,
+                        help="serial устройства (можно несколько раз)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="задержка ответа на shell‑команду, с")
+    args = parser.parse_args()
+
+    devices = {serial: "device" for serial in (args.device or ["emulator-5554"])}
+    server = FakeAdbServer(devices, port=args.port, latency=args.latency)
+    host, port = server.start()
+    print(f"Fake adb server слушает {host}:{port}, устройства: {', '.join(devices)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
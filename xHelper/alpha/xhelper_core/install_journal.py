@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+install_journal – журнал массовой установки, по которому её можно продолжить.
+
+Ночной прогон сотен APK по партии телефонов, остановленный кнопкой или
+упавший вместе с приложением, начинался заново с первого APK: кроме
+текстового `install_log_*.txt` ничего не оставалось. Журнал – JSON Lines,
+только дозапись: строка «run» с планом прогона и по строке на каждый итог
+«устройство × APK» сразу, как он получен (flush + fsync – переживает и
+падение процесса):
+
+    {"event": "run", "timestamp": …, "devices": [...], "apks": [...], "resumed": false}
+    {"event": "result", "serial": …, "apk": …, "status": "success", …, "signature": [size, mtime_ns]}
+
+«Продолжить» читает журнал, берёт план из первой строки «run» и не ставит
+то, что уже success / skipped, если APK с тех пор не менялся:
+
+    journal = InstallJournal.create()               # install_journal_<время>.jsonl
+    job = MassInstall(executor, serials, apks, journal=journal)
+
+    journal = InstallJournal(InstallJournal.latest())
+    serials, apks = journal.plan()
+    job = MassInstall(executor, serials, apks, journal=journal)   # только остаток
+
+Оборванная при падении последняя строка пропускается при чтении.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from .apk_index import signature
+from .installer import InstallResult
+
+# итоги, которые при продолжении не повторяем; failed / timeout – пробуем снова
+DONE_STATUSES = ("success", "skipped")
+
+
+class InstallJournal:
+    """
+    :param path: файл журнала (JSON Lines); существующий читается, новые
+                 строки дописываются в конец
+    """
+
+    PATTERN = "install_journal_*.jsonl"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = []                # все разобранные строки по порядку
+        self._lock = threading.Lock()
+        self._torn = False               # файл кончается оборванной строкой
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            raw = b""
+        self._torn = bool(raw) and not raw.endswith(b"\n")
+        for line in raw.decode("utf-8", "replace").splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue                 # запись, оборванная падением
+            if isinstance(entry, dict):
+                self.entries.append(entry)
+
+    @classmethod
+    def create(cls, directory: str = ".") -> "InstallJournal":
+        """Новый журнал `install_journal_<время>.jsonl` в каталоге."""
+        return cls(os.path.join(directory, f"install_journal_{datetime.now():%Y%m%d_%H%M%S}.jsonl"))
+
+    @classmethod
+    def latest(cls, directory: str = ".") -> Optional[str]:
+        """Самый свежий журнал каталога (None – журналов нет)."""
+        paths = glob.glob(os.path.join(directory, cls.PATTERN))
+        return max(paths, key=os.path.getmtime) if paths else None
+
+    # ------------------------------------------------------------------
+    #   Запись
+    # ------------------------------------------------------------------
+    def _append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                if self._torn:
+                    f.write("\n")        # не приклеиваем запись к оборванной
+                    self._torn = False
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries.append(entry)
+
+    def begin(self, serials: list, apk_files: list):
+        """Строка «run»: план прогона (первая такая строка – план для «Продолжить»)."""
+        self._append({
+            "event":     "run",
+            "timestamp": datetime.now().isoformat(),
+            "devices":   list(serials),
+            "apks":      [os.path.abspath(apk) for apk in apk_files],
+            "resumed":   any(entry.get("event") == "run" for entry in self.entries),
+        })
+
+    def record(self, result: InstallResult):
+        try:
+            sig = list(signature(result.apk))
+        except OSError:
+            sig = None
+        entry = {"event": "result", "timestamp": time.time(), "signature": sig}
+        entry.update(result._asdict())
+        entry["apk"] = os.path.abspath(result.apk)
+        self._append(entry)
+
+    # ------------------------------------------------------------------
+    #   Чтение
+    # ------------------------------------------------------------------
+    def plan(self) -> tuple:
+        """(устройства, APK) первого прогона журнала; ([], []) – журнал пуст."""
+        for entry in self.entries:
+            if entry.get("event") == "run":
+                return list(entry.get("devices", [])), list(entry.get("apks", []))
+        return [], []
+
+    def completed(self) -> dict:
+        """
+        {(serial, абсолютный путь APK): InstallResult} – что при продолжении
+        не ставим: последний итог success / skipped, а APK на хосте тот же.
+        """
+        last = {}
+        for entry in self.entries:
+            if entry.get("event") == "result":
+                last[(entry.get("serial"), entry.get("apk"))] = entry
+        done = {}
+        for key, entry in last.items():
+            if entry.get("status") not in DONE_STATUSES:
+                continue
+            try:
+                if entry.get("signature") != list(signature(key[1])):
+                    continue             # APK заменили – ставим заново
+            except OSError:
+                continue
+            try:
+                done[key] = InstallResult(*(entry[field] for field in InstallResult._fields))
+            except KeyError:
+                continue
+        return done
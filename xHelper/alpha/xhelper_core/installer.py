@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+installer – массовая установка APK сразу на несколько устройств.
+
+Раньше «Массовая установка APK» ставила папку по одному APK на одно
+устройство: подготовка партии телефонов – это прогон той же папки на
+каждом телефоне по очереди. Теперь у каждого устройства свой воркер
+со своей очередью:
+
+    job = MassInstall(executor, ["dev1", "dev2"], apk_files, parallel=4,
+                      on_result=print)
+    handles = job.start()          # JobHandle на устройство
+    job.stop()                     # все очереди; текущие установки прерываются
+    job.report()                   # матрица «APK × устройство» и строки отчёта
+
+PackageManager одного устройства всё равно ставит пакеты по одному,
+поэтому воркер идёт по своей очереди последовательно, а `parallel`
+ограничивает, сколько устройств принимают APK одновременно (USB‑хаб и
+диск хоста – общие на всех).
+
+Наборы split‑APK (каталог, `.apks`, `.xapk` – см. apk_bundle) ставятся
+одной сессией PackageManager на устройство:
+
+    pm install-create -r -S <всего байт>      → session id
+    exec:pm install-write -S <размер> <id> <имя> -   ← байты части прямо из
+                                                       файла / zip на хосте
+    pm install-commit <id>
+
+без распаковки во временный каталог; ABI‑части чужой архитектуры не
+передаются. Без adb‑сервера каталог ставится бинарным `adb install-multiple`.
+
+Одиночный APK ставится без копии в /data/local/tmp (режим `mode`):
+
+    incremental – `adb install --incremental`: рядом лежит `<apk>.idsig`
+                  (подпись v4), а у устройства есть ro.incremental.enable –
+                  приложение запускается, пока хвост APK ещё докачивается;
+    streamed    – `exec:cmd package install -S <размер>`, байты APK идут
+                  прямо из файла хоста в stdin PackageManager (Android 7+,
+                  фича adb‑сервера «cmd»);
+    legacy      – обычный `adb install` (push + pm install).
+
+«auto» пробует их по порядку: режим, который устройство не поддержало
+(ошибка не PackageManager, а транспорта / опций), отключается для него до
+конца прогона, и APK тут же ставится следующим. Таймаут растёт с размером
+APK (не меньше size / min_rate), а в итоге каждого APK – режим и скорость
+в МБ/с (`InstallResult.rate`, `report()["throughput"]` – по моделям).
+
+С index=ApkIndex воркер сначала сверяет очередь с одним
+`pm list packages --show-versioncode` устройства: APK той же или более
+старой версии, чем установленная, не ставятся (статус skipped), так что
+повторный прогон по той же папке почти ничего не делает.
+
+С journal=InstallJournal каждый итог сразу дописывается в журнал, а то,
+что журнал уже знает как success / skipped, в очереди не попадает и
+сразу числится в итогах – так продолжается прерванный прогон.
+"""
+
+import asyncio
+import os
+import re
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from .apk_bundle import BUNDLE_SUFFIXES, load_bundle, select_splits
+from .apk_index import parse_package_versions, signature, skip_reason
+
+_CHUNK = 1 << 20                  # столько байт части читаем с диска за раз
+MODES = ("auto", "incremental", "streamed", "legacy")
+_DEVICE_COMMAND = ("getprop ro.product.model; getprop ro.product.cpu.abilist; "
+                   "getprop ro.incremental.enable")
+
+
+class InstallResult(NamedTuple):
+    """Итог установки одного APK на одно устройство."""
+    serial: str
+    apk: str                  # путь на хосте
+    status: str               # success, skipped, failed, timeout, exception, cancelled
+    details: str
+    duration: float           # с
+    size: int = 0             # байт передано (для наборов – выбранные части)
+    mode: str = ""            # incremental, streamed, legacy, session
+
+    @property
+    def rate(self) -> float:
+        """Скорость установки целиком (передача + PackageManager), МБ/с."""
+        if self.status != "success" or self.duration <= 0:
+            return 0.0
+        return self.size / self.duration / 1e6
+
+
+def _install_details(result: subprocess.CompletedProcess) -> str:
+    """«Failure [INSTALL_FAILED_…]» из вывода `adb install` (он пишет и в stdout)."""
+    lines = [line.strip() for line in f"{result.stdout}\n{result.stderr}".splitlines()
+             if line.strip()]
+    for line in reversed(lines):
+        if line.startswith(("Failure", "Error", "adb: ")):
+            return line
+    return lines[-1] if lines else f"код {result.returncode}"
+
+
+class MassInstall:
+    """
+    :param executor:   AdbExecutor – воркер устройства занимает один его слот
+    :param serials:    устройства
+    :param apk_files:  общая очередь APK (каждое устройство проходит её целиком)
+    :param parallel:   сколько устройств ставят одновременно
+    :param timeout:    предел на один APK, с (для больших – size / min_rate)
+    :param mode:       auto, incremental, streamed, legacy – см. MODES
+    :param min_rate:   ниже какой скорости (байт/с) большой APK считается зависшим
+    :param journal:    InstallJournal – писать итоги и пропускать сделанное в нём
+    :param index:      ApkIndex – пропускать уже установленное (None – ставить всё)
+    :param on_start:   callable(serial, index, apk) – воркер взялся за APK
+    :param on_result:  callable(InstallResult)
+    Колбэки вызываются в потоке исполнителя.
+    """
+
+    def __init__(self, executor, serials: list, apk_files: list, parallel: int = 4,
+                 timeout: float = 360.0, index=None, on_start: Optional[Callable] = None,
+                 on_result: Optional[Callable] = None, mode: str = "auto",
+                 min_rate: float = 2e6, journal=None):
+        if mode not in MODES:
+            raise ValueError(f"неизвестный режим установки: {mode}")
+        self.executor = executor
+        self.client = executor.client
+        self.serials = list(serials)
+        self.apk_files = list(apk_files)
+        self.queues = {serial: list(self.apk_files) for serial in self.serials}
+        self.parallel = max(1, parallel)
+        self.timeout = timeout
+        self.mode = mode
+        self.min_rate = min_rate
+        self.index = index
+        self.infos = {}                  # путь -> ApkInfo (после разбора индексом)
+        self.on_start = on_start
+        self.on_result = on_result
+        self.started = datetime.now()
+        self.stopped = False
+        self.handles = []
+        self.results = []
+        self.journal = journal
+        if journal is not None:
+            # продолжение: сделанное по журналу – сразу в итоги, не в очередь
+            completed = journal.completed()
+            for serial, queue in self.queues.items():
+                keys = {apk: (serial, os.path.abspath(apk)) for apk in queue}
+                self.results.extend(completed[key] for key in keys.values() if key in completed)
+                self.queues[serial] = [apk for apk in queue if keys[apk] not in completed]
+        self.resumed = len(self.results)  # столько итогов взято из журнала
+        self._gate = None
+        self._scan = None
+        self.devices = {}                # serial -> {"model", "abis", "incremental", "features"}
+        self._unsupported = {}           # serial -> режимы, которые устройство не приняло
+        self._current = {}               # serial -> [режим, байт] идущей установки
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    #   Запуск / остановка
+    # ------------------------------------------------------------------
+    def start(self) -> list:
+        """Воркер на каждое устройство; возвращает их JobHandle в порядке serials."""
+        self._gate = asyncio.Semaphore(self.parallel)
+        if self.journal is not None:
+            self.journal.begin(self.serials, self.apk_files)
+        self.handles = [
+            self.executor.submit_call(serial, lambda serial=serial: self._worker(serial),
+                                      description=f"mass install {serial}")
+            for serial in self.serials
+        ]
+        return self.handles
+
+    def stop(self):
+        """Останавливает все очереди; прерванный APK попадает в итог как cancelled."""
+        self.stopped = True
+        for handle in self.handles:
+            handle.cancel()
+
+    def done(self) -> bool:
+        return all(handle.done() for handle in self.handles)
+
+    # ------------------------------------------------------------------
+    #   Итоги
+    # ------------------------------------------------------------------
+    def counts(self, serial: Optional[str] = None) -> dict:
+        """{'success': …, 'skipped': …, 'failed': …, 'done': …} устройства (None – всех)."""
+        with self._lock:
+            results = [r for r in self.results if serial is None or r.serial == serial]
+        success = sum(1 for r in results if r.status == "success")
+        skipped = sum(1 for r in results if r.status == "skipped")
+        failed = sum(1 for r in results if r.status not in ("success", "skipped", "cancelled"))
+        return {"success": success, "skipped": skipped, "failed": failed,
+                "done": success + skipped + failed}
+
+    def report(self) -> dict:
+        """Отчёт для save_report: строки «устройство × APK» и матрица статусов."""
+        with self._lock:
+            results = list(self.results)
+        names = [os.path.basename(apk) for apk in self.apk_files]
+        matrix = {name: {serial: "" for serial in self.serials} for name in names}
+        entries = []
+        for r in results:
+            name = os.path.basename(r.apk)
+            matrix.setdefault(name, {})[r.serial] = r.status
+            entry = {
+                "package":  name,
+                "device":   r.serial,
+                "status":   r.status,
+                "details":  r.details,
+                "duration": round(r.duration, 1),
+                "mode":     r.mode,
+                "size":     r.size,
+                "mb_s":     round(r.rate, 2),
+            }
+            info = self.infos.get(r.apk)
+            if info is not None:
+                entry.update(apk_package=info.package, version_code=info.version_code,
+                             sha256=info.sha256)
+            entries.append(entry)
+        counts = self.counts()
+        return {
+            "type":      "mass_install",
+            "timestamp": datetime.now().isoformat(),
+            "started":   self.started.isoformat(),
+            "devices":   self.serials,
+            "apks":      names,
+            "total":     len(self.serials) * len(self.apk_files),
+            "success":   counts["success"],
+            "skipped":   counts["skipped"],
+            "failed":    counts["failed"],
+            "matrix":    matrix,
+            "models":    {serial: info["model"] for serial, info in self.devices.items()},
+            "throughput": self.throughput(results),
+            "entries":   entries,
+        }
+
+    def throughput(self, results: Optional[list] = None) -> dict:
+        """
+        {модель: {режим: МБ/с}} по успешным установкам: суммарный объём /
+        суммарное время, чтобы сравнивать режимы на одних и тех же моделях.
+        """
+        if results is None:
+            with self._lock:
+                results = list(self.results)
+        totals = {}
+        for r in results:
+            if r.status != "success" or not r.size or not r.mode:
+                continue
+            model = self.devices.get(r.serial, {}).get("model") or r.serial
+            size, duration = totals.get((model, r.mode), (0, 0.0))
+            totals[(model, r.mode)] = (size + r.size, duration + r.duration)
+        speeds = {}
+        for (model, mode), (size, duration) in sorted(totals.items()):
+            speeds.setdefault(model, {})[mode] = round(size / max(duration, 1e-6) / 1e6, 2)
+        return speeds
+
+    # ------------------------------------------------------------------
+    #   Внутреннее
+    # ------------------------------------------------------------------
+    async def _worker(self, serial: str) -> list:
+        done = []
+        await self._device(serial)
+        if self.index is not None:
+            await self._skip_installed(serial)
+        for index, apk in enumerate(self.queues[serial]):
+            if self.stopped:
+                break
+            async with self._gate:
+                if self.stopped:
+                    break
+                if self.on_start is not None:
+                    self.on_start(serial, index, apk)
+                result = await self._install(serial, apk)
+            self._record(result)
+            done.append(result)
+            if result.status == "cancelled":
+                break
+        return done
+
+    async def _skip_installed(self, serial: str):
+        """Убирает из очереди устройства то, что на нём уже стоит той же или новее версии."""
+        if self._scan is None:
+            # индекс разбирается один раз на все устройства, в пуле потоков
+            self._scan = asyncio.get_running_loop().run_in_executor(
+                None, self.index.scan, self.apk_files)
+        self.infos = await asyncio.shield(self._scan)
+        result = await self.client.arun(["shell", "pm list packages --show-versioncode"],
+                                        serial, timeout=60)
+        installed = parse_package_versions(result.stdout)
+        if not installed:
+            return                       # списка нет – ставим всё, adb сам скажет, что не так
+        queue = []
+        for apk in self.queues[serial]:
+            reason = skip_reason(self.infos.get(apk), installed)
+            if reason is None:
+                queue.append(apk)
+            else:
+                self._record(InstallResult(serial, apk, "skipped", reason, 0.0))
+        self.queues[serial] = queue
+
+    async def _device(self, serial: str) -> dict:
+        """Модель, ABI, поддержка incremental и фичи adb – один getprop на устройство."""
+        if serial not in self.devices:
+            try:
+                features = await asyncio.get_running_loop().run_in_executor(
+                    None, self.client.features, serial)
+            except OSError:
+                features = set()
+            try:
+                result = await self.client.arun(["shell", _DEVICE_COMMAND], serial, timeout=30)
+                lines = result.stdout.splitlines()
+            except (OSError, subprocess.TimeoutExpired):
+                lines = []
+            model, abis, incremental = (lines + ["", "", ""])[:3]
+            self.devices[serial] = {
+                "model":       model.strip(),
+                "abis":        [abi for abi in abis.strip().split(",") if abi],
+                "incremental": incremental.strip().lower() not in ("", "0", "false", "no"),
+                "features":    set(features),
+            }
+        return self.devices[serial]
+
+    def _modes(self, serial: str, apk: str) -> list:
+        """Режимы для одиночного APK по порядку попыток."""
+        device = self.devices[serial]
+        modes = []
+        if self.mode in ("auto", "incremental") and device["incremental"] \
+                and os.path.exists(apk + ".idsig"):
+            modes.append("incremental")
+        if self.mode != "legacy" and "cmd" in device["features"]:
+            modes.append("streamed")
+        modes.append("legacy")
+        unsupported = self._unsupported.get(serial, ())
+        return [mode for mode in modes if mode not in unsupported] or ["legacy"]
+
+    async def _install(self, serial: str, apk: str) -> InstallResult:
+        started = time.monotonic()
+        try:
+            size = signature(apk)[0]
+        except OSError:
+            size = 0
+        # 6 минут на гигабайтную игру мало: предел растёт вместе с размером
+        timeout = max(self.timeout, size / self.min_rate) if self.min_rate > 0 else self.timeout
+        self._current[serial] = ["", size]
+        if os.path.isdir(apk) or apk.lower().endswith(BUNDLE_SUFFIXES):
+            install = self._install_bundle(serial, apk)
+        else:
+            install = self._install_single(serial, apk, size)
+
+        def finish(status: str, details: str) -> InstallResult:
+            # потоковая запись и сессии идут мимо run() – кэш `pm list packages`
+            # сбрасываем сами и уже после установки (чтения во время неё тоже устарели)
+            self.client.notify(serial, ["install", apk])
+            mode, sent = self._current.pop(serial, ("", size))
+            return InstallResult(serial, apk, status, details, time.monotonic() - started,
+                                 sent, mode)
+
+        try:
+            result = await asyncio.wait_for(install, timeout)
+        except asyncio.CancelledError:
+            # «Остановить»: текущий adb install уже прерван
+            return finish("cancelled", "Остановлено пользователем")
+        except (asyncio.TimeoutError, subprocess.TimeoutExpired):
+            return finish("timeout", f"Превышен таймаут ({timeout / 60:.3g} мин.)")
+        except Exception as e:
+            return finish("exception", str(e) or type(e).__name__)
+        if result.returncode == 0 and "Failure" not in result.stdout:
+            return finish("success", "Installed")
+        return finish("failed", _install_details(result))
+
+    async def _install_single(self, serial: str, apk: str, size: int) -> subprocess.CompletedProcess:
+        """Одиночный APK: incremental → streamed → legacy, пока режим не примут."""
+        modes = self._modes(serial, apk)
+        for mode in modes:
+            self._current[serial][0] = mode
+            last = mode == modes[-1]
+            try:
+                if mode == "incremental":
+                    result = await self.client.arun(["install", "--incremental", "-r", apk],
+                                                    serial, timeout=None)
+                elif mode == "streamed":
+                    result = await self._install_streamed(serial, apk, size)
+                else:
+                    return await self.client.arun(["install", "-r", apk], serial, timeout=None)
+            except OSError:
+                # нет adb‑сервера / бинарника – это про транспорт, не про APK
+                if last:
+                    raise
+                self._unsupported.setdefault(serial, set()).add(mode)
+                continue
+            if result.returncode == 0 or "Failure [" in result.stdout or last:
+                return result            # успех или отказ PackageManager – ответ по APK
+            self._unsupported.setdefault(serial, set()).add(mode)
+        raise RuntimeError("нет режима установки")   # сюда не доходим: legacy – последний
+
+    async def _install_streamed(self, serial: str, apk: str, size: int) -> subprocess.CompletedProcess:
+        """`cmd package install -S` с байтами APK в stdin – без копии в /data/local/tmp."""
+        with open(apk, "rb") as f:
+            out = await self._stream(serial, f"exec:cmd package install -r -S {size}", f)
+        return subprocess.CompletedProcess(["cmd", "package", "install"],
+                                           0 if "Success" in out else 1, out, "")
+
+    async def _install_bundle(self, serial: str, path: str) -> subprocess.CompletedProcess:
+        """Набор split‑APK: сессия install-create / install-write / install-commit."""
+        loop = asyncio.get_running_loop()
+        bundle = await loop.run_in_executor(None, load_bundle, path)
+        device = self.devices[serial]
+        splits = select_splits(bundle, device["abis"])
+        pm = "cmd package" if "cmd" in device["features"] else "pm"
+        self._current[serial] = ["session", sum(size for _name, size in splits)]
+        try:
+            return await self._install_session(serial, pm, bundle, splits)
+        except ConnectionRefusedError:
+            if bundle.kind != "dir":
+                raise
+            # adb‑сервер недоступен – бинарный adb сам передаёт файлы каталога
+            self._current[serial][0] = "legacy"
+            return await self.client.arun(["install-multiple", "-r"] + [name for name, _ in splits],
+                                          serial, timeout=None)
+
+    async def _install_session(self, serial: str, pm: str, bundle, splits: tuple):
+        total = sum(size for _name, size in splits)
+        create = await self.client.arun(["shell", f"{pm} install-create -r -S {total}"],
+                                        serial, timeout=60)
+        match = re.search(r"\[(\d+)\]", create.stdout)
+        if not match:
+            return create                # «Failure [...]» – в отчёт как есть
+        session = match.group(1)
+        try:
+            for index, (name, size) in enumerate(splits):
+                out = await self._write_split(serial, pm, session, bundle, name, size, index)
+                if "Success" not in out:
+                    await self._abandon(serial, pm, session)
+                    return subprocess.CompletedProcess([pm, "install-write"], 1, out, "")
+            return await self.client.arun(["shell", f"{pm} install-commit {session}"],
+                                          serial, timeout=None)
+        except BaseException:
+            await self._abandon(serial, pm, session)
+            raise
+
+    async def _write_split(self, serial: str, pm: str, session: str, bundle,
+                           name: str, size: int, index: int) -> str:
+        """Байты одной части – в stdin `install-write` прямо из файла / архива."""
+        split_name = f"{index}_" + re.sub(r"[^\w.-]", "_", os.path.basename(name))
+        with bundle.open(name) as f:
+            return await self._stream(
+                serial, f"exec:{pm} install-write -S {size} {session} {split_name} -", f)
+
+    async def _stream(self, serial: str, service: str, f) -> str:
+        """Файл хоста – в stdin exec‑сервиса кусками по _CHUNK; возвращает его вывод."""
+        loop = asyncio.get_running_loop()
+        reader, writer = await self.client.aopen_service(serial, service)
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, f.read, _CHUNK)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+            return (await reader.read()).decode("utf-8", "replace")
+        finally:
+            writer.close()
+
+    async def _abandon(self, serial: str, pm: str, session: str):
+        """Незавершённая сессия не должна висеть на устройстве до перезагрузки."""
+        try:
+            await asyncio.shield(self.client.arun(["shell", f"{pm} install-abandon {session}"],
+                                                  serial, timeout=30))
+        except (Exception, asyncio.CancelledError):
+            pass
+
+    def _record(self, result: InstallResult):
+        with self._lock:
+            self.results.append(result)
+        if self.journal is not None:
+            try:
+                self.journal.record(result)
+            except OSError:
+                pass                     # диск полон / только чтение – установка важнее журнала
+        if self.on_result is not None:
+            self.on_result(result)
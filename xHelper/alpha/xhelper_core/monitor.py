@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+monitor – фоновый сбор показателей устройства для вкладки «Мониторинг».
+
+Раньше `update_monitor` в GUI‑потоке по таймеру делал несколько
+блокирующих вызовов adb подряд: отошедший кабель или задумавшееся
+устройство замораживали всё окно. Теперь один замер – это
+
+    1. одно чтение всех источников пакетом (AdbService.run_batch);
+    2. разбор текста в словари – там же, в потоке исполнителя;
+    3. готовый MonitorSnapshot, который GUI только раскладывает по меткам.
+
+    sampler = MonitorSampler(main_window.adb)
+    snap = sampler.sample(serial)          # блокирующий вызов – не из GUI
+    snap.data["battery"]["level"], snap.read_ms
+
+Источники расширяются через add_source(имя, команда, разборщик); разборщик
+с состоянием по устройству (как загрузка CPU – разность с прошлым снимком)
+регистрируется с per_device=True и получает ещё и serial. Сколько стоит
+замер, видно по read_ms / parse_ms и по latency_stats().
+"""
+
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Callable, NamedTuple, Optional
+
+from .cpu_stat import CpuUsage
+from .net_stat import NET_COMMAND, NetUsage
+from .procstat import PROC_COMMAND, ProcessUsage
+from .thermal import THERMAL_COMMAND, ThermalMonitor
+
+
+class MonitorSnapshot(NamedTuple):
+    """Один замер; data – {источник: разобранный словарь}."""
+    serial: Optional[str]
+    timestamp: float          # time.time() окончания чтения
+    read_ms: float            # обмен с устройством
+    parse_ms: float           # разбор на хосте
+    data: dict
+    errors: dict              # {источник: текст ошибки}
+
+    @property
+    def latency_ms(self) -> float:
+        return self.read_ms + self.parse_ms
+
+
+# ----------------------------------------------------------------------
+#   Разбор вывода
+# ----------------------------------------------------------------------
+def parse_battery(text: str) -> dict:
+    """`dumpsys battery` → level (%), temperature (°C), voltage (мВ), status …"""
+    raw = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            raw[key.strip()] = value.strip()
+    info = {}
+    for key in ("level", "scale", "voltage", "status", "health"):
+        if raw.get(key, "").lstrip("-").isdigit():
+            info[key] = int(raw[key])
+    if raw.get("temperature", "").lstrip("-").isdigit():
+        info["temperature"] = int(raw["temperature"]) / 10     # десятые доли °C
+    info["plugged"] = any(raw.get(k) == "true"
+                          for k in ("AC powered", "USB powered", "Wireless powered"))
+    return info
+
+
+def parse_meminfo(text: str) -> dict:
+    """`/proc/meminfo` → {'MemTotal': кБ, 'MemAvailable': кБ, …}."""
+    info = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        parts = value.split()
+        if sep and parts and parts[0].isdigit():
+            info[key.strip()] = int(parts[0])
+    return info
+
+
+def parse_ip_addr(text: str) -> dict:
+    """
+    `ip -f inet addr` → {'ip': адрес wlan0 (иначе первый не‑loopback),
+    'addresses': {'wlan0': '192.168.1.42/24', 'rmnet_data0': …}} (или пусто).
+    """
+    addresses = {}
+    iface = None
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) > 1 and parts[0].rstrip(":").isdigit():
+            iface = parts[1].rstrip(":").split("@")[0]       # «2: wlan0: <…>»
+        elif len(parts) > 1 and parts[0] == "inet":
+            addresses.setdefault(iface or "?", parts[1])
+    if not addresses:
+        return {}
+    ip = addresses.get("wlan0") or next((addr for name, addr in addresses.items()
+                                         if name != "lo"), addresses.get("lo"))
+    return {"ip": ip, "addresses": addresses}
+
+
+def parse_wifi(text: str) -> dict:
+    """`dumpsys wifi` → enabled, ssid, rssi (дБм), link_speed (Мбит/с)."""
+    info = {"enabled": "Wi-Fi is enabled" in text}
+    ssid = re.search(r'\bSSID: "?([^",]*)"?,', text)
+    if ssid and ssid.group(1) not in ("", "<unknown ssid>"):
+        info["ssid"] = ssid.group(1)
+    rssi = re.search(r"RSSI: (-?\d+)", text)
+    if rssi:
+        info["rssi"] = int(rssi.group(1))
+    speed = re.search(r"Link speed: (\d+)", text)
+    if speed:
+        info["link_speed"] = int(speed.group(1))
+    return info
+
+
+# стандартные источники: имя → (shell‑команда, разборщик)
+DEFAULT_SOURCES = {
+    "battery": ("dumpsys battery", parse_battery),
+    "memory":  ("cat /proc/meminfo", parse_meminfo),
+    "network": ("ip -f inet addr", parse_ip_addr),
+    "wifi":    ("dumpsys wifi", parse_wifi),
+}
+
+
+class MonitorSampler:
+    """
+    :param service: AdbService
+    :param timeout: предел одного замера, с
+    :param history: сколько последних задержек держать для latency_stats()
+    """
+
+    def __init__(self, service, timeout: float = 5.0, history: int = 120):
+        self.service = service
+        self.timeout = timeout
+        self.sources = {name: (command, parser, False)
+                        for name, (command, parser) in DEFAULT_SOURCES.items()}
+        self.cpu = CpuUsage()
+        self.add_source("cpu", "cat /proc/stat", self.cpu.update, per_device=True)
+        self.processes = ProcessUsage()
+        self.add_source("processes", PROC_COMMAND, self.processes.update, per_device=True)
+        self.net = NetUsage()
+        self.add_source("net", NET_COMMAND, self.net.update, per_device=True)
+        self.thermal = ThermalMonitor()
+        self.add_source("thermal", THERMAL_COMMAND, self.thermal.update, per_device=True)
+        self._latencies = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def add_source(self, name: str, command: str, parser: Callable[..., dict],
+                   per_device: bool = False):
+        """
+        Ещё один источник в том же пакете. per_device=True – разборщик
+        вызывается как parser(text, serial) (для разностных счётчиков).
+        """
+        self.sources[name] = (command, parser, per_device)
+
+    def remove_source(self, name: str):
+        self.sources.pop(name, None)
+
+    def sample(self, serial: Optional[str] = None, names: Optional[list] = None) -> MonitorSnapshot:
+        """
+        Один замер: источники `names` (None – все) одним run_batch, разбор
+        здесь же. Блокирующий – звать из исполнителя, не из GUI‑потока.
+        """
+        sources = [(name, source) for name, source in self.sources.items()
+                   if names is None or name in names]
+        started = time.perf_counter()
+        results = self.service.run_batch([source[0] for _name, source in sources],
+                                         serial, timeout=self.timeout, use_cache=False)
+        read_ms = (time.perf_counter() - started) * 1000
+        timestamp = time.time()
+
+        started = time.perf_counter()
+        data, errors = {}, {}
+        for (name, (_cmd, parser, per_device)), result in zip(sources, results):
+            if result.returncode != 0 and not result.stdout:
+                errors[name] = (result.stderr or "").strip() or f"код {result.returncode}"
+                continue
+            try:
+                data[name] = (parser(result.stdout, serial) if per_device
+                              else parser(result.stdout))
+            except (ValueError, IndexError, KeyError) as e:
+                errors[name] = f"разбор: {e}"
+        parse_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self._latencies.append(read_ms + parse_ms)
+        return MonitorSnapshot(serial, timestamp, round(read_ms, 2), round(parse_ms, 3),
+                               data, errors)
+
+    def latency_stats(self) -> dict:
+        """Задержка замеров, мс: последняя, медиана и максимум по истории."""
+        with self._lock:
+            samples = list(self._latencies)
+        if not samples:
+            return {"samples": 0, "last": 0.0, "median": 0.0, "max": 0.0}
+        return {
+            "samples": len(samples),
+            "last":    round(samples[-1], 1),
+            "median":  round(statistics.median(samples), 1),
+            "max":     round(max(samples), 1),
+        }
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+net_stat – скорость сети устройства по счётчикам `/proc/net/dev`.
+
+`/proc/net/dev` – накопленные с загрузки байты и пакеты каждого интерфейса
+(rmnet* – мобильная сеть, wlan0 – Wi‑Fi, rndis0 – USB‑модем). Одно чтение
+на тик даёт сразу все интерфейсы, а скорость – разность с прошлым
+снимком, делённая на интервал по часам устройства (`/proc/uptime` в той же
+команде – задержка adb не искажает делитель):
+
+    usage = NetUsage()
+    usage.update(text, serial)   # первый вызов – только запоминает базу, {}
+    usage.update(text, serial)   # {'rx': 1.2e6, 'tx': 3.4e4,        байт/с всего
+                                 #  'rates': {'wlan0.rx': 1.2e6, …},  для истории
+                                 #  'interfaces': {'wlan0': {…, 'rx_peak': …}},
+                                 #  'changed': False}
+
+changed=True – набор интерфейсов изменился или счётчики сбросились
+(Wi‑Fi/модем включили или выключили): по этому признаку перечитывают
+IP‑адреса, вместо того чтобы спрашивать `ip addr` на каждом тике.
+"""
+
+import time
+from typing import Optional
+
+NET_COMMAND = "cat /proc/uptime /proc/net/dev"
+
+# столбцы после «iface:»: приём bytes packets errs drop fifo frame compressed multicast,
+# затем передача bytes packets …
+_RX_BYTES, _RX_PACKETS, _TX_BYTES, _TX_PACKETS = 0, 1, 8, 9
+
+
+def parse_net_dev(text: str) -> tuple:
+    """
+    Вывод NET_COMMAND → (uptime устройства, с, или None;
+    {iface: (rx_bytes, rx_packets, tx_bytes, tx_packets)}).
+    """
+    uptime = None
+    counters = {}
+    for line in text.splitlines():
+        name, sep, rest = line.partition(":")
+        if not sep:
+            parts = line.split()
+            if uptime is None and len(parts) == 2 and not counters:
+                try:
+                    uptime = float(parts[0])
+                except ValueError:
+                    pass
+            continue
+        values = rest.split()
+        if len(values) < 16 or not values[0].isdigit():
+            continue                     # заголовок «Inter-|   Receive …»
+        counters[name.strip()] = (int(values[_RX_BYTES]), int(values[_RX_PACKETS]),
+                                  int(values[_TX_BYTES]), int(values[_TX_PACKETS]))
+    return uptime, counters
+
+
+class NetUsage:
+    """Прошлые счётчики интерфейсов по serial, скорость за интервал и пики."""
+
+    def __init__(self):
+        self._prev = {}                  # serial -> (время, {iface: счётчики})
+        self._peaks = {}                 # serial -> {iface: [rx, tx]}, байт/с
+
+    def update(self, text: str, serial: Optional[str] = None) -> dict:
+        """
+        Новый снимок → скорость каждого интерфейса (байт/с, пакетов/с) с
+        прошлого вызова. lo не учитывается; интерфейсы без трафика с
+        загрузки (dummy0, ip6tnl0 …) в историю не попадают.
+        """
+        uptime, counters = parse_net_dev(text)
+        if not counters:
+            return {}
+        now = uptime if uptime is not None else time.monotonic()
+        prev = self._prev.get(serial)
+        self._prev[serial] = (now, counters)
+        if prev is None:
+            return {}
+
+        then, old = prev
+        elapsed = now - then
+        if elapsed <= 0:
+            return {}                    # перезагрузка (uptime пошёл заново) или повтор
+        peaks = self._peaks.setdefault(serial, {})
+        changed = set(counters) != set(old)
+        total_rx = total_tx = 0.0
+        rates, interfaces = {}, {}
+        for name, cur in counters.items():
+            if name == "lo" or not (cur[0] or cur[2]):
+                continue
+            before = old.get(name)
+            if before is None:
+                continue
+            if any(c < b for c, b in zip(cur, before)):
+                changed = True           # интерфейс пересоздан – счётчики с нуля
+                continue
+            rx, rx_packets, tx, tx_packets = ((c - b) / elapsed for c, b in zip(cur, before))
+            peak = peaks.setdefault(name, [0.0, 0.0])
+            peak[0], peak[1] = max(peak[0], rx), max(peak[1], tx)
+            total_rx += rx
+            total_tx += tx
+            rates.update({f"{name}.rx": round(rx, 1), f"{name}.tx": round(tx, 1),
+                          f"{name}.rx_packets": round(rx_packets, 1),
+                          f"{name}.tx_packets": round(tx_packets, 1)})
+            interfaces[name] = {
+                "rx": round(rx, 1), "tx": round(tx, 1),
+                "rx_packets": round(rx_packets, 1), "tx_packets": round(tx_packets, 1),
+                "rx_peak": round(peak[0], 1), "tx_peak": round(peak[1], 1),
+                "rx_bytes": cur[0], "tx_bytes": cur[2],
+            }
+        return {
+            "rx":         round(total_rx, 1),
+            "tx":         round(total_tx, 1),
+            "rates":      rates,
+            "interfaces": interfaces,
+            "changed":    changed,
+        }
+
+    def forget(self, serial: Optional[str] = None):
+        """Сбрасывает базу и пики одного устройства (None – всех)."""
+        if serial is None:
+            self._prev.clear()
+            self._peaks.clear()
+        else:
+            self._prev.pop(serial, None)
+            self._peaks.pop(serial, None)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+procstat – список процессов устройства с загрузкой CPU и памятью.
+
+`ps`/`top` на устройстве – это отдельный процесс и разный формат в каждой
+версии toybox. Вместо этого одна shell‑команда (только встроенные команды
+mksh, без fork на каждый процесс) выводит для всех pid строку
+
+    <содержимое /proc/<pid>/stat>|<содержимое statm>|<argv[0] из cmdline>
+
+а загрузку считаем на хосте по разности с прошлым снимком, как и в
+cpu_stat: доля тиков процесса (utime + stime) от всех тиков всех ядер
+за интервал, плюс изменение RSS.
+
+    usage = ProcessUsage()
+    usage.update(text, serial)    # {'count': 612, 'processes': [ProcessInfo, …]}
+
+В мониторинге это источник «processes» шины телеметрии (PROC_COMMAND).
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+# страница памяти, строка cpu из /proc/stat и по строке на процесс;
+# процесс, завершившийся между перечислением /proc и read, пропускается
+PROC_COMMAND = (
+    "getconf PAGESIZE 2>/dev/null || echo 4096; "
+    "read -r c < /proc/stat; echo \"$c\"; "
+    "cd /proc && for p in [0-9]*; do "
+    "read -r s < $p/stat 2>/dev/null || continue; "
+    "m=; a=; read -r m < $p/statm 2>/dev/null; read -r a < $p/cmdline 2>/dev/null; "
+    "echo \"$s|$m|$a\"; done"
+)
+
+
+# pid (comm) поля|statm|cmdline; comm может содержать пробелы и скобки
+_LINE = re.compile(r"^(\d+) \((.*)\) ([^|]*)\|([\d ]*)\|(.*)$")
+
+
+class ProcessInfo(NamedTuple):
+    """Строка диспетчера задач; cpu – % всей машины за интервал, память – кБ."""
+    pid: int
+    ppid: int
+    name: str                 # argv[0] (для приложений – имя пакета) или comm
+    state: str                # R, S, D, Z …
+    cpu: float
+    rss: int
+    rss_delta: int
+    threads: int
+
+
+def _parse_process(line: str) -> Optional[tuple]:
+    """Строка PROC_COMMAND → (pid, comm, поля после comm, statm, cmdline)."""
+    match = _LINE.match(line)
+    if not match:
+        return None
+    pid, comm, rest, statm, cmdline = match.groups()
+    fields = rest.split()
+    if len(fields) < 22:
+        return None
+    return int(pid), comm, fields, statm.split(), cmdline.split("\0")[0].strip()
+
+
+class ProcessUsage:
+    """Прошлые счётчики процессов по serial и расчёт CPU% / ΔRSS за интервал."""
+
+    def __init__(self):
+        self._prev = {}           # serial -> (всего тиков, {(pid, starttime): (тики, rss)})
+
+    def update(self, text: str, serial: Optional[str] = None) -> dict:
+        lines = text.splitlines()
+        if len(lines) < 2 or not lines[1].startswith("cpu"):
+            return {}
+        page_kb = int(lines[0]) // 1024 if lines[0].strip().isdigit() else 4
+        total = sum(int(v) for v in lines[1].split()[1:9])
+
+        prev_total, prev = self._prev.get(serial, (None, {}))
+        elapsed = total - prev_total if prev_total is not None else 0
+        seen = {}
+        processes = []
+        for line in lines[2:]:
+            parsed = _parse_process(line)
+            if parsed is None:
+                continue
+            pid, comm, fields, statm, cmdline = parsed
+            # поля /proc/<pid>/stat начиная с 3‑го: state ppid … utime(14) stime(15) …
+            ticks = int(fields[11]) + int(fields[12])
+            key = (pid, fields[19])                  # starttime: pid мог переиспользоваться
+            rss = int(statm[1]) * page_kb if len(statm) > 1 else int(fields[21]) * page_kb
+            before = prev.get(key)
+            cpu = 0.0
+            rss_delta = 0
+            if before is not None:
+                if elapsed > 0:
+                    cpu = round(100.0 * max(ticks - before[0], 0) / elapsed, 1)
+                rss_delta = rss - before[1]
+            seen[key] = (ticks, rss)
+            processes.append(ProcessInfo(pid, int(fields[1]), cmdline or comm, fields[0],
+                                         cpu, rss, rss_delta, int(fields[17])))
+        self._prev[serial] = (total, seen)
+        return {"count": len(processes), "processes": processes}
+
+    def forget(self, serial: Optional[str] = None):
+        if serial is None:
+            self._prev.clear()
+        else:
+            self._prev.pop(serial, None)
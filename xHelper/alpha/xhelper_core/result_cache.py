@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+result_cache – кэш ответов на «читающие» adb‑команды.
+
+Одни и те же запросы (`getprop`, `pm list packages`, `dumpsys battery`)
+делают сразу несколько вкладок и плагинов. Кэш хранит ответы по ключу
+(устройство, нормализованная команда) с временем жизни, которое задаётся
+правилами по префиксу команды, и вытесняет самые старые записи (LRU).
+
+Команды, меняющие состояние устройства (install, uninstall, reboot,
+`pm clear`, `setprop` …), сами сбрасывают связанные записи – для этого
+AdbClient сообщает кэшу о каждой выполненной команде.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# (префикс нормализованной команды, TTL в секундах); первое совпадение выигрывает
+DEFAULT_TTLS = [
+    ("shell getprop", 300.0),
+    ("shell pm list packages", 60.0),
+    ("shell pm path", 60.0),
+    ("shell dumpsys package", 30.0),
+    ("shell dumpsys battery", 5.0),
+    ("shell settings get", 10.0),
+]
+
+# (префикс команды‑мутации, префиксы записей, которые она портит);
+# None вместо списка – сбросить всё, что закэшировано для устройства
+MUTATIONS = [
+    ("reboot", None),
+    ("shell reboot", None),
+    ("root", None),
+    ("unroot", None),
+    ("install", ["shell pm", "shell dumpsys package"]),
+    ("install-multiple", ["shell pm", "shell dumpsys package"]),
+    ("uninstall", ["shell pm", "shell dumpsys package"]),
+    ("shell pm", ["shell pm", "shell dumpsys package"]),
+    ("shell cmd package", ["shell pm", "shell dumpsys package"]),
+    ("shell setprop", ["shell getprop"]),
+    ("shell settings put", ["shell settings get"]),
+    ("shell settings delete", ["shell settings get"]),
+    ("shell dumpsys battery set", ["shell dumpsys battery"]),
+    ("shell dumpsys battery reset", ["shell dumpsys battery"]),
+    ("shell dumpsys battery unplug", ["shell dumpsys battery"]),
+]
+
+# «читающие» команды pm, которые не должны сбрасывать кэш
+_PM_QUERIES = ("shell pm list", "shell pm path", "shell pm dump")
+
+
+def normalize(args) -> str:
+    """["shell", "pm  list packages"] → "shell pm list packages"."""
+    if isinstance(args, str):
+        return " ".join(args.split())
+    return " ".join(" ".join(str(a) for a in args).split())
+
+
+def _matches(command: str, prefix: str) -> bool:
+    return command == prefix or command.startswith(prefix + " ")
+
+
+class ResultCache:
+    """
+    Потокобезопасный TTL + LRU кэш CompletedProcess‑ов.
+
+    :param max_entries: сколько ответов хранить всего (старые вытесняются)
+    :param ttls:        список правил (префикс, TTL) вместо DEFAULT_TTLS
+    """
+
+    def __init__(self, max_entries: int = 256, ttls: Optional[list] = None):
+        self.max_entries = max_entries
+        self.ttls = list(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()      # (serial, команда) -> (expires, result)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    #   Правила
+    # ------------------------------------------------------------------
+    def ttl_for(self, command: str) -> Optional[float]:
+        """TTL для нормализованной команды или None, если её не кэшируем."""
+        for prefix, ttl in self.ttls:
+            if _matches(command, prefix):
+                return ttl
+        return None
+
+    def set_ttl(self, prefix: str, ttl: Optional[float]):
+        """Меняет (ttl=None – удаляет) правило для префикса."""
+        prefix = normalize(prefix)
+        self.ttls = [(p, t) for p, t in self.ttls if p != prefix]
+        if ttl is not None:
+            self.ttls.insert(0, (prefix, ttl))
+
+    # ------------------------------------------------------------------
+    #   Чтение / запись
+    # ------------------------------------------------------------------
+    def get(self, serial: Optional[str], command: str):
+        key = (serial, command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, serial: Optional[str], command: str, result, ttl: float):
+        key = (serial, command)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # ------------------------------------------------------------------
+    #   Инвалидация
+    # ------------------------------------------------------------------
+    def invalidate(self, serial: Optional[str] = None, prefixes: Optional[list] = None):
+        """
+        Сбрасывает записи устройства `serial` (None – всех устройств),
+        начинающиеся с любого из `prefixes` (None – все записи).
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if serial is not None and key[0] is not None and key[0] != serial:
+                    continue
+                if prefixes is None or any(_matches(key[1], p) for p in prefixes):
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def note_command(self, serial: Optional[str], args):
+        """Вызывается перед каждой командой: мутации сбрасывают связанные записи."""
+        command = normalize(args)
+        if command.startswith(_PM_QUERIES):
+            return
+        for prefix, affected in MUTATIONS:
+            if _matches(command, prefix):
+                self.invalidate(serial, affected)
+                return
+
+    # ------------------------------------------------------------------
+    #   Статистика
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_rate":      round(100.0 * self.hits / total, 1) if total else 0.0,
+                "evictions":     self.evictions,
+                "invalidations": self.invalidations,
+                "size":          len(self._entries),
+            }
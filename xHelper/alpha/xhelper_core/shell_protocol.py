@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+shell_protocol – кадры протокола shell v2 (`shell,v2,raw:<cmd>`).
+
+Старый сервис `shell:` отдаёт stdout и stderr одним потоком, а код возврата
+теряется – о неудаче приходится догадываться по тексту. Устройства с
+возможностью `shell_v2` оборачивают каждый кусок данных в пакет
+
+    <id: 1 байт><длина: uint32 LE><данные>
+
+    0 stdin   1 stdout   2 stderr   3 exit (1 байт – код возврата)
+    4 close‑stdin   5 window‑size
+
+так что клиент получает раздельные потоки и настоящий код выхода, а
+бинарный вывод (`screencap`, `tar`) можно писать прямо в файл по мере
+поступления, не декодируя его.
+"""
+
+import struct
+
+ID_STDIN = 0
+ID_STDOUT = 1
+ID_STDERR = 2
+ID_EXIT = 3
+ID_CLOSE_STDIN = 4
+ID_WINDOW_SIZE = 5
+
+_HEADER = struct.Struct("<BI")
+
+
+def encode_packet(packet_id: int, data: bytes = b"") -> bytes:
+    """Один пакет протокола (например, encode_packet(ID_CLOSE_STDIN))."""
+    return _HEADER.pack(packet_id, len(data)) + data
+
+
+def service_name(command: str, pty: bool = False) -> str:
+    """Имя сервиса adbd: без PTY вывод приходит байт в байт."""
+    return f"shell,v2,{'pty' if pty else 'raw'}:{command}"
+
+
+class PacketDecoder:
+    """
+    Потоковый разбор пакетов: куски из сокета подаются в feed() в любом
+    дроблении, наружу выходят целые пакеты (id, данные).
+
+        decoder = PacketDecoder()
+        for packet_id, payload in decoder.feed(sock.recv(65536)):
+            ...
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, chunk: bytes) -> list:
+        self._buf += chunk
+        packets = []
+        offset = 0
+        while len(self._buf) - offset >= _HEADER.size:
+            packet_id, length = _HEADER.unpack_from(self._buf, offset)
+            end = offset + _HEADER.size + length
+            if len(self._buf) < end:
+                break
+            packets.append((packet_id, bytes(self._buf[offset + _HEADER.size:end])))
+            offset = end
+        del self._buf[:offset]
+        return packets
+
+    @property
+    def pending(self) -> int:
+        """Сколько байт недочитанного пакета лежит в буфере."""
+        return len(self._buf)
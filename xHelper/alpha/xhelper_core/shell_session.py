@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+shell_session – постоянные shell‑сессии на устройствах.
+
+Вместо нового `adb shell …` на каждый мелкий запрос держим по одному
+долгоживущему shell на устройство и пишем команды ему в stdin. Конец
+вывода каждой команды отмечается уникальным маркером, за которым идёт код
+возврата, а stderr команды пишется в файл сессии и выводится следом, до
+второго маркера:
+
+    { <команда>
+    } </dev/null 2>"$XH_E"; printf '\\n__XH_<token>__ %d\\n' $?
+    [ -s "$XH_E" ] && cat "$XH_E"; printf '\\n__XH_<token>_e__\\n'
+
+Файл ($XH_E в /data/local/tmp) заводится при открытии сессии и удаляется
+вместе с shell; `cat` запускается только при непустом stderr. Если файл
+создать нельзя, stderr идёт в stdout (`2>&1`), как раньше.
+
+Так чтение /proc/meminfo или отправка keyevent – это один обмен данными
+без запуска процесса на ПК и без старта нового shell на устройстве.
+Несколько таких блоков можно записать разом (execute_many) – весь пакет
+тоже укладывается в один обмен.
+
+Сессия открывается через сервис `exec:sh` adb‑сервера, а если сервер
+недоступен – через процесс `adb -s <serial> shell`.
+"""
+
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from typing import Optional
+
+from .adb_client import AdbClient, AdbError
+
+
+class ShellSession:
+    """Один долгоживущий shell на одном устройстве."""
+
+    def __init__(self, client: AdbClient, serial: Optional[str]):
+        self.client = client
+        self.serial = serial
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._sock = None
+        self._proc = None
+        self._write = None
+        self._lines = None
+        self._reader = None
+        self._split_stderr = False       # stderr команд – в файл сессии
+
+    # ------------------------------------------------------------------
+    #   Запуск / остановка
+    # ------------------------------------------------------------------
+    def _start(self):
+        try:
+            sock = self.client.open_service(self.serial, "exec:sh")
+            sock.settimeout(None)
+            self._sock = sock
+            stream = sock.makefile("rb")
+            self._write = sock.sendall
+        except AdbError:
+            raise
+        except OSError:
+            # adb‑сервер недоступен – обычный процесс `adb shell`
+            self._proc = subprocess.Popen(
+                self.client.command_line(["shell"], self.serial),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+            stream = self._proc.stdout
+
+            def write(data, stdin=self._proc.stdin):
+                stdin.write(data)
+                stdin.flush()
+            self._write = write
+
+        self._lines = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, args=(stream, self._lines),
+                                        daemon=True)
+        self._reader.start()
+        self._split_stderr = self._setup_stderr()
+
+    def _setup_stderr(self, timeout: float = 10.0) -> bool:
+        """Заводит файл для stderr команд; False – писать его нельзя, stderr в stdout."""
+        marker = f"__XH_{uuid.uuid4().hex}__".encode()
+        self._write((
+            f"XH_E=/data/local/tmp/.xh_err_{uuid.uuid4().hex[:12]}; "
+            "trap 'rm -f \"$XH_E\"' EXIT HUP TERM; "
+            f"if : 2>/dev/null >\"$XH_E\"; then echo {marker.decode()} 1; "
+            f"else echo {marker.decode()} 0; fi\n").encode("utf-8"))
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.close()
+                raise subprocess.TimeoutExpired(["sh"], timeout)
+            if line is None:
+                self._lines.put(None)     # EOF – пусть увидит execute()
+                return False
+            if line.startswith(marker):
+                return line[len(marker):].strip() == b"1"
+
+    @staticmethod
+    def _read_loop(stream, lines: queue.Queue):
+        try:
+            for line in iter(stream.readline, b""):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put(None)                  # EOF – сессия закрыта
+
+    def alive(self) -> bool:
+        return self._reader is not None and self._reader.is_alive()
+
+    def close(self):
+        """Закрывает сессию (повторный execute() откроет новую)."""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except OSError:
+                pass
+        self._sock = self._proc = self._write = None
+        self._reader = None
+        self._split_stderr = False
+
+    # ------------------------------------------------------------------
+    #   Выполнение команды
+    # ------------------------------------------------------------------
+    def execute(self, command: str, timeout: float = 10.0) -> subprocess.CompletedProcess:
+        """
+        Выполняет команду в сессии и возвращает CompletedProcess
+        (stdout и stderr раздельно, returncode – код возврата команды).
+        """
+        return self.execute_many([command], timeout)[0]
+
+    def execute_many(self, commands: list, timeout: float = 10.0) -> list:
+        """
+        Пакет команд за один обмен: все блоки уходят в shell одной записью,
+        вывод делится обратно по маркерам – на каждую команду свой
+        CompletedProcess (в том же порядке). `timeout` – на весь пакет.
+        """
+        token = uuid.uuid4().hex
+        markers = [f"__XH_{token}_{i}__".encode() for i in range(len(commands))]
+        err_markers = [f"__XH_{token}_{i}_e__".encode() for i in range(len(commands))]
+
+        def script() -> bytes:
+            if not self._split_stderr:
+                return "".join(
+                    "{ " + command + "\n} </dev/null 2>&1; "
+                    "printf '\\n%s %d\\n' " + marker.decode() + " $?\n"
+                    for command, marker in zip(commands, markers)
+                ).encode("utf-8")
+            return "".join(
+                "{ " + command + "\n} </dev/null 2>\"$XH_E\"; "
+                "printf '\\n%s %d\\n' " + marker.decode() + " $?; "
+                "[ -s \"$XH_E\" ] && cat \"$XH_E\"; "
+                "printf '\\n%s\\n' " + err_marker.decode() + "\n"
+                for command, marker, err_marker in zip(commands, markers, err_markers)
+            ).encode("utf-8")
+
+        with self._lock:
+            self.last_used = time.monotonic()
+            if not self.alive():
+                self.close()
+                self._start()
+            try:
+                self._write(script())
+            except OSError:
+                # сессия умерла до того, как команда ушла – открываем заново
+                self.close()
+                self._start()
+                self._write(script())
+            split_stderr = self._split_stderr
+
+            deadline = time.monotonic() + timeout
+            results = []
+            for command, marker, err_marker in zip(commands, markers, err_markers):
+                argv = self.client.command_line(["shell", command], self.serial)
+                out, tail = self._read_until(marker, deadline, argv, timeout)
+                returncode = int(tail.strip() or 0)
+                err = self._read_until(err_marker, deadline, argv, timeout)[0] \
+                    if split_stderr else ""
+                results.append(subprocess.CompletedProcess(argv, returncode, out, err))
+        return results
+
+    def _read_until(self, marker: bytes, deadline: float, argv: list, timeout: float) -> tuple:
+        """(текст до строки‑маркера, остаток строки маркера)."""
+        chunks = []
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                # команда всё ещё выполняется – сессию уже не спасти
+                self.close()
+                raise subprocess.TimeoutExpired(argv, timeout)
+            if line is None:
+                self.close()
+                raise AdbError("shell‑сессия закрыта устройством")
+            if line.startswith(marker):
+                break
+            chunks.append(line)
+        text = b"".join(chunks)
+        if text.endswith(b"\n"):
+            text = text[:-1]                 # перевод строки, добавленный printf
+        return text.decode("utf-8", "replace"), line[len(marker):]
+
+
+class ShellSessionPool:
+    """
+    По одной ShellSession на устройство. Сессии, которыми не пользовались
+    дольше `idle_timeout` секунд, закрываются при следующем обращении к пулу.
+    """
+
+    def __init__(self, client: AdbClient, idle_timeout: float = 300.0):
+        self.client = client
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, serial: Optional[str]) -> ShellSession:
+        now = time.monotonic()
+        with self._lock:
+            for key, session in list(self._sessions.items()):
+                if key != serial and now - session.last_used > self.idle_timeout:
+                    session.close()
+                    del self._sessions[key]
+            session = self._sessions.get(serial)
+            if session is None:
+                session = self._sessions[serial] = ShellSession(self.client, serial)
+            return session
+
+    def run(self, serial: Optional[str], command: str,
+            timeout: float = 10.0) -> subprocess.CompletedProcess:
+        """Выполняет команду в сессии устройства `serial`."""
+        return self.get(serial).execute(command, timeout)
+
+    def run_many(self, serial: Optional[str], commands: list,
+                 timeout: float = 10.0) -> list:
+        """Пакет команд одним обменом (см. ShellSession.execute_many)."""
+        return self.get(serial).execute_many(commands, timeout)
+
+    def close(self, serial: Optional[str] = None):
+        """Закрывает сессию одного устройства."""
+        with self._lock:
+            session = self._sessions.pop(serial, None)
+        if session:
+            session.close()
+
+    def close_all(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
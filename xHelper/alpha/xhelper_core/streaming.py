@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+streaming – приёмник потокового вывода долгих команд (logcat, bugreport).
+
+Данные приходят кусками в потоке исполнителя (`feed`), а GUI забирает
+накопившееся пачкой по таймеру (`drain`) – так окно перерисовывается
+несколько раз в секунду, а не на каждый блок из сокета. Всё, что не
+успели показать, ограничено `max_pending` байтами (лишнее отбрасывается
+с пометкой), а полная копия при желании пишется в файл (tee) – в памяти
+многосотмегабайтный вывод целиком не держится никогда.
+"""
+
+import codecs
+import threading
+from typing import Optional
+
+
+class StreamSink:
+    """
+    :param tee_path:    файл, куда дублируется весь вывод (None – не писать)
+    :param max_pending: сколько байт ждать GUI, прежде чем отбрасывать старое
+    """
+
+    def __init__(self, tee_path: Optional[str] = None, max_pending: int = 4 * 1024 * 1024):
+        self.tee_path = tee_path
+        self.max_pending = max_pending
+        self.total_bytes = 0
+        self.dropped_bytes = 0
+        self._pending = []
+        self._pending_size = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._lock = threading.Lock()
+        self._tee = open(tee_path, "wb") if tee_path else None
+
+    def feed(self, chunk: bytes):
+        """Вызывается из потока исполнителя на каждый пришедший блок."""
+        if self._tee is not None:
+            self._tee.write(chunk)
+        with self._lock:
+            self.total_bytes += len(chunk)
+            self._pending.append(chunk)
+            self._pending_size += len(chunk)
+            while self._pending_size > self.max_pending and len(self._pending) > 1:
+                old = self._pending.pop(0)
+                self._pending_size -= len(old)
+                self.dropped_bytes += len(old)
+
+    def drain(self) -> str:
+        """Всё накопленное с прошлого вызова – одной строкой (для GUI‑таймера)."""
+        with self._lock:
+            chunks, self._pending, self._pending_size = self._pending, [], 0
+            dropped, self.dropped_bytes = self.dropped_bytes, 0
+        text = self._decoder.decode(b"".join(chunks))
+        if dropped:
+            text = f"… пропущено {dropped} байт (окно не успевает) …\n" + text
+        return text
+
+    def close(self):
+        """Закрывает tee‑файл; вызывать после завершения задания."""
+        if self._tee is not None:
+            self._tee.close()
+            self._tee = None
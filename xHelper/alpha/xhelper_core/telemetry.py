@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+telemetry – общая шина показателей устройств для вкладок и плагинов.
+
+Раньше «Мониторинг» и каждый плагин (батарея, температура, Wi‑Fi, монитор
+с прогресс‑барами) держали свой таймер и читали с устройства одно и то же
+– `dumpsys battery`, `dumpsys wifi`, `/proc/meminfo` – каждый в своём
+темпе. Теперь опросом владеет шина: подписчики говорят, какие источники
+им нужны и как часто,
+
+    sub = bus.subscribe(["battery", "wifi"], 3.0, on_snapshot)
+    sub.interval = 10.0          # реже
+    sub.refresh()                # прочитать при следующем тике
+    sub.cancel()
+
+а шина на каждом тике собирает для устройства объединение «созревших»
+источников (каждый – с наименьшим запрошенным интервалом) и читает их
+одним пакетом через MonitorSampler. Нагрузка на устройство растёт с числом
+разных показателей, а не с числом виджетов. Подписчик получает
+MonitorSnapshot только со своими источниками – из потока исполнителя
+(в GUI его переносит main_window.subscribe_telemetry).
+
+Опрос подстраивается под то, кому он нужен:
+
+    sub.visible = False          # виджет скрыт – действует sub.idle_interval
+                                 # (None – подписка вообще не опрашивается)
+
+а устройство, на котором замеры раз за разом падают (таймаут, обрыв),
+опрашивается всё реже – пауза удваивается до max_backoff и сбрасывается
+первым удачным замером.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from .monitor import MonitorSampler, MonitorSnapshot
+
+
+class Subscription:
+    """
+    Подписка на источники; serial=None – текущее устройство главного окна.
+
+    :param idle_interval: период, пока виджет подписчика не виден
+                          (None – не опрашивать вовсе)
+    :param visible:       начальная видимость виджета
+    """
+
+    def __init__(self, bus: "TelemetryBus", sources: list, interval: float,
+                 callback: Callable, serial: Optional[str] = None,
+                 idle_interval: Optional[float] = None, visible: bool = True):
+        self.bus = bus
+        self.sources = tuple(sources)
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.visible = visible
+        self.callback = callback
+        self.serial = serial
+        self.delivered = 0.0             # time.monotonic() последней доставки
+
+    @property
+    def effective_interval(self) -> Optional[float]:
+        """Текущий период опроса (None – подписка приостановлена)."""
+        return self.interval if self.visible else self.idle_interval
+
+    def cancel(self):
+        self.bus.unsubscribe(self)
+
+    def refresh(self):
+        """Прочитать источники подписки при ближайшем тике, не дожидаясь интервала."""
+        self.bus.refresh(self)
+
+
+class TelemetryBus:
+    """
+    :param sampler:   MonitorSampler – реестр источников и пакетное чтение
+    :param executor:  AdbExecutor – замеры идут под семафором устройства
+    :param is_online: callable(serial) -> bool; офлайн‑устройства не опрашиваются
+    :param log:       callable(str) для ошибок подписчиков (потокобезопасный)
+    :param tick:      шаг планировщика, с
+    :param max_backoff: предельная пауза для устройства, которое не отвечает, с
+    """
+
+    def __init__(self, sampler: MonitorSampler, executor, is_online: Optional[Callable] = None,
+                 log: Optional[Callable] = None, tick: float = 0.25, max_backoff: float = 60.0):
+        self.sampler = sampler
+        self.executor = executor
+        self.is_online = is_online
+        self.log = log
+        self.tick = tick
+        self.max_backoff = max_backoff
+        self.current = None              # serial выбранного в окне устройства
+        self._subs = []
+        self._last_read = {}             # (serial, источник) -> time.monotonic()
+        self._latest = {}                # serial -> {источник: разобранные данные}
+        self._jobs = {}                  # serial -> JobHandle замера в работе
+        self._failures = {}              # serial -> неудачных замеров подряд
+        self._retry_at = {}              # serial -> time.monotonic(), раньше не опрашивать
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    #   Подписки
+    # ------------------------------------------------------------------
+    def subscribe(self, sources: list, interval: float, callback: Callable,
+                  serial: Optional[str] = None, idle_interval: Optional[float] = None,
+                  visible: bool = True) -> Subscription:
+        sub = Subscription(self, sources, interval, callback, serial, idle_interval, visible)
+        with self._lock:
+            self._subs.append(sub)
+        self.refresh(sub)                # первый снимок – при ближайшем тике
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    def refresh(self, sub: Optional[Subscription] = None):
+        """Сбрасывает сроки источников подписки (None – всех) – читаем сразу."""
+        with self._lock:
+            subs = [sub] if sub is not None else list(self._subs)
+            for item in subs:
+                serial = item.serial or self.current
+                for name in item.sources:
+                    self._last_read.pop((serial, name), None)
+                item.delivered = 0.0
+                self._retry_at.pop(serial, None)     # явный запрос – без паузы
+        self._wake.set()
+
+    def set_visible(self, sub: Subscription, visible: bool):
+        """Виджет подписчика показан / скрыт; показанный сразу получает свежий снимок."""
+        if visible == sub.visible:
+            return
+        sub.visible = visible
+        if visible:
+            self.refresh(sub)
+
+    def failures(self, serial: str) -> int:
+        """Сколько замеров устройства подряд закончились ошибкой."""
+        return self._failures.get(serial, 0)
+
+    def set_current(self, serial: Optional[str]):
+        """Выбрано другое устройство: подписки без serial переключаются на него."""
+        if serial != self.current:
+            self.current = serial
+            self._wake.set()
+
+    def forget(self, serial: str):
+        """Устройство отключилось или перезагрузилось – забываем его данные."""
+        with self._lock:
+            self._latest.pop(serial, None)
+            self._failures.pop(serial, None)
+            self._retry_at.pop(serial, None)
+            for key in [k for k in self._last_read if k[0] == serial]:
+                del self._last_read[key]
+        self.sampler.cpu.forget(serial)
+        self.sampler.processes.forget(serial)
+        self.sampler.net.forget(serial)
+        self.sampler.thermal.forget(serial)
+
+    # ------------------------------------------------------------------
+    #   Запуск / остановка
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    # ------------------------------------------------------------------
+    #   Внутреннее
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.poll()
+            self._wake.wait(self.tick)
+
+    def poll(self):
+        """
+        Один проход планировщика: для каждого устройства – созревшие
+        источники одним замером (если прошлый замер ещё не вернулся – ждём).
+        """
+        now = time.monotonic()
+        plan = {}                        # serial -> {источник: наименьший интервал}
+        with self._lock:
+            for sub in self._subs:
+                serial = sub.serial or self.current
+                interval = sub.effective_interval
+                if serial is None or interval is None:
+                    continue
+                wanted = plan.setdefault(serial, {})
+                for name in sub.sources:
+                    wanted[name] = min(wanted.get(name, interval), interval)
+            last_read = dict(self._last_read)
+
+        for serial, wanted in plan.items():
+            job = self._jobs.get(serial)
+            if job is not None and not job.done():
+                continue
+            if now < self._retry_at.get(serial, 0.0):
+                continue                 # устройство не отвечает – пауза
+            if self.is_online is not None and not self.is_online(serial):
+                continue
+            due = [name for name, interval in wanted.items()
+                   if name in self.sampler.sources
+                   and now - last_read.get((serial, name), float("-inf")) >= interval - self.tick]
+            if due:
+                self._jobs[serial] = self.executor.submit_blocking(
+                    serial, self._sample, serial, due,
+                    timeout=self.sampler.timeout + 1, description="telemetry")
+
+    def _sample(self, serial: str, names: list) -> MonitorSnapshot:
+        try:
+            snap = self.sampler.sample(serial, names)
+        except Exception as e:           # нет связи / таймаут – подписчики узнают из errors
+            snap = MonitorSnapshot(serial, time.time(), 0.0, 0.0, {},
+                                   {name: str(e) or type(e).__name__ for name in names})
+        now = time.monotonic()
+        failed = bool(snap.errors) and not snap.data
+        with self._lock:
+            before = self._failures.get(serial, 0)
+            failures = before + 1 if failed else 0
+            self._failures[serial] = failures
+            if failed:
+                self._retry_at[serial] = now + min(2.0 ** failures, self.max_backoff)
+            else:
+                self._retry_at.pop(serial, None)
+            for name in names:
+                self._last_read[(serial, name)] = now
+            latest = self._latest.setdefault(serial, {})
+            latest.update(snap.data)
+            for name in snap.errors:
+                latest.pop(name, None)   # устаревшее не показываем
+            targets = [sub for sub in self._subs
+                       if (sub.serial or self.current) == serial
+                       and sub.effective_interval is not None
+                       and any(name in names for name in sub.sources)
+                       and now - sub.delivered >= sub.effective_interval - self.tick]
+            views = []
+            for sub in targets:
+                sub.delivered = now
+                data = {name: latest[name] for name in sub.sources if name in latest}
+                errors = {name: error for name, error in snap.errors.items() if name in sub.sources}
+                views.append((sub, snap._replace(data=data, errors=errors)))
+
+        if self.log is not None and failures == 3:
+            self.log(f"[Телеметрия] {serial} не отвечает – опрос реже, "
+                     f"пауза до {self.max_backoff:.0f} с")
+        elif self.log is not None and before >= 3 and not failed:
+            self.log(f"[Телеметрия] {serial} снова отвечает")
+        for sub, view in views:
+            try:
+                sub.callback(view)
+            except Exception as e:
+                if self.log is not None:
+                    self.log(f"[Телеметрия] Ошибка подписчика: {e}")
+        return snap
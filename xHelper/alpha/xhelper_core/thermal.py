@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+thermal – температура датчиков устройства и обнаружение троттлинга.
+
+`dumpsys thermalservice` – это целый отчёт системного сервиса (кэши HAL,
+слушатели, история), его дорого и печатать, и разбирать на каждом тике.
+Ядро отдаёт то же самое в sysfs: `/sys/class/thermal/thermal_zone*/temp`
+(милли‑°C) и `type`. Одна shell‑команда (THERMAL_COMMAND, только встроенные
+mksh) читает все зоны и частоты ядер CPU, а thermalservice запускается
+только там, где SELinux не пускает shell в thermal_zone*.
+
+Троттлинг – это потолок частоты ядра (`scaling_max_freq`), опущенный ниже
+аппаратного (`cpuinfo_max_freq`) при высокой температуре. Потолок без
+нагрева (экономия энергии) троттлингом не считается:
+
+    thermal = ThermalMonitor(throttle_temp=40.0)
+    thermal.set_threshold("battery*", 40.0, 45.0)   # предупреждение / критично
+    thermal.update(text, serial)   # {'max': 52.1, 'hottest': 'cpu-1-0-usr',
+                                   #  'zones': {…}, 'cpu_mhz': {…}, 'cap': 68.0,
+                                   #  'throttling': True, 'levels': {…},
+                                   #  'events': [ThermalEvent, …]}
+    thermal.events                 # последние события всех устройств
+
+История температур – в MetricStore вместе с остальными показателями
+(thermal.<зона>, thermal.max, thermal.cap).
+"""
+
+import fnmatch
+import re
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+# по строке на зону и на ядро; thermalservice – только если ни одна зона не прочиталась
+THERMAL_COMMAND = (
+    "z=0; for d in /sys/class/thermal/thermal_zone*; do "
+    "read -r t < $d/temp 2>/dev/null || continue; n=; read -r n < $d/type 2>/dev/null; "
+    "echo \"zone|${d##*/}|$n|$t\"; z=1; done; "
+    "for d in /sys/devices/system/cpu/cpu[0-9]*; do "
+    "read -r f < $d/cpufreq/scaling_cur_freq 2>/dev/null || continue; "
+    "c=; m=; read -r c < $d/cpufreq/scaling_max_freq 2>/dev/null; "
+    "read -r m < $d/cpufreq/cpuinfo_max_freq 2>/dev/null; "
+    "echo \"freq|${d##*/}|$f|$c|$m\"; done; "
+    "[ $z = 1 ] || dumpsys thermalservice"
+)
+
+# Temperature{mValue=33.5, mType=0, mName=cpu0-silver-usr, mStatus=0}
+_HAL_TEMP = re.compile(r"mValue=(-?[\d.]+), mType=-?\d+, mName=([^,}]+)")
+# старый формат: «41.0C (CPU-0)»
+_OLD_TEMP = re.compile(r"(-?\d+(?:\.\d+)?)C\s*\(([^)]+)\)")
+_STATUS = re.compile(r"Thermal Status: (\d+)")
+
+# {шаблон имени зоны (fnmatch): (предупреждение, критично)}, °C
+DEFAULT_THRESHOLDS = {"*": (45.0, 55.0)}
+
+
+class ThermalEvent(NamedTuple):
+    """Троттлинг начался / кончился или зона перешла порог."""
+    serial: Optional[str]
+    timestamp: float          # time.time()
+    kind: str                 # throttle_start, throttle_end, warning, critical, normal
+    zone: str                 # зона (для throttle_* – самая горячая)
+    temperature: float
+    detail: str
+
+
+def _celsius(raw: str) -> Optional[float]:
+    """Значение temp → °C: обычно милли‑°C, на части ядер – деци‑ или целые."""
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    if abs(value) >= 1000:
+        value /= 1000
+    elif abs(value) >= 200:
+        value /= 10
+    return round(value, 1) if -40.0 < value < 200.0 else None  # отключённые: -273, 0xFFFF…
+
+
+def parse_thermal(text: str) -> tuple:
+    """
+    Вывод THERMAL_COMMAND → (источник 'sysfs' / 'thermalservice',
+    {зона: °C}, {cpuN: (текущая, потолок, максимум) кГц}, статус thermalservice или None).
+    """
+    zones, freqs = {}, {}
+    seen = set()
+    for line in text.splitlines():
+        parts = line.strip().split("|")
+        if parts[0] == "zone" and len(parts) == 4:
+            temp = _celsius(parts[3])
+            if temp is None:
+                continue
+            name = parts[2] or parts[1]
+            if name in seen:                         # одинаковый type у разных зон
+                name = f"{name}#{parts[1].rpartition('zone')[2]}"
+            seen.add(name)
+            zones[name] = temp
+        elif parts[0] == "freq" and len(parts) == 5:
+            values = [int(v) if v.isdigit() else 0 for v in parts[2:]]
+            freqs[parts[1]] = tuple(values)
+    if zones:
+        return "sysfs", zones, freqs, None
+
+    status = _STATUS.search(text)
+    for value, name in _HAL_TEMP.findall(text) or _OLD_TEMP.findall(text):
+        zones.setdefault(name.strip(), float(value))    # первый раздел – текущие значения
+    return "thermalservice", zones, freqs, int(status.group(1)) if status else None
+
+
+class ThermalMonitor:
+    """
+    Разбор THERMAL_COMMAND с состоянием по устройству: уровни тревоги зон
+    и идущий эпизод троттлинга; события копятся в кольцевом буфере events.
+
+    :param thresholds:    {шаблон зоны: (предупреждение, критично)} поверх DEFAULT_THRESHOLDS
+    :param throttle_temp: с какой температуры опущенный потолок частоты – троттлинг, °C
+    :param history:       сколько последних событий хранить
+    """
+
+    def __init__(self, thresholds: Optional[dict] = None, throttle_temp: float = 40.0,
+                 history: int = 500):
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+        self.throttle_temp = throttle_temp
+        self.events = deque(maxlen=history)
+        self._state = {}                 # serial -> (троттлинг идёт, {зона: уровень})
+        self._lock = threading.Lock()
+
+    def set_threshold(self, pattern: str, warning: float, critical: float):
+        """Пороги для зон по шаблону fnmatch ('*' – все остальные)."""
+        self.thresholds[pattern] = (warning, critical)
+
+    def threshold(self, zone: str) -> tuple:
+        """(предупреждение, критично) для зоны: самый длинный подходящий шаблон."""
+        for pattern in sorted(self.thresholds, key=len, reverse=True):
+            if fnmatch.fnmatch(zone, pattern):
+                return self.thresholds[pattern]
+        return DEFAULT_THRESHOLDS["*"]
+
+    def level(self, zone: str, temperature: float) -> str:
+        warning, critical = self.threshold(zone)
+        if temperature >= critical:
+            return "critical"
+        if temperature >= warning:
+            return "warning"
+        return "normal"
+
+    def update(self, text: str, serial: Optional[str] = None) -> dict:
+        source, zones, freqs, status = parse_thermal(text)
+        if not zones:
+            return {}
+        hottest = max(zones, key=zones.get)
+        top = zones[hottest]
+
+        capped = [core for core, (_cur, cap, hw_max) in freqs.items()
+                  if cap and hw_max and cap < hw_max * 0.98]
+        caps = [100.0 * cap / hw_max for _cur, cap, hw_max in freqs.values() if cap and hw_max]
+        cap = round(min(caps), 1) if caps else 100.0
+        throttling = (bool(capped) and top >= self.throttle_temp) or (status or 0) >= 2
+
+        now = time.time()
+        events = []
+        with self._lock:
+            was_throttling, old_levels = self._state.get(serial, (False, {}))
+            levels = {}
+            for zone, temp in zones.items():
+                level = self.level(zone, temp)
+                if level != "normal":
+                    levels[zone] = level
+                if level != old_levels.get(zone, "normal"):
+                    warning, critical = self.threshold(zone)
+                    limit = critical if level == "critical" else warning
+                    events.append(ThermalEvent(serial, now, level, zone, temp,
+                                               f"порог {limit:g} °C"))
+            if throttling != was_throttling:
+                if throttling:
+                    detail = (f"{', '.join(capped)}: потолок {cap:g}% частоты" if capped
+                              else f"thermalservice: статус {status}")
+                else:
+                    detail = "потолок частоты снят"
+                events.append(ThermalEvent(serial, now, "throttle_start" if throttling
+                                           else "throttle_end", hottest, top, detail))
+            self._state[serial] = (throttling, levels)
+            self.events.extend(events)
+
+        return {
+            "source":          source,
+            "max":             top,
+            "hottest":         hottest,
+            "zones":           zones,
+            "cpu_mhz":         {f"{core}.mhz": cur // 1000 for core, (cur, _c, _m) in freqs.items()},
+            "cap":             cap,
+            "throttled_cores": len(capped),
+            "throttled":       capped,
+            "throttling":      throttling,
+            "status":          status,
+            "levels":          levels,
+            "events":          events,
+        }
+
+    def forget(self, serial: Optional[str] = None):
+        """Сбрасывает состояние одного устройства (None – всех); события остаются."""
+        with self._lock:
+            if serial is None:
+                self._state.clear()
+            else:
+                self._state.pop(serial, None)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+timeseries – история показателей мониторинга в кольцевых буферах.
+
+Каждый показатель устройства (battery.level, cpu.total, cpu.cpu3 …) – это
+RingSeries: два массива `array('d')` фиксированной длины под время и
+значение. Память на показатель постоянна (16 байт × capacity), сколько бы
+часов ни шёл прогон, – старые точки просто перезаписываются.
+
+    store = MetricStore(capacity=4 * 3600)      # 4 часа при 1 Гц
+    store.record(snapshot)                      # MonitorSnapshot → все числа
+    series = store.series(serial, "cpu.total")
+    times, values = series.points(since=seen)   # только новые точки
+    series.downsample(t0, t1, 600)              # min/max/mean по 600 корзинам
+    store.export_csv("soak.csv", serial)
+
+Для графика на часовом окне не нужно рисовать 3600 точек: downsample()
+сводит их к ширине виджета в пикселях (с numpy – векторно).
+"""
+
+import csv
+from array import array
+from datetime import datetime
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:          # numpy необязателен – свёртка на списках
+    np = None
+
+
+class RingSeries:
+    """Кольцевой буфер (время, значение) на `capacity` точек."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0                   # сколько точек записано за всё время
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, timestamp: float, value: float):
+        i = self.total % self.capacity
+        self._times[i] = timestamp
+        self._values[i] = value
+        self.total += 1
+
+    def last(self) -> Optional[tuple]:
+        if not self.total:
+            return None
+        i = (self.total - 1) % self.capacity
+        return self._times[i], self._values[i]
+
+    def points(self, since: int = 0) -> tuple:
+        """
+        (times, values) от старых к новым; since – порядковый номер точки
+        (series.total на прошлом чтении), чтобы забрать только новые.
+        """
+        start = max(since, self.total - len(self))
+        if start >= self.total:
+            return array("d"), array("d")
+        a, b = start % self.capacity, self.total % self.capacity
+        if a < b:
+            return self._times[a:b], self._values[a:b]
+        return self._times[a:] + self._times[:b], self._values[a:] + self._values[:b]
+
+    def downsample(self, t0: float, t1: float, buckets: int) -> tuple:
+        """
+        Свёртка точек из [t0, t1] в `buckets` равных интервалов:
+        (times, mins, maxs, means) по непустым корзинам.
+        """
+        times, values = self.points()
+        if not times or t1 <= t0 or buckets <= 0:
+            return [], [], [], []
+        width = (t1 - t0) / buckets
+        if np is not None:
+            t = np.frombuffer(times, dtype=np.float64)
+            v = np.frombuffer(values, dtype=np.float64)
+            keep = (t >= t0) & (t <= t1)
+            t, v = t[keep], v[keep]
+            if not len(t):
+                return [], [], [], []
+            index = np.minimum(((t - t0) / width).astype(np.int64), buckets - 1)
+            starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+            counts = np.diff(np.r_[starts, len(v)])
+            return ((t0 + (index[starts] + 0.5) * width).tolist(),
+                    np.minimum.reduceat(v, starts).tolist(),
+                    np.maximum.reduceat(v, starts).tolist(),
+                    (np.add.reduceat(v, starts) / counts).tolist())
+
+        out_t, mins, maxs, means = [], [], [], []
+        current, total, count = None, 0.0, 0
+        for t, v in zip(times, values):
+            if t < t0 or t > t1:
+                continue
+            index = min(int((t - t0) / width), buckets - 1)
+            if index != current:
+                if count:
+                    means.append(total / count)
+                current, total, count = index, 0.0, 0
+                out_t.append(t0 + (index + 0.5) * width)
+                mins.append(v)
+                maxs.append(v)
+            mins[-1] = min(mins[-1], v)
+            maxs[-1] = max(maxs[-1], v)
+            total += v
+            count += 1
+        if count:
+            means.append(total / count)
+        return out_t, mins, maxs, means
+
+
+def flatten(data: dict) -> dict:
+    """
+    MonitorSnapshot.data → {'battery.level': 87.0, 'cpu.cpu0': 41.0, …}:
+    только числа; вложенные словари (ядра CPU) – на уровень выше.
+    """
+    flat = {}
+    for source, values in data.items():
+        for key, value in values.items():
+            if isinstance(value, dict):
+                for sub, item in value.items():
+                    if isinstance(item, (int, float)) and not isinstance(item, bool):
+                        flat[f"{source}.{sub}"] = float(item)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                flat[f"{source}.{key}"] = float(value)
+    return flat
+
+
+class MetricStore:
+    """
+    {serial: {показатель: RingSeries}}. Пишется и читается в одном потоке
+    (в xHelper – в GUI‑потоке, куда приходят снимки мониторинга).
+
+    :param capacity: точек на показатель (по умолчанию 4 часа при 1 Гц)
+    """
+
+    def __init__(self, capacity: int = 4 * 3600):
+        self.capacity = capacity
+        self._devices = {}
+
+    def record(self, snapshot):
+        """Все числовые показатели снимка – в их ряды."""
+        self.record_values(snapshot.serial, snapshot.timestamp, flatten(snapshot.data))
+
+    def record_values(self, serial: Optional[str], timestamp: float, values: dict):
+        device = self._devices.setdefault(serial, {})
+        for metric, value in values.items():
+            series = device.get(metric)
+            if series is None:
+                series = device[metric] = RingSeries(self.capacity)
+            series.append(timestamp, value)
+
+    def series(self, serial: Optional[str], metric: str) -> Optional[RingSeries]:
+        return self._devices.get(serial, {}).get(metric)
+
+    def metrics(self, serial: Optional[str]) -> list:
+        return sorted(self._devices.get(serial, {}))
+
+    def devices(self) -> list:
+        return list(self._devices)
+
+    def forget(self, serial: Optional[str] = None):
+        if serial is None:
+            self._devices.clear()
+        else:
+            self._devices.pop(serial, None)
+
+    def export_csv(self, path: str, serial: Optional[str], metrics: Optional[list] = None) -> int:
+        """
+        Таблица «время × показатели» устройства в CSV (пустые ячейки – нет
+        замера). Возвращает число строк.
+        """
+        metrics = metrics or self.metrics(serial)
+        rows = {}
+        for column, metric in enumerate(metrics):
+            series = self.series(serial, metric)
+            if series is None:
+                continue
+            for t, v in zip(*series.points()):
+                rows.setdefault(t, [""] * len(metrics))[column] = f"{v:g}"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "time"] + metrics)
+            for t in sorted(rows):
+                writer.writerow([f"{t:.3f}", datetime.fromtimestamp(t).isoformat(timespec="seconds")]
+                                + rows[t])
+        return len(rows)